@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import sys
 from getpass import getpass
@@ -16,9 +17,32 @@ from modules.user_randomizer import UserRandomizer
 from modules.batch_processor import BatchProcessor
 from modules.cache_cleanup import cleanup_cache_files
 from modules.auth_wrapper import AuthWrapper, AuthError
+from modules.http_client import close_session, configure_http
+from modules.resumable_upload import ResumableUploader
+from modules.rate_limiter import TokenBucket
+from modules.adaptive_concurrency import AdaptiveConcurrencyController
+from modules.comment_mapping import DEFAULT_PARALLEL_MIN, ParallelCommentParser
+from modules.live_chat_reducer import LiveChatReducer
+from modules.video_store import VideoStore
+from modules.download_engine import DownloadEngine
+from modules.format_policy import FormatPolicy
+from modules.disk_quota import DiskQuota
+from modules.run_journal import RunJournal
+from modules.comment_ledger import CommentLedger
+from modules import metrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ingest YouTube videos and comments into InCast")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted run: skip completed videos, finished uploads and published comments")
+    parser.add_argument('--refresh', action='store_true',
+                        help="drop cached metadata, comments, live chat and stored-upload asset IDs of every listed video")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
     config = Config()
     
     log_level = config.get('logging.level', 'INFO')
@@ -54,7 +78,20 @@ def main():
     
     rate_limit = config.get_float('processing.rate_limit', 0.5)
     cache_cleanup_days = config.get_int('cache.cleanup_after_days', 30)
+    metadata_ttl_hours = config.get_float('cache.metadata_ttl_hours', 168)
     skip_live_chat = config.get_bool('processing.skip_live_chat', False)
+    max_parallel_videos = max(1, config.get_int('processing.max_parallel_videos', 1))
+    publish_engine = str(config.get('publishing.engine', 'sync')).lower()
+    if publish_engine not in ('sync', 'async'):
+        logger.warning(f"⚠️  Unknown publishing.engine '{publish_engine}', using 'sync'")
+        publish_engine = 'sync'
+    
+    pipeline_workers = None
+    if config.get_bool('pipeline.enabled', False):
+        pipeline_workers = {
+            stage: max(1, config.get_int(f'pipeline.{stage}_workers', default))
+            for stage, default in (('extract', 1), ('download', 2), ('upload', 2), ('publish', 2))
+        }
     
     max_items_limit = config.get('processing.max_items_limit', '10' if dry_run else 'all')
     if max_items_limit and max_items_limit.lower() == 'all':
@@ -89,10 +126,25 @@ def main():
     logger.info("=" * 80)
     logger.info(f"Input file: {list_file}")
     logger.info(f"Backend: {backend_url}")
-    logger.info(f"Rate limit: {rate_limit}s")
+    logger.info(f"Rate limit: {rate_limit}s between publish calls ({(1.0 / rate_limit) if rate_limit > 0 else 'unlimited'} req/s budget)")
+    logger.info(f"Publishing engine: {publish_engine}")
     logger.info(f"Max items limit: {max_items_limit if max_items_limit else 'all (no limit)'}")
+    if args.resume:
+        logger.info("Resume: skipping work recorded in the run journal")
+    if pipeline_workers:
+        logger.info("Pipeline workers: " + ", ".join(f"{stage}={count}" for stage, count in pipeline_workers.items()))
+    else:
+        logger.info(f"Parallel videos: {max_parallel_videos}")
     logger.info("=" * 80)
     
+    host_limits = config.get('http.host_limits', {})
+    configure_http(
+        pool_connections=config.get_int('http.pool_connections', 10),
+        pool_maxsize=config.get_int('http.pool_maxsize', 20),
+        pool_block=config.get_bool('http.pool_block', False),
+        host_limits=host_limits if isinstance(host_limits, dict) else {}
+    )
+    
     logger.info("\n🔐 Authentication Required")
     logger.info("=" * 80)
     
@@ -120,32 +172,166 @@ def main():
     refresh_token = auth_result['refresh_token']
     
     if config.get_bool('cache.enabled', True) and cache_cleanup_days > 0:
-        cleanup_cache_files(days_old=cache_cleanup_days)
+        cleanup_cache_files(days_old=cache_cleanup_days, metadata_ttl_hours=metadata_ttl_hours)
+    
+    comment_workers = config.get_int('processing.comment_workers', 0)
+    comment_parser = None
+    if comment_workers != 0:
+        comment_parser = ParallelCommentParser(
+            workers=comment_workers if comment_workers > 0 else 0,
+            chunk_size=config.get_int('processing.comment_chunk_size', 0),
+            min_comments=config.get_int('processing.comment_parallel_min', DEFAULT_PARALLEL_MIN)
+        )
+    
+    video_store = None
+    if config.get_bool('video_store.enabled', False):
+        video_store = VideoStore(
+            root=config.get('video_store.root', 'cache/videos'),
+            max_bytes=int(config.get_float('video_store.max_size_gb', 0) * 1024 ** 3),
+            max_age_days=config.get_float('video_store.max_age_days', 0)
+        )
+        video_store.enforce_retention()
+    
+    downloader_args = config.get('download.external_downloader_args', [])
+    download_engine = DownloadEngine(
+        concurrent_fragments=config.get_int('download.concurrent_fragments', 4),
+        external_downloader=config.get('download.external_downloader', ''),
+        external_downloader_args=downloader_args if isinstance(downloader_args, list) else str(downloader_args).split(),
+        http_chunk_size=int(config.get_float('download.http_chunk_size_mb', 10) * 1024 * 1024),
+        buffer_size=int(config.get_float('download.buffer_size_kb', 1024) * 1024),
+        max_rate=config.get_float('download.max_rate_mb', 0) * 1024 * 1024
+    )
+    logger.info(f"Download engine: {download_engine.describe()}")
+    
+    disk_quota = None
+    if config.get_bool('disk_quota.enabled', False):
+        os.makedirs('cache', exist_ok=True)
+        disk_quota = DiskQuota(
+            max_bytes=int(config.get_float('disk_quota.max_gb', 20) * 1024 ** 3),
+            path='cache',
+            min_free_bytes=int(config.get_float('disk_quota.min_free_gb', 2) * 1024 ** 3),
+            default_bytes=int(config.get_float('disk_quota.unknown_size_mb', 500) * 1024 * 1024)
+        )
     
-    youtube_processor = YouTubeProcessor()
+    format_policy = FormatPolicy(
+        max_height=config.get_int('format.max_height', 1080),
+        max_filesize=int(config.get_float('format.max_filesize_mb', 0) * 1024 * 1024),
+        prefer_progressive=config.get_bool('format.prefer_progressive', True),
+        prefer_mp4=config.get_bool('format.prefer_mp4', True)
+    )
+    
+    youtube_processor = YouTubeProcessor(
+        info_cache_on_disk=config.get_bool('cache.info_dict_on_disk', False),
+        info_cache_ttl=config.get_int('cache.info_dict_ttl', 3600),
+        metadata_cache_enabled=config.get_bool('cache.enabled', True),
+        metadata_cache_ttl=int(metadata_ttl_hours * 3600),
+        comment_parser=comment_parser,
+        video_store=video_store,
+        download_engine=download_engine,
+        format_policy=format_policy
+    )
     user_randomizer = UserRandomizer()
     
+    upload_mode = str(config.get('upload.mode', 'single')).lower()
+    resumable_uploader = None
+    if upload_mode == 'resumable':
+        resumable_uploader = ResumableUploader(
+            chunk_size=int(config.get_float('upload.chunk_size_mb', 8) * 1024 * 1024),
+            max_retries=config.get_int('upload.max_retries', 5),
+            timeout=config.get_float('upload.chunk_timeout', 120)
+        )
+        logger.info(f"⬆️  Resumable uploads in {resumable_uploader.chunk_size / (1024*1024):.2f} MB chunks")
+    elif upload_mode != 'single':
+        logger.warning(f"⚠️  Unknown upload.mode '{upload_mode}', using 'single'")
+    
     asset_creator = AssetCreator(
         backend_url=backend_url,
         jwt_token=jwt_token,
         refresh_token=refresh_token if refresh_token else None,
-        dry_run=dry_run
+        dry_run=dry_run,
+        resumable_uploader=resumable_uploader
     )
     
+    publish_concurrency = None
+    if config.get_bool('publishing.adaptive.enabled', False):
+        max_in_flight = config.get_int('publishing.max_in_flight', 8)
+        publish_concurrency = AdaptiveConcurrencyController(
+            initial=config.get_float('publishing.adaptive.initial', 2),
+            min_limit=config.get_int('publishing.adaptive.min', 1),
+            max_limit=config.get_int('publishing.adaptive.max', max_in_flight),
+            p95_latency_limit=config.get_float('publishing.adaptive.p95_latency_limit', 0.0),
+            latency_tolerance=config.get_float('publishing.adaptive.latency_tolerance', 2.0),
+            cooldown=config.get_float('publishing.adaptive.cooldown', 2.0)
+        )
+        logger.info(f"📶 Adaptive publish concurrency: window {publish_concurrency.limit} (max {publish_concurrency.max_limit})")
+    
+    metrics_file = config.get('metrics.export_file', '')
+    metrics_stop = metrics.start_periodic_export(metrics_file, config.get_float('metrics.export_interval', 30.0))
+    
+    journal = None
+    if dry_run:
+        if args.resume:
+            logger.warning("⚠️  --resume has no effect in dry run mode (nothing is journaled)")
+    elif config.get_bool('journal.enabled', True):
+        journal = RunJournal(config.get('journal.path', 'cache/run_journal.db'))
+        journal.start_run(resume=args.resume)
+    elif args.resume:
+        logger.warning("⚠️  --resume needs journal.enabled: true; starting from scratch")
+    
+    # Dry runs publish nothing, so they neither consult nor fill the ledger.
+    # The journal only knows whole videos; a resumed video's comments are
+    # deduplicated by the ledger, so --resume always turns it on.
+    comment_ledger = None
+    ledger_enabled = config.get_bool('ledger.enabled', True)
+    if not dry_run and args.resume and not ledger_enabled:
+        logger.warning("⚠️  --resume needs the comment ledger to skip comments already published; enabling it for this run")
+        ledger_enabled = True
+    if not dry_run and ledger_enabled:
+        comment_ledger = CommentLedger(config.get('ledger.path', 'cache/comment_ledger.db'))
+    
     comment_importer = CommentImporter(
         publish_url=publish_url,
         jwt_token=jwt_token,
         refresh_token=refresh_token if refresh_token else None,
-        dry_run=dry_run
+        dry_run=dry_run,
+        engine=publish_engine,
+        max_in_flight=config.get_int('publishing.max_in_flight', 8),
+        rate_limiter=TokenBucket.from_interval(rate_limit, capacity=config.get_float('processing.rate_burst', 1.0)),
+        concurrency=publish_concurrency,
+        batch_size=config.get_int('publishing.batch_size', 1),
+        batch_linger=config.get_float('publishing.batch_linger', 0.05),
+        publish_batch_url=config.get('api.publish_batch_url', '') or None,
+        ledger=comment_ledger
     )
     comment_importer.set_backend_url(backend_url)
     
     try:
+        live_chat_reducer = LiveChatReducer(
+            dedup=config.get('live_chat.dedup', 'exact'),
+            dedup_window=config.get_int('live_chat.dedup_window', 10),
+            per_second_cap=config.get_int('live_chat.per_second_cap', 0),
+            sample=config.get('live_chat.sample', 'uniform')
+        )
+        
         batch_processor = BatchProcessor(
             youtube_processor=youtube_processor,
             asset_creator=asset_creator,
             comment_importer=comment_importer,
-            user_randomizer=user_randomizer
+            user_randomizer=user_randomizer,
+            max_parallel_videos=max_parallel_videos,
+            pipeline_workers=pipeline_workers,
+            pipeline_queue_size=max(1, config.get_int('pipeline.queue_size', 2)),
+            pipeline_report_interval=config.get_float('pipeline.report_interval', 30.0),
+            stream_comments=config.get_bool('processing.stream_comments', False),
+            stream_chunk_size=config.get_int('processing.stream_chunk_size', 500),
+            live_chat_reducer=live_chat_reducer,
+            journal=journal,
+            resume=args.resume,
+            stream_upload=config.get_bool('upload.stream', False),
+            stream_buffer=int(config.get_float('upload.stream_buffer_mb', 64) * 1024 * 1024),
+            reuse_uploads=video_store is not None and config.get_bool('video_store.reuse_uploads', False),
+            disk_quota=disk_quota,
+            refresh=args.refresh
         )
         
         results = batch_processor.process_list(
@@ -176,6 +362,18 @@ def main():
     except Exception as e:
         logger.error(f"\n❌ Fatal error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        if comment_parser:
+            comment_parser.close()
+        if journal:
+            journal.close()
+        if comment_ledger:
+            comment_ledger.close()
+        close_session()
+        if metrics_stop:
+            metrics_stop.set()
+        if metrics.write_metrics(metrics_file):
+            logger.info(f"📈 Metrics written to {metrics_file}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,142 @@
+"""Adaptive (AIMD) concurrency control for the publish endpoint"""
+
+import logging
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Rejected credentials say nothing about server load, so these responses
+# neither grow nor shrink the window and stay out of the latency samples
+AUTH_FAILURE_STATUSES = (401, 403)
+
+
+class AdaptiveConcurrencyController:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    Every successful response grows the window by ``increase / window`` (about
+    ``increase`` per full window of responses). A 429, a 5xx, a network error
+    or a p95 latency above the limit shrinks it by ``decrease_factor``, at most
+    once per ``cooldown`` seconds so a burst of failures from one congested
+    window only counts once. ``Retry-After`` pauses all new requests until it
+    expires. With ``p95_latency_limit`` at 0 the limit is
+    ``latency_tolerance`` times the best p95 seen so far. Auth failures
+    (401/403) are ignored.
+    """
+
+    def __init__(self, initial: float = 4, min_limit: int = 1, max_limit: int = 32, increase: float = 1.0, decrease_factor: float = 0.5, p95_latency_limit: float = 0.0, latency_tolerance: float = 2.0, latency_window: int = 50, cooldown: float = 2.0, name: str = 'publish'):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.window = float(min(max(initial, self.min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease_factor = min(max(decrease_factor, 0.1), 0.95)
+        self.p95_latency_limit = p95_latency_limit
+        self.latency_tolerance = max(1.0, latency_tolerance)
+        self.cooldown = cooldown
+        self.name = name
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._latencies = deque(maxlen=max(10, latency_window))
+        self._baseline_p95: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._export()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self.window))
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    self._export()
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else 1.0)
+
+    def release(self, status_code: Optional[int], latency: float, retry_after: Optional[str] = None):
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            now = time.monotonic()
+
+            retry_after_seconds = parse_retry_after(retry_after)
+            if retry_after_seconds:
+                if self.paused_until <= now:
+                    logger.warning(f"⏸️  {self.name}: server asked to retry after {retry_after_seconds:.1f}s, pausing new requests")
+                    metrics.inc_counter(f"{self.name}_retry_after_pauses")
+                self.paused_until = max(self.paused_until, now + retry_after_seconds)
+
+            throttled = status_code is None or status_code == 429 or status_code >= 500
+            if status_code in AUTH_FAILURE_STATUSES:
+                metrics.inc_counter(f"{self.name}_auth_failures")
+            elif throttled:
+                metrics.inc_counter(f"{self.name}_throttled_responses")
+                self._decrease(now, f"HTTP {status_code}" if status_code else "network error")
+            else:
+                self._latencies.append(latency)
+                p95 = self._p95()
+                limit = self._latency_limit(p95)
+                if p95 is not None and limit is not None and p95 > limit:
+                    self._decrease(now, f"p95 latency {p95:.2f}s > {limit:.2f}s")
+                elif self.window < self.max_limit:
+                    before = self.limit
+                    self.window = min(float(self.max_limit), self.window + self.increase / self.window)
+                    if self.limit != before:
+                        logger.debug(f"📈 {self.name} concurrency window: {before} -> {self.limit}")
+
+            self._export()
+            self._condition.notify_all()
+
+    def _decrease(self, now: float, reason: str):
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        before = self.limit
+        self.window = max(float(self.min_limit), self.window * self.decrease_factor)
+        # Old samples describe the congested period; start fresh
+        self._latencies.clear()
+        logger.info(f"📉 {self.name} concurrency window: {before} -> {self.limit} ({reason})")
+
+    def _p95(self) -> Optional[float]:
+        if len(self._latencies) < 10:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _latency_limit(self, p95: Optional[float]) -> Optional[float]:
+        if self.p95_latency_limit and self.p95_latency_limit > 0:
+            return self.p95_latency_limit
+        if p95 is None:
+            return None
+        if self._baseline_p95 is None or p95 < self._baseline_p95:
+            self._baseline_p95 = p95
+        return self._baseline_p95 * self.latency_tolerance
+
+    def _export(self):
+        metrics.set_gauge(f"{self.name}_concurrency_window", self.limit)
+        metrics.set_gauge(f"{self.name}_in_flight", self.in_flight)
+        p95 = self._p95()
+        if p95 is not None:
+            metrics.set_gauge(f"{self.name}_latency_p95_seconds", round(p95, 4))
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    # Retry-After is either delta-seconds or an HTTP date
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return 0.0
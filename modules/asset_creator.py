@@ -4,20 +4,26 @@ import json
 import logging
 import requests
 import mimetypes
+import threading
 import time
 import base64
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
+from .http_client import get_session
+from .resumable_upload import ResumableUploader
 from .retry import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
 
 class AssetCreator:
-    def __init__(self, backend_url: str, jwt_token: str, refresh_token: Optional[str] = None, dry_run: bool = False):
+    def __init__(self, backend_url: str, jwt_token: str, refresh_token: Optional[str] = None, dry_run: bool = False, resumable_uploader: Optional[ResumableUploader] = None):
         self.backend_url = backend_url.rstrip('/') + '/graphql/'
         self.jwt_token = jwt_token
         self.refresh_token = refresh_token
         self.dry_run = dry_run
+        # None = one PUT per file; otherwise the GCS resumable protocol
+        self.resumable_uploader = resumable_uploader
+        self._token_lock = threading.Lock()
     
     def _decode_jwt_payload(self, token: str) -> Optional[Dict]:
         try:
@@ -45,7 +51,13 @@ class AssetCreator:
         
         return expires_in < threshold_seconds
     
-    def _refresh_token(self) -> bool:
+    def _refresh_token(self, stale_token: Optional[str] = None) -> bool:
+        with self._token_lock:
+            if stale_token and self.jwt_token != stale_token:
+                return True
+            return self._do_refresh_token()
+    
+    def _do_refresh_token(self) -> bool:
         if self.dry_run:
             logger.info("🧪 DRY RUN: Would refresh token")
             return True
@@ -73,7 +85,7 @@ class AssetCreator:
         
         try:
             # Only send refresh token cookie - don't send expired JWT
-            response = requests.post(
+            response = get_session().post(
                 self.backend_url,
                 json=payload,
                 cookies={
@@ -125,7 +137,7 @@ class AssetCreator:
     def _ensure_valid_token(self):
         if self._token_expires_soon(self.jwt_token):
             logger.info("🔄 Token expires soon, refreshing...")
-            if not self._refresh_token():
+            if not self._refresh_token(stale_token=self.jwt_token):
                 logger.warning("⚠️  Token refresh failed, continuing with current token")
     
     def get_signed_url(self, file_name: str, asset_name: str, asset_description: str, metadata: Optional[Dict] = None) -> Dict:
@@ -177,7 +189,7 @@ class AssetCreator:
         try:
             @retry_with_backoff(exceptions=(requests.RequestException,))
             def _make_request():
-                return requests.post(
+                return get_session().post(
                     self.backend_url,
                     json=payload,
                     cookies={'JWT': self.jwt_token},
@@ -220,7 +232,7 @@ class AssetCreator:
             logger.error(f"Error getting signed URL: {e}", exc_info=True)
             return {'error': str(e)}
     
-    def upload_file_to_signed_url(self, file_path: str, upload_url: str, content_type: Optional[str] = None) -> Dict:
+    def upload_file_to_signed_url(self, file_path: str, upload_url: str, content_type: Optional[str] = None, session_uri: Optional[str] = None, on_session: Optional[Callable[[str], None]] = None) -> Dict:
         import os
         
         if not os.path.exists(file_path):
@@ -239,9 +251,12 @@ class AssetCreator:
             logger.info(f"   Content-Type: {content_type}")
             return {'success': True}
         
+        if self.resumable_uploader is not None:
+            return self._upload_resumable(file_path, upload_url, content_type, session_uri, on_session)
+        
         try:
             with open(file_path, 'rb') as f:
-                response = requests.put(
+                response = get_session().put(
                     upload_url,
                     data=f,
                     headers={
@@ -262,4 +277,44 @@ class AssetCreator:
             error_msg = f"Error uploading file: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return {'success': False, 'error': error_msg}
-
+    
+    def upload_stream_to_signed_url(self, stream, size: int, upload_url: str, content_type: str = 'video/mp4', session_uri: Optional[str] = None, on_session: Optional[Callable[[str], None]] = None) -> Dict:
+        # ``stream`` is a readable of exactly ``size`` bytes (a BytePipe fed
+        # by the download), so the upload runs while the video downloads
+        if self.dry_run:
+            logger.info(f"🧪 DRY RUN: Would stream {size / (1024*1024):.2f} MB to signed URL")
+            return {'success': True}
+        
+        try:
+            if self.resumable_uploader is not None:
+                result = self.resumable_uploader.upload_stream(stream, size, upload_url, content_type, session_uri=session_uri, on_session=on_session)
+            else:
+                response = get_session().put(
+                    upload_url,
+                    data=stream,
+                    headers={
+                        'Content-Type': content_type
+                    },
+                    timeout=600
+                )
+                if response.status_code not in [200, 204]:
+                    raise IOError(f"Upload failed: HTTP {response.status_code}")
+                result = {'success': True}
+            
+            logger.info("✅ Stream uploaded to signed URL successfully")
+            return result
+        except Exception as e:
+            error_msg = f"Error streaming upload: {str(e)}"
+            logger.error(error_msg)
+            return {'success': False, 'error': error_msg}
+    
+    def _upload_resumable(self, file_path: str, upload_url: str, content_type: str, session_uri: Optional[str], on_session: Optional[Callable[[str], None]]) -> Dict:
+        try:
+            result = self.resumable_uploader.upload(file_path, upload_url, content_type, session_uri=session_uri, on_session=on_session)
+            resumed = f" (resumed at {result['resumed_from'] / (1024*1024):.1f} MB)" if result['resumed_from'] else ""
+            logger.info(f"✅ File uploaded to signed URL successfully (resumable){resumed}")
+            return result
+        except Exception as e:
+            error_msg = f"Error uploading file: {str(e)}"
+            logger.error(error_msg)
+            return {'success': False, 'error': error_msg}
@@ -0,0 +1,136 @@
+"""Asyncio comment publisher with bounded in-flight requests"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .comment_scheduler import CommentScheduler
+from .rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCommentPublisher:
+    """Publishes comments concurrently through a CommentImporter.
+
+    HTTP calls reuse the importer's blocking ``_send_comment`` (and its 401
+    refresh-and-retry) on a small thread pool, while asyncio does the
+    scheduling: at most ``max_in_flight`` requests are outstanding and each
+    dispatch takes a token from the shared ``rate_limiter``.
+    Ordering between parents and replies is handled by CommentScheduler.
+    With ``batch_size`` above 1, ready comments are grouped into batch
+    requests of up to ``batch_size`` items, waiting at most ``batch_linger``
+    seconds for a batch to fill.
+    """
+
+    def __init__(self, importer, max_in_flight: int = 8, rate_limiter: Optional[TokenBucket] = None, batch_size: int = 1, batch_linger: float = 0.05):
+        self.importer = importer
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_limiter = rate_limiter or TokenBucket(0)
+        self.batch_size = max(1, batch_size)
+        self.batch_linger = batch_linger
+
+    def publish(self, comments: List[Dict], asset_id: str, known_parents: Optional[Dict[str, str]] = None, on_published: Optional[Callable[[str, str], None]] = None) -> Dict:
+        return asyncio.run(self._publish(comments, asset_id, known_parents, on_published))
+
+    async def _publish(self, comments: List[Dict], asset_id: str, known_parents: Optional[Dict[str, str]] = None, on_published: Optional[Callable[[str, str], None]] = None) -> Dict:
+        total = len(comments)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='publish')
+        scheduler = CommentScheduler(comments, known_parents=known_parents, on_published=on_published)
+
+        pacing = {'dispatched': 0}
+        batcher = None
+        if self.batch_size > 1 and not self.importer.dry_run:
+            batcher = _Batcher(self, loop, executor, semaphore, total)
+
+        async def publish_one(position: int, comment: Dict, incast_parent_id: Optional[str]) -> Optional[str]:
+            idx = position + 1
+            yt_id = comment.get('yt_id', f"yt_{idx}")
+            payload = self.importer._build_payload(comment, asset_id, incast_parent_id)
+
+            if batcher and self.importer._batch_supported:
+                return await batcher.submit(idx, yt_id, payload)
+
+            async with semaphore:
+                if not self.importer.dry_run:
+                    await self.rate_limiter.acquire_async()
+
+                pacing['dispatched'] += 1
+                if pacing['dispatched'] % self.importer.TOKEN_CHECK_INTERVAL == 0:
+                    await loop.run_in_executor(executor, self.importer._check_token_periodically, idx, total)
+
+                if self.importer.dry_run:
+                    return self.importer._dry_run_publish(payload, idx, total, yt_id, incast_parent_id)
+                return await loop.run_in_executor(
+                    executor, self.importer._send_comment, payload, idx, total, self.rate_limiter
+                )
+
+        try:
+            stats = await scheduler.run_async(publish_one)
+        finally:
+            executor.shutdown(wait=True)
+
+        if batcher:
+            stats['batches'] = batcher.batches
+            logger.info(f"📦 Published {total} comments in {batcher.batches} batch request(s)")
+        return stats
+
+
+class _Batcher:
+    def __init__(self, publisher: AsyncCommentPublisher, loop: asyncio.AbstractEventLoop, executor: ThreadPoolExecutor, semaphore: asyncio.Semaphore, total: int):
+        self.publisher = publisher
+        self.importer = publisher.importer
+        self.loop = loop
+        self.executor = executor
+        self.semaphore = semaphore
+        self.total = total
+        self.pending: List = []
+        self.timer = None
+        self.batches = 0
+        self.sent = 0
+        self._tasks = set()
+
+    async def submit(self, idx: int, yt_id: str, payload: Dict) -> Optional[str]:
+        future = self.loop.create_future()
+        self.pending.append((idx, yt_id, payload, future))
+        if len(self.pending) >= self.publisher.batch_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = self.loop.call_later(self.publisher.batch_linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        task = self.loop.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List):
+        items = [(idx, yt_id, payload) for idx, yt_id, payload, _ in batch]
+        try:
+            async with self.semaphore:
+                await self.publisher.rate_limiter.acquire_async()
+
+                previous = self.sent
+                self.sent += len(items)
+                self.batches += 1
+                interval = self.importer.TOKEN_CHECK_INTERVAL
+                if self.sent // interval > previous // interval:
+                    await self.loop.run_in_executor(self.executor, self.importer._check_token_periodically, items[-1][0], self.total)
+
+                results = await self.loop.run_in_executor(self.executor, self.importer._send_batch, items, self.total, self.publisher.rate_limiter)
+        except Exception as e:
+            logger.info(f"⏭️  Skipped batch of {len(items)} comments (error: {e})")
+            results = [None] * len(items)
+
+        for (_, _, _, future), incast_comment_id in zip(batch, results):
+            if not future.done():
+                future.set_result(incast_comment_id)
@@ -5,6 +5,8 @@ from typing import Dict, Optional
 
 import requests
 
+from .http_client import get_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,7 +45,7 @@ class AuthWrapper:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = get_session().post(url, json=payload, timeout=self.timeout)
             if response.status_code != 200:
                 error_detail = self._extract_error(response)
                 raise AuthError(f"Firebase sign-in failed: {error_detail}")
@@ -76,7 +78,7 @@ class AuthWrapper:
         payload = {"query": mutation, "variables": variables}
 
         try:
-            response = requests.post(
+            response = get_session().post(
                 self.backend_url,
                 json=payload,
                 headers={'Content-Type': 'application/json'},
@@ -2,18 +2,41 @@
 
 import json
 import logging
+import mimetypes
 import os
-from typing import List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple
+
+from .comment_stream import filter_timestamped, group_threads, limit_items
+from .live_chat_reducer import LiveChatReducer
+from .pipeline import StagedPipeline
+from .stream_transfer import BytePipe, download_into, probe_size
 
 logger = logging.getLogger(__name__)
 
 
 class BatchProcessor:
-    def __init__(self, youtube_processor, asset_creator, comment_importer, user_randomizer):
+    def __init__(self, youtube_processor, asset_creator, comment_importer, user_randomizer, max_parallel_videos: int = 1, pipeline_workers: Optional[Dict[str, int]] = None, pipeline_queue_size: int = 2, pipeline_report_interval: float = 30.0, stream_comments: bool = False, stream_chunk_size: int = 500, live_chat_reducer: Optional[LiveChatReducer] = None, journal=None, resume: bool = False, stream_upload: bool = False, stream_buffer: int = 64 * 1024 * 1024, reuse_uploads: bool = False, disk_quota=None, refresh: bool = False):
         self.youtube_processor = youtube_processor
         self.asset_creator = asset_creator
         self.comment_importer = comment_importer
         self.user_randomizer = user_randomizer
+        self.max_parallel_videos = max(1, max_parallel_videos or 1)
+        self.pipeline_workers = pipeline_workers
+        self.pipeline_queue_size = pipeline_queue_size
+        self.pipeline_report_interval = pipeline_report_interval
+        self.stream_comments = stream_comments
+        self.stream_chunk_size = max(1, stream_chunk_size)
+        self.live_chat_reducer = live_chat_reducer or LiveChatReducer()
+        self.journal = journal
+        self.resume = resume and journal is not None
+        self.stream_upload = stream_upload
+        self.stream_buffer = stream_buffer
+        self.reuse_uploads = reuse_uploads
+        self.disk_quota = disk_quota
+        self.refresh = refresh
     
     def load_list_file(self, file_path: str, comments_only: bool = False) -> List[Dict]:
         videos = []
@@ -40,237 +63,622 @@ class BatchProcessor:
         return videos
     
     def process_video(self, video_url: str, category: str, dry_run: bool = False, video_only: bool = False, comments_only: bool = False, asset_id: str = None, max_items_limit: int = None, skip_live_chat: bool = False) -> Dict:
-        logger.info("=" * 80)
-        logger.info(f"🎬 Processing: {video_url}")
-        logger.info(f"📁 Category: {category}")
-        logger.info("=" * 80)
+        job = self._start_job(video_url, category, dry_run=dry_run, video_only=video_only, comments_only=comments_only, asset_id=asset_id, max_items_limit=max_items_limit, skip_live_chat=skip_live_chat)
+        
+        try:
+            for _, handler in self._stages():
+                handler(job)
+                if job['done']:
+                    break
+        except Exception as e:
+            self._fail_job(job, e)
+        finally:
+            self._finish_job(job)
         
-        result = {
+        return job['result']
+    
+    def _stages(self) -> List[Tuple[str, Callable[[Dict], None]]]:
+        return [
+            ('extract', self._stage_extract),
+            ('download', self._stage_download),
+            ('upload', self._stage_upload),
+            ('publish', self._stage_publish),
+        ]
+    
+    def _start_job(self, video_url: str, category: str, index: int = 0, **options) -> Dict:
+        # Released in _finish_job, which every job reaches exactly once
+        self.youtube_processor.hold_video(video_url)
+        return self._new_job(video_url, category, index=index, **options)
+    
+    @staticmethod
+    def _new_job(video_url: str, category: str, index: int = 0, **options) -> Dict:
+        return {
+            'index': index,
             'url': video_url,
             'category': category,
-            'success': False,
-            'asset_id': None,
-            'error': None,
-            'comments_imported': 0,
+            'options': options,
+            'asset_id': options.get('asset_id'),
+            'video_info': None,
+            'downloaded_file': None,
+            'disk_reservation': None,
+            'journal_entry': None,
+            'stream_plan': None,
+            'stored_asset': None,
+            'upload_session': None,
+            'done': False,
+            'result': {
+                'url': video_url,
+                'category': category,
+                'success': False,
+                'asset_id': None,
+                'error': None,
+                'comments_imported': 0,
+            },
         }
+    
+    @staticmethod
+    def _fail_job(job: Dict, error: Exception):
+        job['result']['error'] = str(error)
+        job['result']['success'] = False
+        job['done'] = True
+        logger.error(f"Processing failed for {job['url']}: {error}")
+    
+    def _cleanup_job(self, job: Dict):
+        if self.disk_quota is not None:
+            # Stored videos count against video_store.max_size_gb instead
+            self.disk_quota.release(job.get('disk_reservation'))
+            job['disk_reservation'] = None
+        downloaded_file = job.get('downloaded_file')
+        if downloaded_file and self.youtube_processor.is_stored(downloaded_file):
+            # Kept in the video store for later runs; retention decides when it goes
+            job['downloaded_file'] = None
+            return
+        if downloaded_file and os.path.exists(downloaded_file):
+            try:
+                os.remove(downloaded_file)
+                logger.info(f"🗑️  Cleaned up downloaded file: {downloaded_file}")
+            except Exception as e:
+                logger.warning(f"Failed to clean up downloaded file: {e}")
+        job['downloaded_file'] = None
+    
+    def _finish_job(self, job: Dict):
+        self._cleanup_job(job)
+        self.youtube_processor.release_video(job['url'])
+        self._journal_result(job)
+    
+    def _journal_result(self, job: Dict):
+        if self.journal is None or job['result'].get('resumed'):
+            return
+        result = job['result']
+        try:
+            if result['success']:
+                self.journal.mark_completed(job['url'], result.get('asset_id') or job['asset_id'], result.get('comments_imported', 0))
+            elif result.get('error'):
+                self.journal.mark_failed(job['url'], result['error'])
+        except Exception as e:
+            logger.warning(f"Failed to update run journal for {job['url']}: {e}")
+    
+    def _resume_entry(self, job: Dict) -> bool:
+        # Loads the journal entry for this video; True when it already completed
+        if not self.resume:
+            return False
+        entry = self.journal.get_video(job['url'])
+        job['journal_entry'] = entry
+        if not entry or not entry['completed']:
+            return False
         
-        downloaded_file = None
+        result = job['result']
+        result.update({
+            'success': True,
+            'asset_id': entry['asset_id'],
+            'comments_imported': entry['comments_imported'],
+            'resumed': True,
+        })
+        job['done'] = True
+        logger.info(f"⏭️  Already completed in a previous run: {job['url']} (asset {entry['asset_id']})")
+        return True
+    
+    @staticmethod
+    def _uploaded_asset(job: Dict) -> Optional[str]:
+        entry = job.get('journal_entry')
+        if entry and entry['upload_done'] and entry['asset_id']:
+            return entry['asset_id']
+        return None
+    
+    def _stage_extract(self, job: Dict):
+        options = job['options']
+        result = job['result']
         
-        try:
-            logger.info("[Step 1/5] Extracting video metadata...")
-            video_info = self.youtube_processor.extract_video_info(video_url)
-            logger.info(f"📹 Title: {video_info['title']}")
-            
-            if comments_only:
-                logger.info("[Mode] COMMENTS ONLY - Skipping video download/upload")
-                if not asset_id:
-                    if dry_run:
-                        asset_id = "dry-run-asset-id"
-                        logger.info(f"Using dummy asset_id for dry_run: {asset_id}")
-                    else:
-                        error_msg = "COMMENTS_ONLY mode requires asset_id in config.yaml"
-                        logger.error(f"❌ {error_msg}")
-                        result['error'] = error_msg
-                        return result
-                
-                result['asset_id'] = asset_id
-                logger.info(f"📌 Using configured asset_id: {asset_id}")
-            
-            if not comments_only:
-                logger.info("[Step 2/5] Downloading video from YouTube...")
-                downloaded_file = self.youtube_processor.download_video(video_url, output_dir="cache")
-                
-                logger.info("[Step 3/5] Getting signed URL from backend...")
-                file_name = os.path.basename(downloaded_file)
-                
-                metadata_payload = {}
-                if category:
-                    metadata_payload['categories'] = [category]
-                if video_info.get('keywords'):
-                    metadata_payload['preferredKeywords'] = video_info.get('keywords', [])
-                
-                signed_url_result = self.asset_creator.get_signed_url(
-                    file_name=file_name,
-                    asset_name=video_info['title'],
-                    asset_description=video_info['description'],
-                    metadata=metadata_payload if metadata_payload else None
-                )
-                
-                if signed_url_result.get('error'):
-                    result['error'] = f"Failed to get signed URL: {signed_url_result['error']}"
-                    return result
-                
-                upload_url = signed_url_result['upload_url']
-                asset_id = signed_url_result['asset_id']
-                result['asset_id'] = asset_id
-                logger.info(f"✅ Got signed URL for asset: {asset_id}")
-                
-                logger.info("[Step 4/5] Uploading video file to signed URL...")
-                upload_result = self.asset_creator.upload_file_to_signed_url(
-                    file_path=downloaded_file,
-                    upload_url=upload_url
-                )
-                
-                if not upload_result.get('success'):
-                    result['error'] = f"Upload failed: {upload_result.get('error', 'Unknown error')}"
-                    return result
-                
-                logger.info("✅ Video uploaded successfully!")
-                
-                try:
-                    if os.path.exists(downloaded_file):
-                        os.remove(downloaded_file)
-                        logger.info(f"🗑️  Cleaned up downloaded file: {downloaded_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to clean up downloaded file: {e}")
-                
-                if video_only:
-                    logger.info("[Mode] VIDEO ONLY - Skipping comments import")
-                    result['success'] = True
-                    logger.info("✅ Video upload complete!")
-                    return result
-            
-            livechat_imported = 0
-            
-            if skip_live_chat:
-                logger.info("[Step 5/5] Skipping live chat extraction (skip_live_chat=true)")
-            else:
-                logger.info("[Step 5/5] Extracting and importing live chats...")
-                live_chats, livechat_stats = self.youtube_processor.extract_live_chat(video_url)
-                
-                if live_chats:
-                    original_count = len(live_chats)
-                    if max_items_limit and max_items_limit > 0 and original_count > max_items_limit:
-                        live_chats = live_chats[:max_items_limit]
-                        logger.info(f"📊 Limiting live chats to first {max_items_limit} (out of {original_count} total)")
-                    
-                    live_chats = self.user_randomizer.anonymize_comments(live_chats)
-                    
-                    if dry_run:
-                        logger.info(f"📊 DRY RUN: Found {len(live_chats)} live chat messages (showing import-ready data)...")
-                    else:
-                        logger.info(f"📊 Processing {len(live_chats)} live chat messages...")
-                    
-                        if comments_only and not dry_run and result.get('asset_id'):
-                            target_asset_id = result['asset_id']
-                        else:
-                            target_asset_id = result.get('asset_id') or asset_id
-                        
-                    livechat_stats_result = self.comment_importer.import_live_chats(
-                        live_chats, 
-                            target_asset_id
-                    )
-                    livechat_imported = livechat_stats_result['imported']
-                    logger.info(f"✅ Live chats processed: {livechat_stats_result['imported']}/{livechat_stats_result['total']}")
+        if self._resume_entry(job):
+            return
+        
+        logger.info("=" * 80)
+        logger.info(f"🎬 Processing: {job['url']}")
+        logger.info(f"📁 Category: {job['category']}")
+        logger.info("=" * 80)
+        
+        if self.refresh:
+            self.youtube_processor.invalidate_cache(job['url'])
+            forgotten = self.youtube_processor.forget_stored_uploads(job['url'], self.asset_creator.backend_url)
+            if forgotten:
+                logger.info(f"🔄 Forgot stored upload(s) {', '.join(forgotten)}; the stored file will be uploaded again")
+        
+        logger.info("[Step 1/5] Extracting video metadata...")
+        # Metadata only: comments are fetched in the publish stage, so a large
+        # comment section doesn't hold up the download and upload of the
+        # videos queued behind it
+        job['video_info'] = self.youtube_processor.extract_video_info(job['url'])
+        logger.info(f"📹 Title: {job['video_info']['title']}")
+        
+        if options.get('comments_only'):
+            logger.info("[Mode] COMMENTS ONLY - Skipping video download/upload")
+            if not job['asset_id']:
+                if options.get('dry_run'):
+                    job['asset_id'] = "dry-run-asset-id"
+                    logger.info(f"Using dummy asset_id for dry_run: {job['asset_id']}")
                 else:
-                    logger.info("No live chat available for this video")
-            
-            logger.info("[Step 5/5] Extracting and importing comments (with timestamps only)...")
-            comments, timestamp_stats = self.youtube_processor.extract_comments(video_url)
-            
-            comments_with_timestamp = []
-            parent_ids_needed = {}
-            
-            for comment in comments:
-                timestamp = int(comment.get('commented_at', '0') or '0')
-                if timestamp > 0:
-                    comments_with_timestamp.append(comment)
-                    parent_id = comment.get('parent_id')
-                    if parent_id:
-                        if parent_id not in parent_ids_needed or timestamp < parent_ids_needed[parent_id]:
-                            parent_ids_needed[parent_id] = timestamp
+                    error_msg = "COMMENTS_ONLY mode requires asset_id in config.yaml"
+                    logger.error(f"❌ {error_msg}")
+                    result['error'] = error_msg
+                    job['done'] = True
+                    return
             
-            yt_ids_in_list = {c.get('yt_id') for c in comments_with_timestamp}
-            for comment in comments:
-                yt_id = comment.get('yt_id')
-                if yt_id in parent_ids_needed and yt_id not in yt_ids_in_list:
-                    comment['commented_at'] = str(parent_ids_needed[yt_id])
-                    comments_with_timestamp.append(comment)
-                    yt_ids_in_list.add(yt_id)
-            
-            comment_order = {c.get('yt_id'): idx for idx, c in enumerate(comments)}
-            comments_with_timestamp.sort(key=lambda c: comment_order.get(c.get('yt_id'), 0))
-            
-            result['timestamp_stats'] = timestamp_stats
-            result['timestamp_stats']['filtered'] = len(comments_with_timestamp)
-            result['timestamp_stats']['livechat_imported'] = livechat_imported
+            result['asset_id'] = job['asset_id']
+            logger.info(f"📌 Using configured asset_id: {job['asset_id']}")
+    
+    def _stage_download(self, job: Dict):
+        if job['options'].get('comments_only'):
+            return
+        
+        if self._uploaded_asset(job):
+            logger.info("[Step 2/5] Video already uploaded in a previous run, skipping download")
+            return
+        
+        if self.reuse_uploads:
+            job['stored_asset'] = self.youtube_processor.stored_asset(job['url'], self.asset_creator.backend_url)
+            if job['stored_asset']:
+                logger.info(f"[Step 2/5] Identical video already uploaded as asset {job['stored_asset']}, skipping download")
+                return
+        
+        if self.stream_upload and not job['options'].get('dry_run'):
+            try:
+                plan = self.youtube_processor.plan_stream(job['url'], output_dir="cache")
+            except Exception as e:
+                logger.warning(f"⚠️  Could not plan a streaming transfer ({e}), downloading to disk first")
+                plan = None
+            if plan:
+                job['stream_plan'] = plan
+                job['result']['format'] = self.youtube_processor.format_choice(job['url'])
+                logger.info(f"[Step 2/5] Streaming format {plan['format_id']} straight into the upload")
+                return
+        
+        logger.info("[Step 2/5] Downloading video from YouTube...")
+        self._download(job)
+        job['result']['format'] = self.youtube_processor.format_choice(job['url'])
+    
+    def _download(self, job: Dict, reserve: bool = True):
+        if reserve and self.disk_quota is not None and job['disk_reservation'] is None:
+            estimated = self.youtube_processor.estimate_download(job['url'], output_dir="cache")
+            if estimated != 0:
+                job['disk_reservation'] = self.disk_quota.reserve(job['url'], estimated)
+        job['downloaded_file'] = self.youtube_processor.download_video(job['url'], output_dir="cache")
+        if job['disk_reservation'] is not None:
+            self.disk_quota.resize(job['disk_reservation'], os.path.getsize(job['downloaded_file']))
+    
+    def _stage_upload(self, job: Dict):
+        options = job['options']
+        if options.get('comments_only'):
+            return
+        
+        result = job['result']
+        video_info = job['video_info']
+        
+        uploaded_asset = self._uploaded_asset(job)
+        if uploaded_asset:
+            job['asset_id'] = uploaded_asset
+            result['asset_id'] = uploaded_asset
+            logger.info(f"[Step 3-4/5] Reusing asset {uploaded_asset} uploaded in a previous run")
+            self._finish_video_only(job)
+            return
+        
+        stored_asset = job.get('stored_asset')
+        if stored_asset:
+            job['asset_id'] = stored_asset
+            result['asset_id'] = stored_asset
+            logger.info(f"[Step 3-4/5] Skipping upload: the video store has these exact bytes on asset {stored_asset}")
+            if self.journal is not None:
+                self.journal.record_asset(job['url'], job['category'], stored_asset, None)
+                self.journal.mark_upload_done(job['url'])
+            self._finish_video_only(job)
+            return
+        
+        entry = job.get('journal_entry')
+        if entry and entry['asset_id'] and entry['upload_url']:
+            # Retry the interrupted upload into the asset created last time;
+            # only if the signed URL no longer works is a new asset created
+            logger.info(f"[Step 3/5] Resuming upload into asset {entry['asset_id']} from a previous run...")
+            upload_result = self._upload_video(job, entry['upload_url'], session_uri=entry.get('upload_session'))
+            if upload_result.get('success'):
+                job['asset_id'] = entry['asset_id']
+                result['asset_id'] = job['asset_id']
+                self._upload_done(job)
+                return
+            logger.warning(f"⚠️  Stored upload URL failed ({upload_result.get('error', 'Unknown error')}), requesting a new one")
+        
+        logger.info("[Step 3/5] Getting signed URL from backend...")
+        plan = job.get('stream_plan')
+        file_name = f"{plan['video_id']}.{plan['ext']}" if plan else os.path.basename(job['downloaded_file'])
+        
+        metadata_payload = {}
+        if job['category']:
+            metadata_payload['categories'] = [job['category']]
+        if video_info.get('keywords'):
+            metadata_payload['preferredKeywords'] = video_info.get('keywords', [])
+        
+        signed_url_result = self.asset_creator.get_signed_url(
+            file_name=file_name,
+            asset_name=video_info['title'],
+            asset_description=video_info['description'],
+            metadata=metadata_payload if metadata_payload else None
+        )
+        
+        if signed_url_result.get('error'):
+            result['error'] = f"Failed to get signed URL: {signed_url_result['error']}"
+            job['done'] = True
+            return
+        
+        upload_url = signed_url_result['upload_url']
+        job['asset_id'] = signed_url_result['asset_id']
+        result['asset_id'] = job['asset_id']
+        logger.info(f"✅ Got signed URL for asset: {job['asset_id']}")
+        if self.journal is not None:
+            self.journal.record_asset(job['url'], job['category'], job['asset_id'], upload_url)
+        
+        logger.info("[Step 4/5] Uploading video file to signed URL...")
+        upload_result = self._upload_video(job, upload_url)
+        
+        if not upload_result.get('success'):
+            result['error'] = f"Upload failed: {upload_result.get('error', 'Unknown error')}"
+            job['done'] = True
+            return
+        
+        self._upload_done(job)
+    
+    def _upload_video(self, job: Dict, upload_url: str, session_uri: Optional[str] = None) -> Dict:
+        plan = job.get('stream_plan')
+        if plan:
+            job['stream_plan'] = None
+            upload_result = self._stream_upload(job, plan, upload_url, session_uri)
+            if upload_result.get('success'):
+                return upload_result
+            logger.warning(f"⚠️  Streaming transfer failed ({upload_result.get('error', 'Unknown error')}), falling back to download then upload")
+            # No disk reservation here: this runs on an upload worker, and the
+            # reservations it would wait for belong to jobs queued behind it
+            self._download(job, reserve=False)
+            session_uri = job.get('upload_session')
+        
+        return self.asset_creator.upload_file_to_signed_url(
+            file_path=job['downloaded_file'],
+            upload_url=upload_url,
+            session_uri=session_uri,
+            on_session=self._session_recorder(job)
+        )
+    
+    def _stream_upload(self, job: Dict, plan: Dict, upload_url: str, session_uri: Optional[str]) -> Dict:
+        # Download and upload overlap through a bounded pipe: at most
+        # stream_buffer bytes of the video are ever held, none on disk
+        try:
+            size = plan['filesize'] or probe_size(plan['url'], plan['http_headers'])
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+        
+        pipe = BytePipe(size, capacity=self.stream_buffer)
+        engine = self.youtube_processor.download_engine
+        downloader = threading.Thread(
+            target=download_into,
+            args=(pipe, plan['url'], plan['http_headers']),
+            kwargs={'throttle': engine.throttle if engine is not None else None},
+            name=f"stream-{plan['video_id']}",
+            daemon=True
+        )
+        started = time.monotonic()
+        downloader.start()
+        try:
+            upload_result = self.asset_creator.upload_stream_to_signed_url(
+                pipe,
+                size,
+                upload_url,
+                content_type=mimetypes.guess_type(f"video.{plan['ext']}")[0] or 'video/mp4',
+                session_uri=session_uri,
+                on_session=self._session_recorder(job)
+            )
+        finally:
+            pipe.abort()
+            downloader.join()
+        
+        if upload_result.get('success'):
+            elapsed = max(time.monotonic() - started, 1e-6)
+            logger.info(f"📡 Streamed {size / (1024*1024):.1f} MB in {elapsed:.1f}s ({size / (1024*1024) / elapsed:.1f} MB/s, download and upload overlapped)")
+        return upload_result
+    
+    def _session_recorder(self, job: Dict) -> Callable[[str], None]:
+        # Resumable uploads persist their session URI so a restarted run
+        # continues the transfer instead of sending the file again
+        def record(session_uri: str):
+            job['upload_session'] = session_uri
+            if self.journal is not None:
+                self.journal.record_upload_session(job['url'], session_uri)
+        return record
+    
+    def _upload_done(self, job: Dict):
+        logger.info("✅ Video uploaded successfully!")
+        if self.journal is not None:
+            self.journal.mark_upload_done(job['url'])
+        if job['downloaded_file']:
+            self.youtube_processor.record_stored_upload(job['url'], self.asset_creator.backend_url, job['asset_id'])
+        self._cleanup_job(job)
+        self._finish_video_only(job)
+    
+    @staticmethod
+    def _finish_video_only(job: Dict):
+        result = job['result']
+        if job['options'].get('video_only'):
+            logger.info("[Mode] VIDEO ONLY - Skipping comments import")
+            result['success'] = True
+            job['done'] = True
+            logger.info("✅ Video upload complete!")
+    
+    def _stage_publish(self, job: Dict):
+        options = job['options']
+        result = job['result']
+        video_url = job['url']
+        dry_run = options.get('dry_run')
+        max_items_limit = options.get('max_items_limit')
+        target_asset_id = result.get('asset_id') or job['asset_id']
+        
+        livechat_imported = 0
+        livechat_reduction = None
+        
+        if options.get('skip_live_chat'):
+            logger.info("[Step 5/5] Skipping live chat extraction (skip_live_chat=true)")
+        else:
+            logger.info("[Step 5/5] Extracting and importing live chats...")
+            live_chats, livechat_reduction = self.live_chat_reducer.reduce(
+                self.youtube_processor.iter_live_chats(video_url), limit=max_items_limit
+            )
             
-            if comments_with_timestamp:
-                original_count = len(comments_with_timestamp)
-                if max_items_limit and max_items_limit > 0 and original_count > max_items_limit:
-                    comments_with_timestamp = comments_with_timestamp[:max_items_limit]
-                    logger.info(f"📊 Limiting comments to first {max_items_limit} (out of {original_count} total)")
-                
-                comments_with_timestamp = self.user_randomizer.anonymize_comments(comments_with_timestamp)
+            if live_chats:
+                live_chats = self.user_randomizer.anonymize_comments(live_chats)
                 
                 if dry_run:
-                    logger.info(f"📊 DRY RUN: Found {len(comments_with_timestamp)} comments with timestamps (filtered from {len(comments)} total, showing import-ready data)...")
+                    logger.info(f"📊 DRY RUN: Found {len(live_chats)} live chat messages (showing import-ready data)...")
                 else:
-                    logger.info(f"📊 Processing {len(comments_with_timestamp)} comments with timestamps (filtered from {len(comments)} total)...")
+                    logger.info(f"📊 Processing {len(live_chats)} live chat messages...")
                 
-                if comments_only and not dry_run and result.get('asset_id'):
-                    target_asset_id = result['asset_id']
-                else:
-                    target_asset_id = result.get('asset_id') or asset_id
-                
-                comment_stats = self.comment_importer.import_comments(
-                    comments_with_timestamp, 
+                livechat_stats_result = self.comment_importer.import_live_chats(
+                    live_chats, 
                     target_asset_id
                 )
-                result['comments_imported'] = comment_stats['imported']
-                logger.info(f"✅ Comments processed: {comment_stats['imported']}/{comment_stats['total']}")
+                livechat_imported = livechat_stats_result['imported'] + livechat_stats_result.get('skipped', 0)
+                logger.info(f"✅ Live chats processed: {livechat_stats_result['imported']}/{livechat_stats_result['total']}")
             else:
-                logger.warning(f"⚠️  No comments with timestamps to import (found {len(comments)} total comments)")
-                result['comments_imported'] = 0
+                livechat_reduction = None
+                logger.info("No live chat available for this video")
+        
+        logger.info("[Step 5/5] Extracting and importing comments (with timestamps only)...")
+        if self.stream_comments:
+            self._publish_comment_stream(job, target_asset_id, livechat_imported, livechat_reduction)
+            return
+        
+        comments, timestamp_stats = self.youtube_processor.extract_comments(video_url)
+        
+        comments_with_timestamp = []
+        parent_ids_needed = {}
+        
+        for comment in comments:
+            timestamp = int(comment.get('commented_at', '0') or '0')
+            if timestamp > 0:
+                comments_with_timestamp.append(comment)
+                parent_id = comment.get('parent_id')
+                if parent_id:
+                    if parent_id not in parent_ids_needed or timestamp < parent_ids_needed[parent_id]:
+                        parent_ids_needed[parent_id] = timestamp
+        
+        yt_ids_in_list = {c.get('yt_id') for c in comments_with_timestamp}
+        for comment in comments:
+            yt_id = comment.get('yt_id')
+            if yt_id in parent_ids_needed and yt_id not in yt_ids_in_list:
+                comment['commented_at'] = str(parent_ids_needed[yt_id])
+                comments_with_timestamp.append(comment)
+                yt_ids_in_list.add(yt_id)
+        
+        comment_order = {c.get('yt_id'): idx for idx, c in enumerate(comments)}
+        comments_with_timestamp.sort(key=lambda c: comment_order.get(c.get('yt_id'), 0))
+        
+        result['timestamp_stats'] = timestamp_stats
+        result['timestamp_stats']['filtered'] = len(comments_with_timestamp)
+        result['timestamp_stats']['livechat_imported'] = livechat_imported
+        if livechat_reduction:
+            result['timestamp_stats']['livechat_reduction'] = livechat_reduction
+        
+        if comments_with_timestamp:
+            original_count = len(comments_with_timestamp)
+            if max_items_limit and max_items_limit > 0 and original_count > max_items_limit:
+                comments_with_timestamp = comments_with_timestamp[:max_items_limit]
+                logger.info(f"📊 Limiting comments to first {max_items_limit} (out of {original_count} total)")
             
-            result['success'] = True
-            logger.info("✅ Video processing complete!")
+            comments_with_timestamp = self.user_randomizer.anonymize_comments(comments_with_timestamp)
             
-        except Exception as e:
-            result['error'] = str(e)
-            result['success'] = False
-            logger.error(f"Processing failed for {video_url}: {e}")
-        finally:
-            if downloaded_file and os.path.exists(downloaded_file):
-                try:
-                    os.remove(downloaded_file)
-                    logger.info(f"🗑️  Cleaned up downloaded file: {downloaded_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to clean up downloaded file: {e}")
+            if dry_run:
+                logger.info(f"📊 DRY RUN: Found {len(comments_with_timestamp)} comments with timestamps (filtered from {len(comments)} total, showing import-ready data)...")
+            else:
+                logger.info(f"📊 Processing {len(comments_with_timestamp)} comments with timestamps (filtered from {len(comments)} total)...")
+            
+            comment_stats = self.comment_importer.import_comments(
+                comments_with_timestamp, 
+                target_asset_id
+            )
+            result['comments_imported'] = comment_stats['imported'] + comment_stats.get('skipped', 0)
+            result['timestamp_stats']['orphaned_replies'] = comment_stats.get('orphaned', 0)
+            result['publish_waves'] = comment_stats.get('waves', [])
+            logger.info(f"✅ Comments processed: {comment_stats['imported']}/{comment_stats['total']}")
+        else:
+            logger.warning(f"⚠️  No comments with timestamps to import (found {len(comments)} total comments)")
+            result['comments_imported'] = 0
+        
+        result['success'] = True
+        job['done'] = True
+        logger.info("✅ Video processing complete!")
+    
+    def _publish_comment_stream(self, job: Dict, target_asset_id: str, livechat_imported: int, livechat_reduction: Optional[Dict] = None):
+        # parse -> timestamp filter -> limit -> anonymize -> publish, one
+        # comment thread at a time; only a chunk is ever held in memory
+        options = job['options']
+        result = job['result']
+        max_items_limit = options.get('max_items_limit')
+        
+        timestamp_stats = {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0, 'with_replies': 0}
+        filtered = {'count': 0}
+        
+        def count(comment: Dict) -> Dict:
+            filtered['count'] += 1
+            return comment
+        
+        stream = filter_timestamped(group_threads(self.youtube_processor.iter_comments(job['url'], timestamp_stats)))
+        if max_items_limit and max_items_limit > 0:
+            stream = limit_items(stream, max_items_limit)
+        stream = (self.user_randomizer.anonymize_comment(count(comment)) for comment in stream)
         
-        return result
+        logger.info(f"📊 Streaming comments with timestamps in chunks of {self.stream_chunk_size}...")
+        comment_stats = self.comment_importer.import_comment_stream(
+            stream,
+            target_asset_id,
+            chunk_size=self.stream_chunk_size
+        )
+        
+        result['timestamp_stats'] = timestamp_stats
+        result['timestamp_stats']['filtered'] = filtered['count']
+        result['timestamp_stats']['livechat_imported'] = livechat_imported
+        if livechat_reduction:
+            result['timestamp_stats']['livechat_reduction'] = livechat_reduction
+        result['timestamp_stats']['orphaned_replies'] = comment_stats.get('orphaned', 0)
+        result['comments_imported'] = comment_stats['imported'] + comment_stats.get('skipped', 0)
+        result['publish_waves'] = comment_stats.get('waves', [])
+        
+        if filtered['count']:
+            logger.info(f"✅ Comments processed: {comment_stats['imported']}/{comment_stats['total']} (filtered from {timestamp_stats['total']} total)")
+        else:
+            logger.warning(f"⚠️  No comments with timestamps to import (found {timestamp_stats['total']} total comments)")
+        
+        result['success'] = True
+        job['done'] = True
+        logger.info("✅ Video processing complete!")
     
     def process_list(self, list_file: str, dry_run: bool = False, video_only: bool = False, comments_only: bool = False, max_items_limit: int = None, asset_id: str = None, skip_live_chat: bool = False) -> List[Dict]:
         videos = self.load_list_file(list_file, comments_only=comments_only)
-        results = []
         
-        logger.info(f"\n🚀 Starting batch processing: {len(videos)} videos\n")
+        video_kwargs = {
+            'dry_run': dry_run,
+            'video_only': video_only,
+            'comments_only': comments_only,
+            'asset_id': asset_id,
+            'max_items_limit': max_items_limit,
+            'skip_live_chat': skip_live_chat,
+        }
         
-        for idx, video in enumerate(videos, 1):
-            logger.info(f"\n[{idx}/{len(videos)}] Processing {video['url']}")
-            
-            result = self.process_video(
-                video_url=video['url'],
-                category=video['category'],
-                dry_run=dry_run,
-                video_only=video_only,
-                comments_only=comments_only,
-                asset_id=asset_id,
-                max_items_limit=max_items_limit,
-                skip_live_chat=skip_live_chat
-            )
-            
-            results.append(result)
-            
-            if result['success']:
-                logger.info(f"✓ Success: {result['asset_id']}, {result['comments_imported']} comments")
-            else:
-                logger.error(f"✗ Failed: {result['error']}")
+        workers = min(self.max_parallel_videos, len(videos))
+        if self.pipeline_workers and videos:
+            logger.info(f"\n🚀 Starting batch processing: {len(videos)} videos (staged pipeline)\n")
+            results = self._process_pipeline(videos, video_kwargs)
+        elif workers > 1:
+            logger.info(f"\n🚀 Starting batch processing: {len(videos)} videos ({workers} in parallel)\n")
+            results = self._process_parallel(videos, workers, video_kwargs)
+        else:
+            logger.info(f"\n🚀 Starting batch processing: {len(videos)} videos\n")
+            results = []
+            for idx, video in enumerate(videos, 1):
+                logger.info(f"\n[{idx}/{len(videos)}] Processing {video['url']}")
+                result = self.process_video(video_url=video['url'], category=video['category'], **video_kwargs)
+                results.append(result)
+                self._log_result(result)
         
         self._print_summary(results)
         
         return results
     
+    def _process_parallel(self, videos: List[Dict], workers: int, video_kwargs: Dict) -> List[Dict]:
+        results: List[Dict] = [None] * len(videos)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='video') as executor:
+            futures = {}
+            for idx, video in enumerate(videos):
+                future = executor.submit(
+                    self.process_video,
+                    video_url=video['url'],
+                    category=video['category'],
+                    **video_kwargs
+                )
+                futures[future] = idx
+            
+            done = 0
+            for future in as_completed(futures):
+                idx = futures[future]
+                video = videos[idx]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Processing failed for {video['url']}: {e}", exc_info=True)
+                    result = {
+                        'url': video['url'],
+                        'category': video['category'],
+                        'success': False,
+                        'asset_id': None,
+                        'error': str(e),
+                        'comments_imported': 0,
+                    }
+                results[idx] = result
+                done += 1
+                logger.info(f"\n[{done}/{len(videos)}] Finished {video['url']} (list position {idx + 1})")
+                self._log_result(result)
+        
+        return results
+    
+    def _process_pipeline(self, videos: List[Dict], video_kwargs: Dict) -> List[Dict]:
+        results: List[Dict] = [None] * len(videos)
+        completed = [0]
+        lock = threading.Lock()
+        
+        def on_complete(job: Dict):
+            self._finish_job(job)
+            with lock:
+                results[job['index']] = job['result']
+                completed[0] += 1
+            logger.info(f"\n[{completed[0]}/{len(videos)}] Finished {job['url']} (list position {job['index'] + 1})")
+            self._log_result(job['result'])
+        
+        pipeline = StagedPipeline(
+            stages=[(name, handler, self.pipeline_workers.get(name, 1)) for name, handler in self._stages()],
+            on_complete=on_complete,
+            on_error=self._fail_job,
+            queue_size=self.pipeline_queue_size,
+            report_interval=self.pipeline_report_interval
+        )
+        
+        jobs = (
+            self._start_job(video['url'], video['category'], index=idx, **video_kwargs)
+            for idx, video in enumerate(videos)
+        )
+        pipeline.run(jobs)
+        
+        return results
+    
+    @staticmethod
+    def _log_result(result: Dict):
+        if result['success']:
+            logger.info(f"✓ Success: {result['asset_id']}, {result['comments_imported']} comments")
+        else:
+            logger.error(f"✗ Failed: {result['error']}")
+    
     @staticmethod
     def _print_summary(results: List[Dict]):
         total = len(results)
@@ -285,6 +693,9 @@ class BatchProcessor:
         total_comments_processed = sum(r.get('timestamp_stats', {}).get('total', 0) for r in results)
         total_filtered = sum(r.get('timestamp_stats', {}).get('filtered', 0) for r in results)
         total_livechat = sum(r.get('timestamp_stats', {}).get('livechat_imported', 0) for r in results)
+        total_orphaned = sum(r.get('timestamp_stats', {}).get('orphaned_replies', 0) for r in results)
+        livechat_before = sum((r.get('timestamp_stats', {}).get('livechat_reduction') or {}).get('before', 0) for r in results)
+        livechat_after = sum((r.get('timestamp_stats', {}).get('livechat_reduction') or {}).get('after', 0) for r in results)
         
         logger.info("\n" + "=" * 80)
         logger.info("📊 TIMESTAMP DETECTION SUMMARY")
@@ -293,7 +704,10 @@ class BatchProcessor:
         logger.info(f"   ✗ Comments without timestamp: {total_without_timestamp}")
         logger.info(f"   📤 Comments published (filtered): {total_filtered}")
         logger.info(f"   💬 Live chat messages published: {total_livechat}")
+        if livechat_before:
+            logger.info(f"   ✂️  Live chat reduced: {livechat_before} -> {livechat_after} before import")
         logger.info(f"   💬 With replies: {total_with_replies}")
+        logger.info(f"   ⏭️  Replies skipped (parent failed): {total_orphaned}")
         logger.info(f"   Total comments processed: {total_comments_processed}")
         logger.info("=" * 80)
         
@@ -303,5 +717,25 @@ class BatchProcessor:
         logger.info(f"Total videos: {total}")
         logger.info(f"✅ Successful: {successful}")
         logger.info(f"❌ Failed: {failed}")
+        resumed = sum(1 for r in results if r.get('resumed'))
+        if resumed:
+            logger.info(f"⏭️  Already complete (resumed): {resumed}")
         logger.info(f"💬 Total comments imported: {total_comments}")
         logger.info("=" * 80)
+        
+        choices = [r['format'] for r in results if r.get('format')]
+        if choices:
+            logger.info("\n" + "=" * 80)
+            logger.info("🎞️  FORMAT SELECTION SUMMARY")
+            logger.info("=" * 80)
+            for rule in sorted({c['rule'] for c in choices}):
+                picked = [c for c in choices if c['rule'] == rule]
+                estimated = sum(c['estimated_bytes'] or 0 for c in picked)
+                logger.info(f"   {rule}: {len(picked)} video(s), ~{estimated / (1024*1024):.1f} MB")
+            compared = [c for c in choices if c['estimated_bytes'] and c['baseline_bytes']]
+            if compared:
+                chosen = sum(c['estimated_bytes'] for c in compared)
+                baseline = sum(c['baseline_bytes'] for c in compared)
+                difference = f"saved ~{(baseline - chosen) / (1024*1024):.1f} MB" if baseline >= chosen else f"~{(chosen - baseline) / (1024*1024):.1f} MB more"
+                logger.info(f"   Estimated download: ~{chosen / (1024*1024):.1f} MB vs ~{baseline / (1024*1024):.1f} MB with the fixed selector ({difference})")
+            logger.info("=" * 80)
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 logger = logging.getLogger(__name__)
 
 
-def cleanup_cache_files(days_old: int = 30, pattern: str = None):
+def cleanup_cache_files(days_old: int = 30, pattern: str = None, metadata_ttl_hours: float = 0):
     if days_old <= 0:
         logger.warning("Cache cleanup disabled (days_old <= 0)")
         return 0
@@ -21,21 +21,68 @@ def cleanup_cache_files(days_old: int = 30, pattern: str = None):
     cutoff_time = datetime.now() - timedelta(days=days_old)
     deleted_count = 0
     
-    patterns = [pattern] if pattern else ["comments_cache_*.json", "livechat_cache_*.json"]
+    if metadata_ttl_hours > 0 and not pattern:
+        deleted_count += _cleanup_before(cache_dir, "metadata_cache_*.json", datetime.now() - timedelta(hours=metadata_ttl_hours))
+    
+    patterns = [pattern] if pattern else ["comments_cache_*.json", "comments_cache_*.jsonl.gz", "livechat_cache_*.json", "livechat_cache_*.jsonl.gz", "info_cache_*.json", "metadata_cache_*.json", "*.live_chat.json", "*.live_chat.json.part"]
     
     for pattern_item in patterns:
-        for cache_file in cache_dir.glob(pattern_item):
-            try:
-                file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-                if file_time < cutoff_time:
-                    cache_file.unlink()
-                    deleted_count += 1
-                    logger.debug(f"Deleted old cache file: {cache_file}")
-            except Exception as e:
-                logger.warning(f"Error deleting cache file {cache_file}: {e}")
+        deleted_count += _cleanup_before(cache_dir, pattern_item, cutoff_time)
+    
+    if not pattern:
+        deleted_count += _cleanup_parsed_live_chats(cache_dir)
     
     if deleted_count > 0:
-        logger.info(f"Cleaned up {deleted_count} cache file(s) older than {days_old} days")
+        logger.info(f"Cleaned up {deleted_count} expired cache file(s)")
     
     return deleted_count
 
+
+def _cleanup_before(cache_dir: Path, pattern: str, cutoff_time: datetime) -> int:
+    deleted_count = 0
+    for cache_file in cache_dir.glob(pattern):
+        try:
+            file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
+            if file_time < cutoff_time:
+                cache_file.unlink()
+                deleted_count += 1
+                logger.debug(f"Deleted old cache file: {cache_file}")
+        except Exception as e:
+            logger.warning(f"Error deleting cache file {cache_file}: {e}")
+    return deleted_count
+
+
+def _cleanup_parsed_live_chats(cache_dir: Path) -> int:
+    # Raw replay downloads are only kept until their messages are cached
+    deleted_count = 0
+    for raw_file in cache_dir.glob("*.live_chat.json"):
+        video_id = raw_file.name[:-len(".live_chat.json")]
+        if not (cache_dir / f"livechat_cache_{video_id}.jsonl.gz").exists():
+            continue
+        try:
+            raw_file.unlink()
+            deleted_count += 1
+            logger.debug(f"Deleted parsed live chat download: {raw_file}")
+        except Exception as e:
+            logger.warning(f"Error deleting cache file {raw_file}: {e}")
+    return deleted_count
+
+
+def invalidate_video_cache(video_id: str, cache_dir: str = "cache") -> int:
+    cache_path = Path(cache_dir)
+    if not cache_path.exists():
+        return 0
+    
+    deleted_count = 0
+    names = [f"{prefix}{video_id}.*" for prefix in ("comments_cache_", "livechat_cache_", "info_cache_", "metadata_cache_")]
+    names.append(f"{video_id}.live_chat.json*")
+    for name in names:
+        for cache_file in cache_path.glob(name):
+            try:
+                cache_file.unlink()
+                deleted_count += 1
+                logger.debug(f"Invalidated cache file: {cache_file}")
+            except Exception as e:
+                logger.warning(f"Error deleting cache file {cache_file}: {e}")
+    
+    return deleted_count
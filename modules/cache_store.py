@@ -0,0 +1,81 @@
+"""Helpers for versioned, atomically written cache files"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = None):
+    # Write to a per-writer temp file, then rename: readers never see a
+    # partial file and concurrent writers simply last-write-win.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_file, path)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+
+def write_versioned(path: Path, version: int, key: str, data: Any):
+    atomic_write_json(path, {
+        'version': version,
+        'key': key,
+        'cached_at': time.time(),
+        'data': data,
+    })
+
+
+def read_versioned(path: Path, version: int, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            cached = json.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache file {path}: {e}")
+        return None
+
+    if cached.get('version') != version or cached.get('key') != key:
+        return None
+    if ttl is not None and ttl > 0 and time.time() - cached.get('cached_at', 0) > ttl:
+        return None
+    return cached.get('data')
+
+
+def write_jsonl_gz(path: Path, header: Dict, records: Iterable[Dict]) -> int:
+    # First line is the header, then one compact JSON record per line
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    count = 0
+    try:
+        with gzip.open(tmp_file, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(json.dumps(header, separators=(',', ':')) + '\n')
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+                count += 1
+        os.replace(tmp_file, path)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+    return count
+
+
+def iter_jsonl_gz(path: Path) -> Iterator[Dict]:
+    # Yields the header first, then each record; close() releases the file
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
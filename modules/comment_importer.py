@@ -2,24 +2,50 @@
 
 import json
 import logging
+import threading
 import time
 import requests
 import base64
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .adaptive_concurrency import AdaptiveConcurrencyController, parse_retry_after
+from .comment_ledger import CommentLedger
+from .comment_scheduler import CommentScheduler
+from .comment_stream import chunked
+from .http_client import get_session
+from .rate_limiter import TokenBucket
 from .retry import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
 
 class CommentImporter:
-    def __init__(self, publish_url: str, jwt_token: str, refresh_token: Optional[str] = None, dry_run: bool = False):
+    TOKEN_CHECK_INTERVAL = 50
+    BATCH_SHARED_FIELDS = ('asset_id', 'pubnub_channel', 'skip_banter', 'skip_pubnub')
+    # Responses meaning "this endpoint doesn't do batches" rather than "this batch failed"
+    BATCH_UNSUPPORTED_STATUSES = (400, 404, 405, 413, 415, 422, 501)
+    # Wait before retrying a 429 that came without a Retry-After header
+    THROTTLE_RETRY_DELAY = 2.0
+    MAX_RETRY_AFTER = 60.0
+    
+    def __init__(self, publish_url: str, jwt_token: str, refresh_token: Optional[str] = None, dry_run: bool = False, engine: str = 'sync', max_in_flight: int = 8, rate_limiter: Optional[TokenBucket] = None, concurrency: Optional[AdaptiveConcurrencyController] = None, batch_size: int = 1, batch_linger: float = 0.05, publish_batch_url: Optional[str] = None, ledger: Optional[CommentLedger] = None):
         self.publish_url = publish_url
         self.jwt_token = jwt_token
         self.refresh_token = refresh_token
         self.dry_run = dry_run
+        self.engine = engine
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_limiter = rate_limiter or TokenBucket.from_interval(0.5)
+        self.concurrency = concurrency
+        self.batch_size = max(1, batch_size)
+        self.batch_linger = max(0.0, batch_linger)
+        self.publish_batch_url = publish_batch_url or publish_url.rstrip('/') + '/batch'
+        self._batch_supported = True
+        self.ledger = ledger
         self.imported_count = 0
         self.failed_count = 0
         self.backend_url = None
+        self._stats_lock = threading.Lock()
+        self._token_lock = threading.Lock()
     
     def set_backend_url(self, backend_url: str):
         self.backend_url = backend_url.rstrip('/') + '/graphql/'
@@ -50,7 +76,15 @@ class CommentImporter:
         
         return expires_in < threshold_seconds
     
-    def _refresh_token(self) -> bool:
+    def _refresh_token(self, stale_token: Optional[str] = None) -> bool:
+        # Serialize refreshes across videos processed in parallel; if another
+        # thread already replaced the token we were using, reuse its result.
+        with self._token_lock:
+            if stale_token and self.jwt_token != stale_token:
+                return True
+            return self._do_refresh_token()
+    
+    def _do_refresh_token(self) -> bool:
         if not self.backend_url:
             logger.warning("Cannot refresh token: backend_url not set")
             return False
@@ -81,7 +115,7 @@ class CommentImporter:
         
         try:
             # Only send refresh token cookie - don't send expired JWT
-            response = requests.post(
+            response = get_session().post(
                 self.backend_url,
                 json=payload,
                 cookies={
@@ -133,172 +167,386 @@ class CommentImporter:
     def _ensure_valid_token(self):
         if self._token_expires_soon(self.jwt_token):
             logger.info("🔄 Token expires soon, refreshing before comment import...")
-            if not self._refresh_token():
+            if not self._refresh_token(stale_token=self.jwt_token):
                 logger.warning("⚠️  Token refresh failed, continuing with current token")
     
-    def import_comments(self, comments: List[Dict], asset_id: str, rate_limit: float = 0.5) -> Dict[str, int]:
-        pubnub_channel = f"comments_{asset_id}"
+    def import_comments(self, comments: List[Dict], asset_id: str, rate_limit: Optional[float] = None) -> Dict:
+        self._ensure_valid_token()
+        
+        # The shared limiter budgets requests across every video in the run;
+        # an explicit rate_limit (seconds between calls) applies to this call only.
+        limiter = TokenBucket.from_interval(rate_limit) if rate_limit is not None else self.rate_limiter
+        
+        recorded = self._recorded_comments(asset_id, comments)
+        pending = [c for c in comments if c.get('yt_id') not in recorded] if recorded else comments
         
+        stats = self._publish(pending, asset_id, limiter, known_parents=recorded or None)
+        stats.pop('parent_map', None)
+        stats['skipped'] = len(comments) - len(pending)
+        
+        skipped_note = f", {stats['skipped']} already published" if stats['skipped'] else ""
+        logger.info(f"Comments import complete: {stats['imported']} imported, {stats['failed']} failed, {stats['total']} total{skipped_note}")
+        return stats
+    
+    def import_comment_stream(self, comments: Iterable[Dict], asset_id: str, chunk_size: int = 500, rate_limit: Optional[float] = None) -> Dict:
+        # Publishes an iterator chunk by chunk, so publishing starts while the
+        # source is still producing. Published parents carry over between
+        # chunks; replies to a parent that failed in an earlier chunk are
+        # orphaned just like within a single list.
         self._ensure_valid_token()
+        limiter = TokenBucket.from_interval(rate_limit) if rate_limit is not None else self.rate_limiter
         
-        parent_map = {}
+        parent_map: Dict[str, str] = {}
+        unpublished = set()
+        totals = {'imported': 0, 'failed': 0, 'total': 0, 'orphaned': 0, 'skipped': 0, 'waves': [], 'chunks': 0}
         
-        total = len(comments)
+        for chunk in chunked(comments, chunk_size):
+            recorded = self._recorded_comments(asset_id, chunk)
+            parent_map.update(recorded)
+            ready = []
+            for comment in chunk:
+                if comment.get('yt_id') in recorded:
+                    totals['skipped'] += 1
+                elif comment.get('parent_id') in unpublished:
+                    unpublished.add(comment.get('yt_id'))
+                    totals['orphaned'] += 1
+                    totals['failed'] += 1
+                    totals['total'] += 1
+                else:
+                    ready.append(comment)
+            
+            if ready:
+                stats = self._publish(ready, asset_id, limiter, known_parents=parent_map)
+                parent_map.update(stats.pop('parent_map', {}))
+                unpublished.update(c.get('yt_id') for c in ready if c.get('yt_id') not in parent_map)
+                
+                for key in ('imported', 'failed', 'total', 'orphaned'):
+                    totals[key] += stats[key]
+                if 'batches' in stats:
+                    totals['batches'] = totals.get('batches', 0) + stats['batches']
+                self._merge_waves(totals['waves'], stats.get('waves', []))
+            
+            totals['chunks'] += 1
+            logger.info(f"📨 Chunk {totals['chunks']}: {totals['imported']}/{totals['total']} comments published so far")
         
-        last_token_check = 0
-        TOKEN_CHECK_INTERVAL = 50
+        skipped_note = f", {totals['skipped']} already published" if totals['skipped'] else ""
+        logger.info(f"Comments import complete: {totals['imported']} imported, {totals['failed']} failed, {totals['total']} total{skipped_note} ({totals['chunks']} chunk(s))")
+        return totals
+    
+    def _recorded_comments(self, asset_id: str, comments: List[Dict]) -> Dict[str, str]:
+        # Ledger entries for these comments and their parents: the former are
+        # skipped, the latter resolve replies to comments published earlier
+        if self.ledger is None:
+            return {}
+        ids = [c.get('yt_id') for c in comments] + [c.get('parent_id') for c in comments]
+        return self.ledger.lookup(asset_id, ids)
+    
+    def _ledger_callback(self, asset_id: str) -> Optional[Callable[[str, str], None]]:
+        if self.ledger is None or self.dry_run:
+            return None
+        return lambda yt_id, incast_id: self.ledger.record(asset_id, yt_id, incast_id)
+    
+    def _publish(self, comments: List[Dict], asset_id: str, limiter: TokenBucket, known_parents: Optional[Dict[str, str]] = None) -> Dict:
+        on_published = self._ledger_callback(asset_id)
+        # Batching needs several ready comments at once, so it always runs on the async engine
+        if self.engine == 'async' or self.batch_size > 1:
+            from .async_publisher import AsyncCommentPublisher
+            publisher = AsyncCommentPublisher(
+                self,
+                max_in_flight=self.max_in_flight,
+                rate_limiter=limiter,
+                batch_size=self.batch_size if self._batch_supported else 1,
+                batch_linger=self.batch_linger
+            )
+            stats = publisher.publish(comments, asset_id, known_parents=known_parents, on_published=on_published)
+        else:
+            stats = self._import_sequential(comments, asset_id, limiter, known_parents=known_parents, on_published=on_published)
+        
+        with self._stats_lock:
+            self.imported_count += stats['imported']
+            self.failed_count += stats['failed']
+        
+        return stats
+    
+    def import_live_chats(self, live_chats: List[Dict], asset_id: str, rate_limit: Optional[float] = None) -> Dict:
+        return self.import_comments(live_chats, asset_id, rate_limit)
+    
+    @staticmethod
+    def _merge_waves(totals: List[Dict], waves: List[Dict]):
+        by_wave = {wave['wave']: wave for wave in totals}
+        for wave in waves:
+            merged = by_wave.get(wave['wave'])
+            if merged is None:
+                merged = {'wave': wave['wave'], 'comments': 0, 'published': 0, 'seconds': 0.0, 'started_after': wave['started_after']}
+                by_wave[wave['wave']] = merged
+                totals.append(merged)
+            merged['comments'] += wave['comments']
+            merged['published'] += wave['published']
+            merged['seconds'] += wave['seconds']
+        totals.sort(key=lambda wave: wave['wave'])
+    
+    def _import_sequential(self, comments: List[Dict], asset_id: str, limiter: TokenBucket, known_parents: Optional[Dict[str, str]] = None, on_published: Optional[Callable[[str, str], None]] = None) -> Dict:
+        scheduler = CommentScheduler(comments, known_parents=known_parents, on_published=on_published)
+        total = len(comments)
+        progress = {'sent': 0}
         
-        for idx, comment in enumerate(comments, 1):
-            if idx - last_token_check >= TOKEN_CHECK_INTERVAL:
-                if self._token_expires_soon(self.jwt_token):
-                    logger.info(f"🔄 Token expires soon at comment {idx}/{total}, refreshing...")
-                    self._refresh_token()
-                last_token_check = idx
+        def publish(position: int, comment: Dict, incast_parent_id: Optional[str]) -> Optional[str]:
+            idx = position + 1
+            if not self.dry_run:
+                limiter.acquire()
+            progress['sent'] += 1
             
-            yt_id = comment.get('yt_id', f"yt_{idx}")
-            youtube_parent_id = comment.get('parent_id')
+            if progress['sent'] % self.TOKEN_CHECK_INTERVAL == 0:
+                self._check_token_periodically(idx, total)
             
-            incast_parent_id = parent_map.get(youtube_parent_id, None) if youtube_parent_id else None
+            yt_id = comment.get('yt_id', f"yt_{idx}")
+            payload = self._build_payload(comment, asset_id, incast_parent_id)
             
-            commented_at = comment.get('commented_at', '0')
+            if self.dry_run:
+                return self._dry_run_publish(payload, idx, total, yt_id, incast_parent_id)
+            return self._send_comment(payload, idx, total, limiter)
+        
+        return scheduler.run_sequential(publish)
+    
+    def _check_token_periodically(self, idx: int, total: int):
+        if self._token_expires_soon(self.jwt_token):
+            logger.info(f"🔄 Token expires soon at comment {idx}/{total}, refreshing...")
+            self._refresh_token(stale_token=self.jwt_token)
+    
+    @staticmethod
+    def _build_payload(comment: Dict, asset_id: str, incast_parent_id: Optional[str] = None) -> Dict:
+        commented_at = comment.get('commented_at', '0')
+        try:
+            commented_at = float(commented_at) if commented_at else 0
+        except (ValueError, TypeError):
+            commented_at = 0
+        
+        payload = {
+            'comment': comment['comment'],
+            'created_by_id': comment.get('created_by_id', ''),
+            'user_name': comment.get('user_name', 'Unknown'),
+            'profile_picture': comment.get('profile_picture', ''),
+            'pubnub_channel': f"comments_{asset_id}",
+            'commented_at': commented_at,
+            'asset_id': asset_id,
+            'skip_banter': True,  # Skip banter creation for bulk imports
+            'skip_pubnub': True,  # Skip PubNub for bulk imports (no real-time needed)
+        }
+        if incast_parent_id:
+            payload['parent_id'] = incast_parent_id
+        return payload
+    
+    @staticmethod
+    def _dry_run_publish(payload: Dict, idx: int, total: int, yt_id: str, incast_parent_id: Optional[str]) -> str:
+        logger.info(f"\n{'='*80}")
+        logger.info(f"🧪 DRY RUN - Import Ready Data [{idx}/{total}]")
+        logger.info(f"{'='*80}")
+        logger.info(f"Asset ID: {payload['asset_id']}")
+        logger.info(f"YouTube ID: {yt_id}")
+        logger.info(f"Parent ID: {incast_parent_id or 'None (top-level)'}")
+        logger.info(f"User: {payload['user_name']}")
+        logger.info(f"Timestamp: {payload['commented_at']} seconds")
+        logger.info(f"Comment: {payload['comment'][:200]}{'...' if len(payload['comment']) > 200 else ''}")
+        logger.info(f"Full Payload:")
+        logger.info(json.dumps(payload, indent=2, ensure_ascii=False))
+        logger.info(f"{'='*80}\n")
+        return f"dry-run-{idx}"
+    
+    def _post(self, url: str, body: Dict, jwt_token: str, timeout: int = 30) -> requests.Response:
+        if self.concurrency:
+            self.concurrency.acquire()
+        started = time.monotonic()
+        status_code = None
+        retry_after = None
+        try:
+            response = get_session().post(
+                url,
+                json=body,
+                cookies={'JWT': jwt_token},
+                headers={'Content-Type': 'application/json'},
+                timeout=timeout
+            )
+            status_code = response.status_code
+            retry_after = response.headers.get('Retry-After')
+        finally:
+            if self.concurrency:
+                self.concurrency.release(status_code, time.monotonic() - started, retry_after)
+        
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _response_json(response: requests.Response):
+        response_data = response.json()
+        if isinstance(response_data, str):
+            response_data = json.loads(response_data)
+        return response_data
+    
+    def _post_comment(self, payload: Dict, jwt_token: str) -> Optional[str]:
+        response = self._post(self.publish_url, payload, jwt_token)
+        comment_response = self._response_json(response).get('comment', {})
+        return comment_response.get('id')
+    
+    def _post_batch(self, payloads: List[Dict], refs: List[str], jwt_token: str) -> List[Optional[str]]:
+        # Fields shared by every comment of one asset are sent once per batch
+        first = payloads[0]
+        body = {
+            'asset_id': first['asset_id'],
+            'pubnub_channel': first['pubnub_channel'],
+            'skip_banter': first['skip_banter'],
+            'skip_pubnub': first['skip_pubnub'],
+            'comments': [
+                dict({k: v for k, v in payload.items() if k not in self.BATCH_SHARED_FIELDS}, client_ref=ref)
+                for payload, ref in zip(payloads, refs)
+            ],
+        }
+        response = self._post(self.publish_batch_url, body, jwt_token, timeout=30 + 2 * len(payloads))
+        results = self._response_json(response).get('results')
+        if not isinstance(results, list):
+            raise ValueError("Batch response has no 'results' list")
+        
+        ids_by_ref = {}
+        for position, item in enumerate(results):
+            if not isinstance(item, dict):
+                continue
+            ref = item.get('client_ref')
+            if ref is None and position < len(refs):
+                ref = refs[position]
+            incast_comment_id = (item.get('comment') or {}).get('id')
+            if incast_comment_id:
+                ids_by_ref[ref] = incast_comment_id
+            elif item.get('error'):
+                logger.info(f"⏭️  Batch item {ref} rejected: {str(item['error'])[:200]}")
+        return [ids_by_ref.get(ref) for ref in refs]
+    
+    def _send_batch(self, items: List[Tuple[int, str, Dict]], total: int, limiter: Optional[TokenBucket] = None) -> List[Optional[str]]:
+        if len(items) == 1 or not self._batch_supported:
+            return self._send_each(items, total, limiter, paid=1)
+        
+        payloads = [payload for _, _, payload in items]
+        refs = [yt_id for _, yt_id, _ in items]
+        first_idx = items[0][0]
+        jwt_token = self.jwt_token
+        try:
             try:
-                commented_at = float(commented_at) if commented_at else 0
-            except (ValueError, TypeError):
-                commented_at = 0
+                incast_ids = self._post_batch(payloads, refs, jwt_token)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 401:
+                    raise
+                logger.warning(f"🔐 [{first_idx}/{total}] JWT expired during batch, refreshing token...")
+                if not self._refresh_token(stale_token=jwt_token):
+                    raise
+                incast_ids = self._post_batch(payloads, refs, self.jwt_token)
             
-            payload = {
-                'comment': comment['comment'],
-                'created_by_id': comment.get('created_by_id', ''),
-                'user_name': comment.get('user_name', 'Unknown'),
-                'profile_picture': comment.get('profile_picture', ''),
-                'pubnub_channel': pubnub_channel,
-                'commented_at': commented_at,
-                'asset_id': asset_id,
-                'skip_banter': True,  # Skip banter creation for bulk imports
-                'skip_pubnub': True,  # Skip PubNub for bulk imports (no real-time needed)
-            }
-            if incast_parent_id:
-                payload['parent_id'] = incast_parent_id
+            logger.debug(f"  [{first_idx}/{total}] Batch of {len(items)}: {sum(1 for i in incast_ids if i)} imported")
+            return incast_ids
             
-            if self.dry_run:
-                self.imported_count += 1
-                fake_uuid = f"dry-run-{idx}"
-                parent_map[yt_id] = fake_uuid
-                
-                logger.info(f"\n{'='*80}")
-                logger.info(f"🧪 DRY RUN - Import Ready Data [{idx}/{total}]")
-                logger.info(f"{'='*80}")
-                logger.info(f"Asset ID: {asset_id}")
-                logger.info(f"YouTube ID: {yt_id}")
-                logger.info(f"Parent ID: {incast_parent_id or 'None (top-level)'}")
-                logger.info(f"User: {payload['user_name']}")
-                logger.info(f"Timestamp: {payload['commented_at']} seconds")
-                logger.info(f"Comment: {payload['comment'][:200]}{'...' if len(payload['comment']) > 200 else ''}")
-                logger.info(f"Full Payload:")
-                logger.info(json.dumps(payload, indent=2, ensure_ascii=False))
-                logger.info(f"{'='*80}\n")
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code in self.BATCH_UNSUPPORTED_STATUSES:
+                with self._stats_lock:
+                    if self._batch_supported:
+                        self._batch_supported = False
+                        logger.warning(f"⚠️  Batch endpoint rejected batches (HTTP {status_code}), falling back to single-comment publishing")
+                return self._send_each(items, total, limiter, paid=0)
+            logger.info(f"⏭️  [{first_idx}/{total}] Skipped batch of {len(items)} comments (HTTP {status_code})")
+        except requests.RequestException:
+            logger.info(f"⏭️  [{first_idx}/{total}] Skipped batch of {len(items)} comments (network error)")
+        except Exception as e:
+            logger.info(f"⏭️  [{first_idx}/{total}] Skipped batch of {len(items)} comments (error: {e})")
+        
+        return [None] * len(items)
+    
+    def _send_each(self, items: List[Tuple[int, str, Dict]], total: int, limiter: Optional[TokenBucket], paid: int) -> List[Optional[str]]:
+        # Single-post fallback for a batch: every post takes its own token,
+        # except the first ``paid`` ones covered by the token the caller took
+        # for the batch, so a rejected batch never turns into an unpaced burst
+        results = []
+        for position, (idx, _, payload) in enumerate(items):
+            if position >= paid and limiter is not None:
+                limiter.acquire()
+            results.append(self._send_comment(payload, idx, total, limiter))
+        return results
+    
+    def _retry_throttled(self, payload: Dict, idx: int, total: int, response: requests.Response, limiter: Optional[TokenBucket]) -> Optional[str]:
+        # With the concurrency controller on, a Retry-After already holds back
+        # every new request, this retry included; otherwise wait here. The
+        # retry then takes a rate-limit token like any other request, so
+        # backing off never adds load on top of the configured budget.
+        retry_after = min(parse_retry_after(response.headers.get('Retry-After')), self.MAX_RETRY_AFTER)
+        if not (self.concurrency and retry_after):
+            time.sleep(retry_after or self.THROTTLE_RETRY_DELAY)
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            incast_comment_id = self._post_comment(payload, self.jwt_token)
+            if incast_comment_id:
+                logger.info(f"  [{idx}/{total}] Imported after HTTP 429 back-off")
+            return incast_comment_id
+        except Exception as retry_error:
+            logger.warning(f"⚠️  [{idx}/{total}] Retry after 429 failed: {retry_error}")
+            return None
+    
+    def _send_comment(self, payload: Dict, idx: int, total: int, limiter: Optional[TokenBucket] = None) -> Optional[str]:
+        jwt_token = self.jwt_token
+        try:
+            incast_comment_id = self._post_comment(payload, jwt_token)
+            if incast_comment_id:
+                if idx % 10 == 0 or idx == total:
+                    logger.debug(f"  [{idx}/{total}] Imported comment")
             else:
+                logger.warning(f"  [{idx}/{total}] No comment_id in response")
+            return incast_comment_id
+            
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else 'Unknown'
+            
+            # Handle 429 - back off and retry once through the rate limiter
+            if status_code == 429:
+                incast_comment_id = self._retry_throttled(payload, idx, total, e.response, limiter)
+                if incast_comment_id:
+                    return incast_comment_id
+            
+            # Handle 401 - try to refresh token and retry once
+            if status_code == 401:
+                logger.warning(f"🔐 [{idx}/{total}] JWT expired, refreshing token...")
+                if self._refresh_token(stale_token=jwt_token):
+                    logger.info("✅ Token refreshed, retrying request...")
+                    try:
+                        incast_comment_id = self._post_comment(payload, self.jwt_token)
+                        if incast_comment_id:
+                            logger.info(f"  [{idx}/{total}] Imported after token refresh")
+                            return incast_comment_id
+                    except Exception as retry_error:
+                        logger.warning(f"⚠️  [{idx}/{total}] Retry failed: {retry_error}")
+                else:
+                    logger.error(f"❌ [{idx}/{total}] Token refresh failed!")
+            
+            comment_preview = payload['comment'][:30] if len(payload['comment']) > 30 else payload['comment']
+            
+            error_detail = ""
+            is_nlp_error = False
+            if e.response is not None:
                 try:
-                    response = requests.post(
-                        self.publish_url,
-                        json=payload,
-                        cookies={'JWT': self.jwt_token},
-                        headers={'Content-Type': 'application/json'},
-                        timeout=30
-                    )
-                    response.raise_for_status()
-                    response_data = response.json()
-                    
-                    if isinstance(response_data, str):
-                        response_data = json.loads(response_data)
-                    
-                    comment_response = response_data.get('comment', {})
-                    incast_comment_id = comment_response.get('id')
-                    
-                    if incast_comment_id:
-                        parent_map[yt_id] = incast_comment_id
-                        self.imported_count += 1
-                        if idx % 10 == 0 or idx == total:
-                            logger.debug(f"  [{idx}/{total}] Imported comment")
-                    else:
-                        logger.warning(f"  [{idx}/{total}] No comment_id in response")
-                        self.failed_count += 1
-                        
-                except requests.HTTPError as e:
-                    status_code = e.response.status_code if hasattr(e, 'response') else 'Unknown'
-                    
-                    # Handle 401 - try to refresh token and retry once
-                    if status_code == 401:
-                        logger.warning(f"🔐 [{idx}/{total}] JWT expired, refreshing token...")
-                        if self._refresh_token():
-                            logger.info("✅ Token refreshed, retrying request...")
-                            try:
-                                response = requests.post(
-                                    self.publish_url,
-                                    json=payload,
-                                    cookies={'JWT': self.jwt_token},
-                                    headers={'Content-Type': 'application/json'},
-                                    timeout=30
-                                )
-                                response.raise_for_status()
-                                response_data = response.json()
-                                if isinstance(response_data, str):
-                                    response_data = json.loads(response_data)
-                                comment_response = response_data.get('comment', {})
-                                incast_comment_id = comment_response.get('id')
-                                if incast_comment_id:
-                                    parent_map[yt_id] = incast_comment_id
-                                    self.imported_count += 1
-                                    logger.info(f"  [{idx}/{total}] Imported after token refresh")
-                                    continue
-                            except Exception as retry_error:
-                                logger.warning(f"⚠️  [{idx}/{total}] Retry failed: {retry_error}")
-                        else:
-                            logger.error(f"❌ [{idx}/{total}] Token refresh failed!")
-                    
-                    self.failed_count += 1
-                    comment_preview = payload['comment'][:30] if len(payload['comment']) > 30 else payload['comment']
-                    
-                    error_detail = ""
-                    is_nlp_error = False
-                    if hasattr(e, 'response') and e.response is not None:
-                        try:
-                            error_body = e.response.text
-                            error_detail = f" - {error_body[:200]}"
-                            if "NLP" in error_body or "nlp" in error_body:
-                                is_nlp_error = True
-                        except:
-                            pass
-                    
-                    if status_code == 500:
-                        if is_nlp_error:
-                            logger.info(f"⚠️  [{idx}/{total}] NLP processing failed (HTTP 500){error_detail}: {comment_preview}...")
-                        else:
-                            logger.info(f"⚠️  [{idx}/{total}] Server error (HTTP 500){error_detail}: {comment_preview}...")
-                    elif status_code != 401:  # Don't log 401 again, already handled above
-                        logger.info(f"⏭️  [{idx}/{total}] Skipped comment (HTTP {status_code}){error_detail}: {comment_preview}...")
-                    
-                except requests.RequestException as e:
-                    self.failed_count += 1
-                    logger.info(f"⏭️  [{idx}/{total}] Skipped comment (network error)")
-                    
-                except Exception as e:
-                    self.failed_count += 1
-                    logger.info(f"⏭️  [{idx}/{total}] Skipped comment (error)")
+                    error_body = e.response.text
+                    error_detail = f" - {error_body[:200]}"
+                    if "NLP" in error_body or "nlp" in error_body:
+                        is_nlp_error = True
+                except:
+                    pass
             
-            if idx < total:
-                time.sleep(rate_limit)
-        
-        logger.info(f"Comments import complete: {self.imported_count} imported, {self.failed_count} failed, {total} total")
-        return {
-            'imported': self.imported_count,
-            'failed': self.failed_count,
-            'total': total
-        }
-    
-    def import_live_chats(self, live_chats: List[Dict], asset_id: str, rate_limit: float = 0.5) -> Dict[str, int]:
-        self.imported_count = 0
-        self.failed_count = 0
+            if status_code == 500:
+                if is_nlp_error:
+                    logger.info(f"⚠️  [{idx}/{total}] NLP processing failed (HTTP 500){error_detail}: {comment_preview}...")
+                else:
+                    logger.info(f"⚠️  [{idx}/{total}] Server error (HTTP 500){error_detail}: {comment_preview}...")
+            elif status_code != 401:  # Don't log 401 again, already handled above
+                logger.info(f"⏭️  [{idx}/{total}] Skipped comment (HTTP {status_code}){error_detail}: {comment_preview}...")
+            
+        except requests.RequestException as e:
+            logger.info(f"⏭️  [{idx}/{total}] Skipped comment (network error)")
+            
+        except Exception as e:
+            logger.info(f"⏭️  [{idx}/{total}] Skipped comment (error)")
         
-        return self.import_comments(live_chats, asset_id, rate_limit)
-
+        return None
@@ -0,0 +1,67 @@
+"""Persistent (asset_id, yt_id) -> InCast comment ID ledger for idempotent publishing"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    asset_id TEXT NOT NULL,
+    yt_id TEXT NOT NULL,
+    incast_id TEXT NOT NULL,
+    published_at REAL,
+    PRIMARY KEY (asset_id, yt_id)
+) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH = 500
+
+
+class CommentLedger:
+    """Remembers every comment published to an asset, across runs.
+
+    Publishing consults it first: comments already on the asset are
+    skipped, and their stored InCast IDs resolve replies that are still
+    pending. Each publish is recorded as soon as it succeeds, so an
+    interrupted or repeated run never posts the same comment twice.
+    """
+
+    def __init__(self, path: str = "cache/comment_ledger.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def lookup(self, asset_id: str, yt_ids: Iterable[Optional[str]]) -> Dict[str, str]:
+        wanted = list({yt_id for yt_id in yt_ids if yt_id})
+        found: Dict[str, str] = {}
+        with self._lock:
+            for pos in range(0, len(wanted), LOOKUP_BATCH):
+                batch = wanted[pos:pos + LOOKUP_BATCH]
+                placeholders = ', '.join('?' for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT yt_id, incast_id FROM comments WHERE asset_id = ? AND yt_id IN ({placeholders})",
+                    (asset_id, *batch)
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def record(self, asset_id: str, yt_id: str, incast_id: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO comments (asset_id, yt_id, incast_id, published_at) VALUES (?, ?, ?, ?)",
+                (asset_id, yt_id, incast_id, time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
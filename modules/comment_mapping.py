@@ -0,0 +1,95 @@
+"""Process-pool timestamp extraction for very large comment lists"""
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from .timestamp_parser import find_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Below this many comments the single-process path wins (pool dispatch and
+# result transfer cost more than they save); see tools/bench_comment_mapping.py
+DEFAULT_PARALLEL_MIN = 50000
+
+
+def parse_texts(texts: List[str]) -> List[Optional[Tuple[int, str]]]:
+    # Worker entry point; module-level so it pickles under spawn
+    results = []
+    for text in texts:
+        match = find_timestamp(text)
+        results.append((match.seconds, match.text) if match else None)
+    return results
+
+
+class ParallelCommentParser:
+    """Runs timestamp extraction and cleanup for big comment lists on worker processes.
+
+    Only texts that pass the cheap ``':'`` prefilter are shipped to the
+    workers, in ``chunk_size`` shards (0 = about four shards per worker), and
+    results come back in input order. Lists shorter than ``min_comments``, or
+    machines with a single CPU, stay on the calling thread.
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = 0, min_comments: int = DEFAULT_PARALLEL_MIN):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.min_comments = min_comments
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def enabled_for(self, count: int) -> bool:
+        return self.workers > 1 and count >= self.min_comments
+
+    def parse(self, texts: List[str]) -> List[Optional[Tuple[int, str]]]:
+        results: List[Optional[Tuple[int, str]]] = [None] * len(texts)
+        candidates = [idx for idx, text in enumerate(texts) if text and ':' in text]
+        if not candidates:
+            return results
+
+        if not self.enabled_for(len(texts)):
+            for idx, parsed in zip(candidates, parse_texts([texts[idx] for idx in candidates])):
+                results[idx] = parsed
+            return results
+
+        chunk_size = self._chunk_size(len(candidates))
+        shards = [[texts[idx] for idx in candidates[pos:pos + chunk_size]] for pos in range(0, len(candidates), chunk_size)]
+        logger.debug(f"Parsing {len(candidates)}/{len(texts)} candidate comments on {self.workers} processes ({len(shards)} chunks of {chunk_size})")
+
+        try:
+            parsed_shards = list(self._get_pool().map(parse_texts, shards))
+        except Exception as e:
+            logger.warning(f"Comment worker pool failed ({e}); parsing in-process from now on")
+            self.close()
+            self.workers = 1
+            parsed_shards = [parse_texts(shard) for shard in shards]
+
+        position = 0
+        for shard_results in parsed_shards:
+            for parsed in shard_results:
+                results[candidates[position]] = parsed
+                position += 1
+        return results
+
+    def _chunk_size(self, candidates: int) -> int:
+        if self.chunk_size > 0:
+            return self.chunk_size
+        return max(1000, math.ceil(candidates / (self.workers * 4)))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a process that already runs upload/publish
+                # threads can copy held locks into the children
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
@@ -0,0 +1,219 @@
+"""Dependency-aware comment scheduling (parents before replies)"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CommentScheduler:
+    """Models a comment list as a forest keyed by yt_id.
+
+    Wave 0 holds top-level comments, wave 1 their replies, and so on. A
+    reply is only released once its parent's InCast ID is known; if the
+    parent fails, the reply (and anything under it) is reported as orphaned
+    instead of being published as an unrelated top-level comment.
+    ``known_parents`` resolves parents published outside this list (earlier
+    chunks, or earlier runs via the ledger); a reply whose parent is neither
+    in the list nor known is orphaned the same way. ``on_published(yt_id,
+    incast_id)`` is called as each comment lands.
+    """
+
+    def __init__(self, comments: List[Dict], known_parents: Optional[Dict[str, str]] = None, on_published: Optional[Callable[[str, str], None]] = None):
+        self.comments = comments
+        self.known_parents = known_parents or {}
+        self.on_published = on_published
+        self.yt_ids: List[str] = []
+        self.parent_index: List[Optional[int]] = []
+        self.external_parent: List[Optional[str]] = []
+        self.children: List[List[int]] = [[] for _ in comments]
+        self.depth: List[int] = [0] * len(comments)
+        # Replies whose parent is neither in the list nor in known_parents
+        self.detached = set()
+
+        index_by_yt_id: Dict[str, int] = {}
+        for idx, comment in enumerate(comments):
+            yt_id = comment.get('yt_id') or f"yt_{idx + 1}"
+            self.yt_ids.append(yt_id)
+            index_by_yt_id.setdefault(yt_id, idx)
+
+        for idx, comment in enumerate(comments):
+            youtube_parent_id = comment.get('parent_id')
+            parent = index_by_yt_id.get(youtube_parent_id) if youtube_parent_id else None
+            if parent == idx:
+                parent = None
+            self.parent_index.append(parent)
+            self.external_parent.append(None)
+
+            if parent is not None:
+                self.children[parent].append(idx)
+            elif youtube_parent_id:
+                if youtube_parent_id in self.known_parents:
+                    self.external_parent[idx] = self.known_parents[youtube_parent_id]
+                else:
+                    self.detached.add(idx)
+
+        for idx in self.order():
+            parent = self.parent_index[idx]
+            if parent is not None:
+                self.depth[idx] = self.depth[parent] + 1
+
+        if self.detached:
+            logger.warning(f"⚠️  {len(self.detached)} repl(y/ies) reference a parent that was never published; skipping them")
+
+    def roots(self) -> List[int]:
+        return [idx for idx, parent in enumerate(self.parent_index) if parent is None]
+
+    def order(self) -> List[int]:
+        # Breadth-first from the roots keeps parents ahead of their replies
+        # while preserving list order within each wave.
+        ordered = self.roots()
+        pos = 0
+        while pos < len(ordered):
+            ordered.extend(self.children[ordered[pos]])
+            pos += 1
+        if len(ordered) < len(self.comments):
+            # Parent cycles can't come from YouTube, but never drop comments
+            seen = set(ordered)
+            for idx in range(len(self.comments)):
+                if idx not in seen:
+                    self.children[self.parent_index[idx]].remove(idx)
+                    self.parent_index[idx] = None
+                    ordered.append(idx)
+        return ordered
+
+    def run_sequential(self, publish: Callable[[int, Dict, Optional[str]], Optional[str]]) -> Dict:
+        tracker = _WaveTracker(self)
+        results: List[Optional[str]] = [None] * len(self.comments)
+        orphaned = set()
+
+        for idx in self.order():
+            parent = self.parent_index[idx]
+            if idx in self.detached or (parent is not None and (parent in orphaned or not results[parent])):
+                orphaned.add(idx)
+                continue
+
+            incast_parent_id = results[parent] if parent is not None else self.external_parent[idx]
+            tracker.start(idx)
+            results[idx] = publish(idx, self.comments[idx], incast_parent_id)
+            tracker.finish(idx, results[idx])
+            self._notify(idx, results[idx])
+
+        return self._summary(results, orphaned, tracker)
+
+    async def run_async(self, publish: Callable[[int, Dict, Optional[str]], Awaitable[Optional[str]]]) -> Dict:
+        tracker = _WaveTracker(self)
+        results: List[Optional[str]] = [None] * len(self.comments)
+        orphaned = set()
+        tasks = set()
+
+        def orphan(idx: int):
+            stack = [idx]
+            while stack:
+                node = stack.pop()
+                orphaned.add(node)
+                stack.extend(self.children[node])
+
+        async def run_node(idx: int, incast_parent_id: Optional[str]):
+            tracker.start(idx)
+            try:
+                results[idx] = await publish(idx, self.comments[idx], incast_parent_id)
+            except Exception as e:
+                logger.info(f"⏭️  [{idx + 1}/{len(self.comments)}] Skipped comment (error: {e})")
+            tracker.finish(idx, results[idx])
+            self._notify(idx, results[idx])
+
+            for child in self.children[idx]:
+                if results[idx]:
+                    spawn(child, results[idx])
+                else:
+                    orphan(child)
+
+        def spawn(idx: int, incast_parent_id: Optional[str]):
+            task = asyncio.ensure_future(run_node(idx, incast_parent_id))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        for idx in self.order():
+            if idx in self.detached:
+                orphan(idx)
+            elif self.parent_index[idx] is None:
+                spawn(idx, self.external_parent[idx])
+
+        while tasks:
+            await asyncio.gather(*list(tasks))
+
+        return self._summary(results, orphaned, tracker)
+
+    def _notify(self, idx: int, incast_id: Optional[str]):
+        if incast_id and self.on_published:
+            try:
+                self.on_published(self.yt_ids[idx], incast_id)
+            except Exception as e:
+                logger.warning(f"Failed to record published comment {self.yt_ids[idx]}: {e}")
+
+    def _summary(self, results: List[Optional[str]], orphaned: set, tracker: '_WaveTracker') -> Dict:
+        if orphaned:
+            logger.warning(f"⚠️  {len(orphaned)} repl(y/ies) skipped because their parent comment was not published")
+
+        waves = tracker.report()
+        for wave in waves:
+            logger.info(
+                f"   Wave {wave['wave']}: {wave['published']}/{wave['comments']} published "
+                f"in {wave['seconds']:.2f}s (started +{wave['started_after']:.2f}s)"
+            )
+
+        parent_map = {
+            self.yt_ids[idx]: incast_id
+            for idx, incast_id in enumerate(results)
+            if incast_id
+        }
+
+        imported = sum(1 for incast_id in results if incast_id)
+        return {
+            'imported': imported,
+            'failed': len(self.comments) - imported,
+            'total': len(self.comments),
+            'orphaned': len(orphaned),
+            'waves': waves,
+            'parent_map': parent_map,
+        }
+
+
+class _WaveTracker:
+    def __init__(self, scheduler: CommentScheduler):
+        self.scheduler = scheduler
+        self.started_at = time.monotonic()
+        self.waves: Dict[int, Dict] = {}
+        for idx, depth in enumerate(scheduler.depth):
+            wave = self.waves.setdefault(depth, {'wave': depth, 'comments': 0, 'published': 0, 'first_start': None, 'last_finish': None})
+            wave['comments'] += 1
+
+    def start(self, idx: int):
+        wave = self.waves[self.scheduler.depth[idx]]
+        now = time.monotonic()
+        if wave['first_start'] is None:
+            wave['first_start'] = now
+
+    def finish(self, idx: int, incast_id: Optional[str]):
+        wave = self.waves[self.scheduler.depth[idx]]
+        wave['last_finish'] = time.monotonic()
+        if incast_id:
+            wave['published'] += 1
+
+    def report(self) -> List[Dict]:
+        report = []
+        for depth in sorted(self.waves):
+            wave = self.waves[depth]
+            first_start = wave['first_start']
+            last_finish = wave['last_finish']
+            report.append({
+                'wave': depth,
+                'comments': wave['comments'],
+                'published': wave['published'],
+                'seconds': (last_finish - first_start) if first_start is not None and last_finish is not None else 0.0,
+                'started_after': (first_start - self.started_at) if first_start is not None else 0.0,
+            })
+        return report
@@ -0,0 +1,56 @@
+"""Generator stages for streaming comment ingestion"""
+
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+
+def group_threads(comments: Iterable[Dict]) -> Iterator[List[Dict]]:
+    # yt-dlp yields each top-level comment followed by its replies, so a
+    # thread is complete as soon as the next top-level comment shows up.
+    thread: List[Dict] = []
+    for comment in comments:
+        parent_id = comment.get('parent_id')
+        if thread and (not parent_id or parent_id != thread[0].get('yt_id')):
+            yield thread
+            thread = []
+        thread.append(comment)
+    if thread:
+        yield thread
+
+
+def filter_timestamped(threads: Iterable[List[Dict]]) -> Iterator[Dict]:
+    # Same rule as the list path: keep comments with a timestamp, plus any
+    # parent that a kept reply needs (placed at its earliest reply's time).
+    for thread in threads:
+        root = thread[0]
+        replies = [c for c in thread[1:] if _timestamp(c) > 0]
+
+        if _timestamp(root) > 0:
+            yield root
+        elif replies:
+            root['commented_at'] = str(min(_timestamp(c) for c in replies))
+            yield root
+
+        yield from replies
+
+
+def limit_items(items: Iterable[Dict], limit: int) -> Iterator[Dict]:
+    # Unlike islice this reads the source to the end: the extractor spools
+    # every comment it yields and only caches the spool once it is complete,
+    # so stopping early would throw the whole comment list away.
+    for position, item in enumerate(items):
+        if position < limit:
+            yield item
+
+
+def _timestamp(comment: Dict) -> int:
+    return int(comment.get('commented_at', '0') or '0')
+
+
+def chunked(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
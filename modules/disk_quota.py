@@ -0,0 +1,120 @@
+"""Disk space admission control for video downloads"""
+
+import itertools
+import logging
+import shutil
+import threading
+import time
+from typing import Dict, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting download re-checks free disk space that something
+# other than a release may have freed
+POLL_INTERVAL = 5.0
+
+
+def _mb(size: float) -> str:
+    return f"{size / (1024*1024):.1f} MB"
+
+
+class DiskQuota:
+    """Reserves disk space for a download before it starts.
+
+    A download is admitted when its estimated size fits under ``max_bytes``
+    together with every outstanding reservation, and when the disk holding
+    ``path`` would still have ``min_free_bytes`` left after all reservations
+    were written in full (bytes already on disk are counted twice, which
+    errs on the safe side). Otherwise it waits until a reservation is
+    released, i.e. until an upload has finished and its file is gone. A
+    download is always admitted when nothing else is reserved, so one video
+    larger than the quota runs alone instead of blocking forever. Videos
+    without a size estimate reserve ``default_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = 0, path: str = "cache", min_free_bytes: int = 0, default_bytes: int = 500 * 1024 * 1024):
+        self.max_bytes = max(0, max_bytes)
+        self.path = path
+        self.min_free_bytes = max(0, min_free_bytes)
+        self.default_bytes = max(0, default_bytes)
+        self._cond = threading.Condition()
+        self._reservations: Dict[int, Dict] = {}
+        self._reserved = 0
+        self._waiting = 0
+        self._ids = itertools.count(1)
+
+    def reserve(self, label: str, size: Optional[int]) -> int:
+        """Block until ``size`` bytes can be reserved; returns a reservation ID."""
+        if size is None:
+            logger.info(f"💽 No size estimate for {label}, assuming {_mb(self.default_bytes)}")
+            size = self.default_bytes
+        size = max(0, int(size))
+        started = time.monotonic()
+        with self._cond:
+            if not self._fits(size):
+                self._waiting += 1
+                self._publish()
+                logger.info(f"⏳ Waiting for disk space for {label} ({_mb(size)}): {self._describe()}")
+                try:
+                    while not self._fits(size):
+                        self._cond.wait(POLL_INTERVAL)
+                finally:
+                    self._waiting -= 1
+                waited = time.monotonic() - started
+                metrics.inc_counter('disk_quota_waits')
+                metrics.inc_counter('disk_quota_wait_seconds', round(waited, 3))
+                logger.info(f"▶️  Disk space available for {label} after {waited:.1f}s")
+
+            reservation_id = next(self._ids)
+            self._reservations[reservation_id] = {'label': label, 'size': size}
+            self._reserved += size
+            self._publish()
+            logger.info(f"💽 Reserved {_mb(size)} for {label}: {self._describe()}")
+            return reservation_id
+
+    def resize(self, reservation_id: int, size: int):
+        """Replace an estimate with the real size once the file is on disk."""
+        with self._cond:
+            reservation = self._reservations.get(reservation_id)
+            if reservation is None:
+                return
+            size = max(0, int(size))
+            self._reserved += size - reservation['size']
+            reservation['size'] = size
+            self._publish()
+            self._cond.notify_all()
+
+    def release(self, reservation_id: Optional[int]):
+        with self._cond:
+            reservation = self._reservations.pop(reservation_id, None)
+            if reservation is None:
+                return
+            self._reserved -= reservation['size']
+            self._publish()
+            self._cond.notify_all()
+            logger.info(f"💽 Released {_mb(reservation['size'])} from {reservation['label']}: {self._describe()}")
+
+    def _fits(self, size: int) -> bool:
+        if not self._reservations:
+            return True
+        if self.max_bytes and self._reserved + size > self.max_bytes:
+            return False
+        if self.min_free_bytes:
+            try:
+                free = shutil.disk_usage(self.path).free
+            except OSError:
+                return True
+            if free - self._reserved - size < self.min_free_bytes:
+                return False
+        return True
+
+    def _describe(self) -> str:
+        limit = f" of {_mb(self.max_bytes)}" if self.max_bytes else ""
+        return f"{_mb(self._reserved)}{limit} reserved by {len(self._reservations)} download(s), {self._waiting} waiting"
+
+    def _publish(self):
+        metrics.set_gauge('disk_quota_reserved_bytes', self._reserved)
+        metrics.set_gauge('disk_quota_reservations', len(self._reservations))
+        metrics.set_gauge('disk_quota_waiting', self._waiting)
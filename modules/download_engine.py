@@ -0,0 +1,141 @@
+"""yt-dlp download engine settings: fragment concurrency, external downloader, rate ceiling"""
+
+import logging
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from . import metrics
+from .rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# External downloaders yt-dlp knows how to drive
+EXTERNAL_DOWNLOADERS = ('aria2c', 'axel', 'curl', 'wget', 'httpie', 'ffmpeg')
+
+
+class DownloadEngine:
+    """Turns the ``download`` config into yt-dlp options and reports throughput.
+
+    ``concurrent_fragments`` downloads DASH/HLS fragments in parallel;
+    ``http_chunk_size`` splits single-file formats into ranged requests
+    (YouTube throttles long responses) and ``buffer_size`` sets the native
+    downloader's read buffer. ``external_downloader`` (e.g. aria2c) is used
+    only if it is on PATH, otherwise the native downloader runs.
+
+    ``max_rate`` is a ceiling in bytes/s for all downloads together, kept
+    by one token bucket that every byte read is charged to: the native
+    downloader through its progress hook (fragment threads included) and
+    streamed transfers through ``throttle``. yt-dlp copies its params into
+    fragment and external downloaders, so ``ratelimit`` is only used for
+    external downloaders, which get an even share of ``max_rate`` when they
+    start and keep it until they finish.
+    """
+
+    def __init__(self, concurrent_fragments: int = 4, external_downloader: str = "", external_downloader_args: Optional[List[str]] = None, http_chunk_size: int = 10 * 1024 * 1024, buffer_size: int = 1024 * 1024, max_rate: float = 0):
+        self.concurrent_fragments = max(1, concurrent_fragments)
+        self.external_downloader = self._resolve_external(external_downloader)
+        self.external_downloader_args = list(external_downloader_args or [])
+        self.http_chunk_size = max(0, http_chunk_size)
+        self.buffer_size = max(0, buffer_size)
+        self.max_rate = max(0, max_rate)
+        # One second of max_rate may go out in a burst
+        self._bucket = TokenBucket(self.max_rate, capacity=self.max_rate) if self.max_rate else None
+        self._lock = threading.Lock()
+        # id(params) -> yt-dlp params dict of each download in progress
+        self._active: Dict[int, Dict] = {}
+
+    @property
+    def name(self) -> str:
+        return self.external_downloader or 'native'
+
+    @staticmethod
+    def _resolve_external(downloader: str) -> Optional[str]:
+        downloader = (downloader or '').strip()
+        if not downloader:
+            return None
+        if downloader not in EXTERNAL_DOWNLOADERS:
+            logger.warning(f"⚠️  Unknown external downloader '{downloader}', using yt-dlp's native downloader")
+            return None
+        if not shutil.which(downloader):
+            logger.warning(f"⚠️  External downloader '{downloader}' is not installed, using yt-dlp's native downloader")
+            return None
+        return downloader
+
+    def apply(self, opts: Dict) -> Dict:
+        opts['concurrent_fragment_downloads'] = self.concurrent_fragments
+        if self.http_chunk_size:
+            opts['http_chunk_size'] = self.http_chunk_size
+        if self.buffer_size:
+            opts['buffersize'] = self.buffer_size
+            opts['noresizebuffer'] = True
+        if self.external_downloader:
+            opts['external_downloader'] = {'default': self.external_downloader}
+            if self.external_downloader_args:
+                opts['external_downloader_args'] = {self.external_downloader: self.external_downloader_args}
+        return opts
+
+    def describe(self) -> str:
+        parts = [self.name, f"{self.concurrent_fragments} fragment(s) in parallel"]
+        if self.http_chunk_size:
+            parts.append(f"{self.http_chunk_size / (1024*1024):g} MB chunks")
+        parts.append(f"max {self.max_rate / (1024*1024):g} MB/s total" if self.max_rate else "no rate limit")
+        return ', '.join(parts)
+
+    def throttle(self, size: int):
+        """Block until ``size`` more bytes fit under the shared rate ceiling."""
+        if self._bucket is not None and size > 0:
+            self._bucket.acquire(size)
+
+    @contextmanager
+    def track(self, video_id: str, ydl):
+        """Wrap one ``ydl`` download: charge it to the rate ceiling and log throughput."""
+        transfer = {'bytes': 0, 'started': time.monotonic()}
+        # Bytes already charged per output file; fragment threads report
+        # through the same hook concurrently
+        charged: Dict[str, int] = {}
+        charged_lock = threading.Lock()
+
+        def hook(progress: Dict):
+            if progress.get('status') == 'downloading' and self._bucket is not None:
+                downloaded = progress.get('downloaded_bytes') or 0
+                with charged_lock:
+                    key = progress.get('filename') or ''
+                    size = downloaded - charged.get(key, 0)
+                    charged[key] = downloaded
+                self.throttle(size)
+            elif progress.get('status') == 'finished':
+                transfer['bytes'] += progress.get('total_bytes') or progress.get('downloaded_bytes') or 0
+
+        ydl.add_progress_hook(hook)
+        self._join(ydl.params)
+        try:
+            yield transfer
+        finally:
+            self._leave(ydl.params)
+            transfer['seconds'] = time.monotonic() - transfer['started']
+
+        mb = transfer['bytes'] / (1024 * 1024)
+        rate = mb / transfer['seconds'] if transfer['seconds'] > 0 else 0
+        transfer['mb_per_s'] = rate
+        logger.info(f"📥 {video_id}: {mb:.1f} MB in {transfer['seconds']:.1f}s ({rate:.1f} MB/s, {self.name})")
+        metrics.inc_counter('download_bytes', transfer['bytes'])
+        metrics.inc_counter('download_seconds', round(transfer['seconds'], 3))
+        metrics.set_gauge('download_last_mb_per_s', round(rate, 2))
+
+    def _join(self, params: Dict):
+        with self._lock:
+            self._active[id(params)] = params
+            metrics.set_gauge('download_active', len(self._active))
+            if self.max_rate and self.external_downloader:
+                # Passed on the external downloader's command line once, so
+                # the share is fixed for the whole transfer
+                params['ratelimit'] = self.max_rate / len(self._active)
+                logger.debug(f"{self.external_downloader} rate share: {params['ratelimit'] / (1024*1024):.2f} MB/s")
+
+    def _leave(self, params: Dict):
+        with self._lock:
+            self._active.pop(id(params), None)
+            metrics.set_gauge('download_active', len(self._active))
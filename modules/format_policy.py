@@ -0,0 +1,190 @@
+"""Format selection policy: pick the cheapest acceptable format from the extracted list"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The selector used before the policy existed; still the last resort when
+# the extracted info carries no usable format list
+FALLBACK_FORMAT = "22/18/bestvideo+bestaudio/best"
+DIRECT_PROTOCOLS = ('http', 'https')
+
+
+def estimate_bytes(fmt: Dict, duration: Optional[float]) -> Optional[int]:
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    if fmt.get('tbr') and duration:
+        return int(fmt['tbr'] * 1000 / 8 * duration)
+    return None
+
+
+def _has(codec: Optional[str]) -> bool:
+    return codec not in (None, 'none')
+
+
+def _is_progressive(fmt: Dict) -> bool:
+    return _has(fmt.get('vcodec')) and _has(fmt.get('acodec'))
+
+
+def _is_video_only(fmt: Dict) -> bool:
+    return _has(fmt.get('vcodec')) and fmt.get('acodec') == 'none'
+
+
+def _is_audio_only(fmt: Dict) -> bool:
+    return _has(fmt.get('acodec')) and fmt.get('vcodec') == 'none'
+
+
+def _video_rank(fmt: Dict) -> tuple:
+    return (not (fmt.get('vcodec') or '').startswith('avc1'), fmt.get('tbr') or 0)
+
+
+def _mb(size: Optional[int]) -> str:
+    return f"{size / (1024*1024):.1f} MB" if size else "? MB"
+
+
+class FormatPolicy:
+    """Chooses a download format from an already extracted yt-dlp info dict.
+
+    Rules are tried in order and the first one with a candidate wins:
+
+    - ``progressive_mp4``: one file with audio and video, mp4 container
+    - ``progressive``: one file with audio and video, any container
+    - ``merged``: a video-only plus an audio-only stream (needs ffmpeg)
+    - ``smallest``: nothing fits the limits; the smallest candidate overall
+    - ``fallback``: no usable format list; yt-dlp's ``FALLBACK_FORMAT``
+
+    Candidates above ``max_height`` or ``max_filesize`` (estimated, bytes;
+    0 disables either limit) are skipped. Within a rule plain HTTP(S) files
+    beat fragmented (HLS/DASH) ones, then the highest resolution wins, then
+    mp4, then the smaller estimate. With
+    ``prefer_progressive`` off, ``merged`` is tried first. ``select``
+    also estimates what the old fixed selector would have fetched, so the
+    bytes saved can be reported per batch.
+    """
+
+    def __init__(self, max_height: int = 1080, max_filesize: int = 0, prefer_progressive: bool = True, prefer_mp4: bool = True):
+        self.max_height = max(0, max_height)
+        self.max_filesize = max(0, max_filesize)
+        self.prefer_progressive = prefer_progressive
+        self.prefer_mp4 = prefer_mp4
+
+    def select(self, info: Dict) -> Dict:
+        formats = [fmt for fmt in info.get('formats') or [] if fmt.get('format_id')]
+        duration = info.get('duration')
+        candidates = self._candidates(formats, duration)
+        if not candidates:
+            return {'format': FALLBACK_FORMAT, 'rule': 'fallback', 'format_id': None, 'height': None, 'estimated_bytes': None, 'baseline_bytes': None}
+
+        baseline = self._baseline(formats, duration)
+        logger.info(f"🎞️  {len(candidates)} format candidates: " + ', '.join(
+            f"{c['format_id']} ({c['height'] or '?'}p {c['ext']}, {_mb(c['estimated_bytes'])})" for c in candidates
+        ))
+
+        rules = ['progressive_mp4', 'progressive', 'merged'] if self.prefer_progressive else ['merged', 'progressive_mp4', 'progressive']
+        if not self.prefer_mp4:
+            rules.remove('progressive_mp4')
+        choice = None
+        for rule in rules:
+            fitting = [c for c in candidates if self._matches(rule, c) and self._fits(c)]
+            if fitting:
+                choice = dict(min(fitting, key=self._rank), rule=rule)
+                break
+        if choice is None:
+            choice = dict(min(candidates, key=lambda c: (c['estimated_bytes'] is None, c['estimated_bytes'] or 0)), rule='smallest')
+            logger.warning(f"⚠️  No format within the limits, taking the smallest: {choice['format_id']} ({_mb(choice['estimated_bytes'])})")
+
+        return {
+            # Keep the old selector behind the choice in case the format
+            # disappears between extraction and download
+            'format': f"{choice['format_id']}/{FALLBACK_FORMAT}",
+            'rule': choice['rule'],
+            'format_id': choice['format_id'],
+            'height': choice['height'],
+            'estimated_bytes': choice['estimated_bytes'],
+            'baseline_bytes': baseline,
+        }
+
+    def _candidates(self, formats: List[Dict], duration: Optional[float]) -> List[Dict]:
+        candidates = []
+        for fmt in formats:
+            if _is_progressive(fmt):
+                candidates.append({
+                    'format_id': fmt['format_id'],
+                    'kind': 'progressive',
+                    'ext': fmt.get('ext'),
+                    'height': fmt.get('height'),
+                    'direct': fmt.get('protocol') in DIRECT_PROTOCOLS,
+                    'estimated_bytes': estimate_bytes(fmt, duration),
+                })
+
+        audio = [fmt for fmt in formats if _is_audio_only(fmt)]
+        # Leanest H.264 video-only stream per (height, container) (AV1/VP9
+        # only where there is none, they play back in fewer places), paired
+        # with the best audio stream that can share its container
+        best_video: Dict[tuple, Dict] = {}
+        for fmt in formats:
+            if not _is_video_only(fmt):
+                continue
+            key = (fmt.get('height'), fmt.get('ext'))
+            current = best_video.get(key)
+            if current is None or _video_rank(fmt) < _video_rank(current):
+                best_video[key] = fmt
+        for (height, ext), video in best_video.items():
+            audio_ext = 'm4a' if ext == 'mp4' else ext
+            matching = [fmt for fmt in audio if fmt.get('ext') == audio_ext] or audio
+            if not matching:
+                continue
+            track = max(matching, key=lambda fmt: fmt.get('tbr') or 0)
+            video_bytes, audio_bytes = estimate_bytes(video, duration), estimate_bytes(track, duration)
+            candidates.append({
+                'format_id': f"{video['format_id']}+{track['format_id']}",
+                'kind': 'merged',
+                'ext': ext,
+                'height': height,
+                'direct': False,
+                'estimated_bytes': video_bytes + audio_bytes if video_bytes and audio_bytes else None,
+            })
+        return sorted(candidates, key=lambda c: (c['height'] or 0, c['estimated_bytes'] or 0))
+
+    def _matches(self, rule: str, candidate: Dict) -> bool:
+        if rule == 'progressive_mp4':
+            return candidate['kind'] == 'progressive' and candidate['ext'] == 'mp4'
+        return candidate['kind'] == rule
+
+    def _fits(self, candidate: Dict) -> bool:
+        if self.max_height and (candidate['height'] or 0) > self.max_height:
+            return False
+        if self.max_filesize and candidate['estimated_bytes'] and candidate['estimated_bytes'] > self.max_filesize:
+            return False
+        return True
+
+    def _rank(self, candidate: Dict) -> tuple:
+        return (
+            not candidate['direct'],
+            -(candidate['height'] or 0),
+            self.prefer_mp4 and candidate['ext'] != 'mp4',
+            candidate['estimated_bytes'] is None,
+            candidate['estimated_bytes'] or 0,
+        )
+
+    @staticmethod
+    def _baseline(formats: List[Dict], duration: Optional[float]) -> Optional[int]:
+        # What FALLBACK_FORMAT would have fetched: 22, else 18, else the best
+        # video-only plus the best audio-only stream
+        by_id = {fmt['format_id']: fmt for fmt in formats}
+        for format_id in ('22', '18'):
+            if format_id in by_id:
+                return estimate_bytes(by_id[format_id], duration)
+        video = [fmt for fmt in formats if _is_video_only(fmt)]
+        audio = [fmt for fmt in formats if _is_audio_only(fmt)]
+        if video and audio:
+            best_video = max(video, key=lambda fmt: (fmt.get('height') or 0, fmt.get('tbr') or 0))
+            best_audio = max(audio, key=lambda fmt: fmt.get('tbr') or 0)
+            video_bytes, audio_bytes = estimate_bytes(best_video, duration), estimate_bytes(best_audio, duration)
+            return video_bytes + audio_bytes if video_bytes and audio_bytes else None
+        progressive = [fmt for fmt in formats if _is_progressive(fmt)]
+        if progressive:
+            return estimate_bytes(max(progressive, key=lambda fmt: (fmt.get('height') or 0, fmt.get('tbr') or 0)), duration)
+        return None
@@ -0,0 +1,91 @@
+"""Shared HTTP client with keep-alive connection pooling"""
+
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_settings = {
+    'pool_connections': 10,
+    'pool_maxsize': 20,
+    'pool_block': False,
+    'host_limits': {},
+}
+
+
+def configure_http(pool_connections: int = 10, pool_maxsize: int = 20, pool_block: bool = False, host_limits: Optional[Dict[str, int]] = None):
+    global _session
+
+    with _lock:
+        _settings['pool_connections'] = max(1, pool_connections)
+        _settings['pool_maxsize'] = max(1, pool_maxsize)
+        _settings['pool_block'] = pool_block
+        _settings['host_limits'] = dict(host_limits or {})
+
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session() -> requests.Session:
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def close_session():
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+
+    # Auth cookies are passed explicitly on every call; keep the shared
+    # session stateless so one response can't leak cookies into the next.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    default_adapter = HTTPAdapter(
+        pool_connections=_settings['pool_connections'],
+        pool_maxsize=_settings['pool_maxsize'],
+        pool_block=_settings['pool_block'],
+    )
+    session.mount('https://', default_adapter)
+    session.mount('http://', default_adapter)
+
+    for host, limit in _settings['host_limits'].items():
+        prefix = _host_prefix(host)
+        session.mount(prefix, HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(1, int(limit)),
+            pool_block=True,
+        ))
+        logger.debug(f"HTTP pool for {prefix}: max {limit} connections")
+
+    logger.debug(
+        f"HTTP session created (pool_connections={_settings['pool_connections']}, "
+        f"pool_maxsize={_settings['pool_maxsize']}, pool_block={_settings['pool_block']})"
+    )
+    return session
+
+
+def _host_prefix(host: str) -> str:
+    if '://' not in host:
+        host = f"https://{host}"
+    parts = urlsplit(host)
+    return f"{parts.scheme}://{parts.netloc}/"
@@ -0,0 +1,106 @@
+"""Streaming parser for yt-dlp live_chat.json replay files"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_DECODER = 'orjson'
+except ImportError:
+    _loads = json.loads
+    JSON_DECODER = 'json'
+
+logger = logging.getLogger(__name__)
+
+# Only text messages are imported; paid messages, membership events, tickers
+# and banner updates never contain this key, so they're skipped undecoded.
+TEXT_MESSAGE_MARKER = b'liveChatTextMessageRenderer'
+
+
+def iter_live_chat(json_file: Path, stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """Yield live chat messages from a replay file one at a time.
+
+    ``stats`` (if given) receives ``lines``, ``decoded`` and ``messages``
+    counts, updated as the file is consumed.
+    """
+    counters = stats if stats is not None else {}
+    counters.update({'lines': 0, 'decoded': 0, 'messages': 0})
+    started = time.perf_counter()
+
+    with open(json_file, 'rb') as f:
+        for line_num, line in enumerate(f, 1):
+            counters['lines'] = line_num
+            if line_num == 1:
+                continue
+
+            if TEXT_MESSAGE_MARKER not in line:
+                continue
+
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                data = _loads(line)
+                counters['decoded'] += 1
+                message = _parse_action(data, counters['messages'])
+            except ValueError as e:
+                logger.warning(f"Line {line_num}: Error parsing live chat JSON: {e} - Line content: {line[:200].decode('utf-8', 'replace')}...")
+                continue
+            except Exception as e:
+                logger.warning(f"Line {line_num}: Unexpected error processing live chat JSON: {e} - Line content: {line[:200].decode('utf-8', 'replace')}...")
+                continue
+
+            if message:
+                counters['messages'] += 1
+                yield message
+
+    elapsed = time.perf_counter() - started
+    logger.debug(
+        f"Live chat parsed with {JSON_DECODER}: {counters['lines']} lines, {counters['decoded']} decoded, "
+        f"{counters['messages']} messages in {elapsed:.2f}s ({counters['lines'] / elapsed if elapsed else 0:,.0f} lines/s)"
+    )
+
+
+def _parse_action(data: Dict, position: int) -> Optional[Dict]:
+    replay_chat_item_action = data.get('replayChatItemAction', {})
+    video_offset_msec_str = replay_chat_item_action.get('videoOffsetTimeMsec', '0')
+
+    try:
+        video_offset_msec = int(video_offset_msec_str)
+        timestamp_seconds = video_offset_msec // 1000
+    except (ValueError, TypeError):
+        timestamp_seconds = 0
+
+    actions = replay_chat_item_action.get('actions', [])
+    if not actions:
+        return None
+
+    add_chat_item_action = actions[0].get('addChatItemAction', {})
+    item = add_chat_item_action.get('item', {})
+
+    text_message_renderer = item.get('liveChatTextMessageRenderer')
+    if not text_message_renderer:
+        return None
+
+    message_runs = text_message_renderer.get('message', {}).get('runs', [])
+    message_text = ''.join(run['text'] for run in message_runs if 'text' in run).strip()
+    if not message_text:
+        return None
+
+    author_name = text_message_renderer.get('authorName', {}).get('simpleText', 'Unknown')
+    message_id = text_message_renderer.get('id') or add_chat_item_action.get('clientId', f"livechat_{position}")
+
+    return {
+        'comment': message_text,
+        'user_name': author_name,
+        'created_by_id': '',
+        'profile_picture': '',
+        'commented_at': str(timestamp_seconds),
+        'yt_id': message_id,
+        'parent_id': None,
+    }
@@ -0,0 +1,66 @@
+"""Process-wide metrics registry (gauges and counters)"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_gauges: Dict[str, float] = {}
+_counters: Dict[str, float] = {}
+
+
+def set_gauge(name: str, value: float):
+    with _lock:
+        _gauges[name] = value
+
+
+def inc_counter(name: str, amount: float = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def snapshot() -> Dict:
+    with _lock:
+        return {
+            'timestamp': time.time(),
+            'gauges': dict(_gauges),
+            'counters': dict(_counters),
+        }
+
+
+def write_metrics(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return None
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(snapshot(), f, indent=2, sort_keys=True)
+        os.replace(tmp, target)
+        logger.debug(f"Metrics written to {target}")
+        return str(target)
+    except Exception as e:
+        logger.warning(f"Failed to write metrics to {target}: {e}")
+        return None
+
+
+def start_periodic_export(path: Optional[str], interval: float) -> Optional[threading.Event]:
+    if not path or not interval or interval <= 0:
+        return None
+
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            write_metrics(path)
+
+    threading.Thread(target=run, name="metrics-export", daemon=True).start()
+    return stop
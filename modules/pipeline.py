@@ -0,0 +1,154 @@
+"""Staged producer/consumer pipeline connected by bounded queues"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    def __init__(self, name: str, handler: Callable[[Dict], None], workers: int = 1, queue_size: int = 2):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def put(self, job):
+        self.queue.put(job)
+        with self._lock:
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def record(self, seconds: float, failed: bool):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+            if failed:
+                self.failed += 1
+
+    def snapshot(self, elapsed: float) -> Dict:
+        with self._lock:
+            return {
+                'stage': self.name,
+                'workers': self.workers,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_depth,
+                'processed': self.processed,
+                'failed': self.failed,
+                'throughput_per_min': (self.processed / elapsed * 60) if elapsed > 0 else 0.0,
+                'avg_seconds': (self.busy_seconds / self.processed) if self.processed else 0.0,
+                'utilization': (self.busy_seconds / (elapsed * self.workers)) if elapsed > 0 else 0.0,
+            }
+
+
+class StagedPipeline:
+    """Runs jobs through stages in order; each stage has its own worker threads.
+
+    A handler marks a job finished early by setting ``job['done'] = True``;
+    finished jobs skip the remaining stages. Exceptions are passed to
+    ``on_error`` and also finish the job. ``on_complete`` is called exactly
+    once per job, from whichever worker finished it.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Dict], None], int]], on_complete: Callable[[Dict], None], on_error: Callable[[Dict, Exception], None], queue_size: int = 2, report_interval: float = 30.0):
+        self.stages = [Stage(name, handler, workers, queue_size) for name, handler, workers in stages]
+        self.on_complete = on_complete
+        self.on_error = on_error
+        self.report_interval = report_interval
+        self._started_at = None
+        self._finished = threading.Event()
+
+    def run(self, jobs: Iterable[Dict]) -> List[Dict]:
+        self._started_at = time.monotonic()
+        self._finished.clear()
+
+        for position, stage in enumerate(self.stages):
+            for worker_idx in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(position,),
+                    name=f"{stage.name}-{worker_idx + 1}",
+                    daemon=True
+                )
+                thread.start()
+                stage._threads.append(thread)
+
+        reporter = None
+        if self.report_interval and self.report_interval > 0:
+            reporter = threading.Thread(target=self._reporter, name="pipeline-report", daemon=True)
+            reporter.start()
+
+        try:
+            for job in jobs:
+                self.stages[0].put(job)
+        finally:
+            # Shut stages down front to back so in-flight jobs drain first
+            for stage in self.stages:
+                for _ in range(stage.workers):
+                    stage.put(_STOP)
+                for thread in stage._threads:
+                    thread.join()
+            self._finished.set()
+            if reporter:
+                reporter.join()
+
+        stats = self.stats()
+        self._log_stats(stats, final=True)
+        return stats
+
+    def stats(self) -> List[Dict]:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return [stage.snapshot(elapsed) for stage in self.stages]
+
+    def _worker(self, position: int):
+        stage = self.stages[position]
+        next_stage = self.stages[position + 1] if position + 1 < len(self.stages) else None
+
+        while True:
+            job = stage.queue.get()
+            if job is _STOP:
+                break
+
+            started = time.monotonic()
+            failed = False
+            try:
+                stage.handler(job)
+            except Exception as e:
+                failed = True
+                self.on_error(job, e)
+                job['done'] = True
+            stage.record(time.monotonic() - started, failed)
+
+            if job.get('done') or next_stage is None:
+                job['done'] = True
+                try:
+                    self.on_complete(job)
+                except Exception as e:
+                    logger.error(f"Pipeline completion handler failed: {e}", exc_info=True)
+            else:
+                next_stage.put(job)
+
+    def _reporter(self):
+        while not self._finished.wait(self.report_interval):
+            self._log_stats(self.stats())
+
+    @staticmethod
+    def _log_stats(stats: List[Dict], final: bool = False):
+        header = "📊 Pipeline stage summary" if final else "📊 Pipeline progress"
+        logger.info(header)
+        for s in stats:
+            logger.info(
+                f"   {s['stage']:<9} workers={s['workers']} queue={s['queue_depth']} (max {s['max_queue_depth']}) "
+                f"done={s['processed']} failed={s['failed']} "
+                f"{s['throughput_per_min']:.2f}/min avg={s['avg_seconds']:.1f}s util={s['utilization']:.0%}"
+            )
@@ -0,0 +1,50 @@
+"""Token-bucket rate limiter shared across threads and asyncio tasks"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average, bursting to ``capacity``.
+
+    Callers reserve a token under a lock and then sleep outside of it, so
+    one bucket can be shared by worker threads and by coroutines running
+    in different event loops. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = max(0.0, rate)
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_interval(cls, interval: float, capacity: float = 1.0) -> 'TokenBucket':
+        return cls(1.0 / interval if interval and interval > 0 else 0.0, capacity)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,203 @@
+"""Chunked GCS resumable uploads to signed URLs"""
+
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from .http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+# GCS requires every chunk except the last to be a multiple of 256 KiB
+CHUNK_GRANULARITY = 256 * 1024
+
+_RANGE = re.compile(r'bytes=0-(\d+)')
+
+
+class UploadSessionExpired(Exception):
+    pass
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ResumableUploader:
+    """Uploads a file through the GCS resumable protocol.
+
+    A session is opened with ``POST`` + ``x-goog-resumable: start`` on the
+    signed URL; the file then goes up in ``chunk_size`` PUTs with a
+    ``Content-Range``. After a failed chunk the committed offset is queried
+    (``Content-Range: bytes */<size>``) and the upload continues from there,
+    up to ``max_retries`` consecutive failures. A session URI from an earlier
+    run can be passed back in to continue that upload.
+
+    ``upload_stream`` does the same from a readable stream of known size
+    (such as a BytePipe), keeping only the unacknowledged chunk in memory.
+    """
+
+    def __init__(self, chunk_size: int = 8 * 1024 * 1024, max_retries: int = 5, timeout: float = 120.0):
+        self.chunk_size = max(1, chunk_size // CHUNK_GRANULARITY) * CHUNK_GRANULARITY
+        self.max_retries = max(0, max_retries)
+        self.timeout = timeout
+
+    def upload(self, file_path: str, signed_url: str, content_type: str, session_uri: Optional[str] = None, on_session: Optional[Callable[[str], None]] = None) -> Dict:
+        with open(file_path, 'rb') as f:
+            def read_at(offset: int, size: int) -> bytes:
+                f.seek(offset)
+                return f.read(size)
+            
+            return self._upload(read_at, os.path.getsize(file_path), signed_url, content_type, session_uri, on_session)
+
+    def upload_stream(self, stream, size: int, signed_url: str, content_type: str, session_uri: Optional[str] = None, on_session: Optional[Callable[[str], None]] = None) -> Dict:
+        return self._upload(_StreamWindow(stream).read_at, size, signed_url, content_type, session_uri, on_session)
+
+    def _upload(self, read_at: Callable[[int, int], bytes], total: int, signed_url: str, content_type: str, session_uri: Optional[str], on_session: Optional[Callable[[str], None]]) -> Dict:
+        offset = 0
+
+        if session_uri:
+            try:
+                offset = self.query_offset(session_uri, total)
+                logger.info(f"🔁 Resuming upload session at {offset / (1024*1024):.1f}/{total / (1024*1024):.1f} MB")
+            except (UploadSessionExpired, _RetryableStatus, requests.RequestException) as e:
+                logger.warning(f"⚠️  Stored upload session unusable ({e}), starting a new one")
+                session_uri = None
+
+        if not session_uri:
+            session_uri = self.initiate(signed_url, content_type)
+            offset = 0
+            if on_session:
+                on_session(session_uri)
+        resumed_from = offset
+
+        failures = 0
+        while offset < total or total == 0:
+            chunk = read_at(offset, self.chunk_size)
+            try:
+                offset, done = self._put_chunk(session_uri, chunk, offset, total)
+                failures = 0
+            except UploadSessionExpired:
+                if failures >= self.max_retries:
+                    raise
+                failures += 1
+                logger.warning("⚠️  Upload session expired, starting over with a new session")
+                session_uri = self.initiate(signed_url, content_type)
+                offset = 0
+                if on_session:
+                    on_session(session_uri)
+                continue
+            except (requests.RequestException, _RetryableStatus) as e:
+                failures += 1
+                if failures > self.max_retries:
+                    raise
+                delay = min(2 ** (failures - 1), 30)
+                logger.warning(f"⚠️  Chunk at {offset} failed ({e}), retry {failures}/{self.max_retries} in {delay}s")
+                time.sleep(delay)
+                offset = self._query_after_failure(session_uri, total, offset)
+                continue
+
+            if done:
+                break
+            logger.debug(f"Uploaded {offset / (1024*1024):.1f}/{total / (1024*1024):.1f} MB")
+
+        return {'success': True, 'session_uri': session_uri, 'resumed_from': resumed_from, 'bytes_sent': total - resumed_from}
+
+    def initiate(self, signed_url: str, content_type: str) -> str:
+        response = get_session().post(
+            signed_url,
+            headers={'x-goog-resumable': 'start', 'Content-Type': content_type, 'Content-Length': '0'},
+            timeout=self.timeout
+        )
+        if response.status_code not in (200, 201) or not response.headers.get('Location'):
+            raise requests.HTTPError(f"Could not start resumable upload: HTTP {response.status_code}", response=response)
+        return response.headers['Location']
+
+    def query_offset(self, session_uri: str, total: int) -> int:
+        response = get_session().put(
+            session_uri,
+            headers={'Content-Range': f'bytes */{total}', 'Content-Length': '0'},
+            timeout=self.timeout
+        )
+        if response.status_code in (200, 201):
+            return total
+        if response.status_code == 308:
+            return _committed(response)
+        if response.status_code in (404, 410):
+            raise UploadSessionExpired(f"HTTP {response.status_code}")
+        raise _RetryableStatus(response.status_code)
+
+    def _query_after_failure(self, session_uri: str, total: int, offset: int) -> int:
+        try:
+            return self.query_offset(session_uri, total)
+        except (requests.RequestException, _RetryableStatus):
+            # Re-sending from the last known offset is safe: GCS ignores
+            # bytes it has already committed
+            return offset
+
+    def _put_chunk(self, session_uri: str, chunk: bytes, offset: int, total: int):
+        if chunk:
+            content_range = f'bytes {offset}-{offset + len(chunk) - 1}/{total}'
+        else:
+            content_range = f'bytes */{total}'
+        response = get_session().put(
+            session_uri,
+            data=chunk,
+            headers={'Content-Range': content_range},
+            timeout=self.timeout
+        )
+        if response.status_code in (200, 201):
+            return total, True
+        if response.status_code == 308:
+            return _committed(response), False
+        if response.status_code in (404, 410):
+            raise UploadSessionExpired(f"HTTP {response.status_code}")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableStatus(response.status_code)
+        raise requests.HTTPError(f"Chunk upload rejected: HTTP {response.status_code}", response=response)
+
+
+class _StreamWindow:
+    # Random access over a forward-only stream, for offsets at or after the
+    # last chunk handed out: GCS never asks to go back past committed bytes.
+    # A session expiring mid-stream can't restart from 0 and fails instead.
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.start = 0
+        self.buffer = bytearray()
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        if offset < self.start:
+            raise IOError(f"stream can't rewind to byte {offset} (at {self.start})")
+        drop = offset - self.start
+        if drop > len(self.buffer):
+            # Resuming a stored session far into the stream: skip the bytes
+            # GCS already has in bounded reads instead of buffering them
+            skip = drop - len(self.buffer)
+            self.buffer.clear()
+            while skip > 0:
+                data = self.stream.read(min(skip, size))
+                if not data:
+                    raise IOError(f"stream ended {skip} bytes before byte {offset}")
+                skip -= len(data)
+        else:
+            del self.buffer[:drop]
+        self.start = offset
+        while len(self.buffer) < size:
+            data = self.stream.read(size - len(self.buffer))
+            if not data:
+                break
+            self.buffer += data
+        return bytes(self.buffer[:size])
+
+
+def _committed(response: requests.Response) -> int:
+    # 308 carries "Range: bytes=0-<last committed byte>"; no header = nothing stored yet
+    match = _RANGE.match(response.headers.get('Range', ''))
+    return int(match.group(1)) + 1 if match else 0
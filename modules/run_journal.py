@@ -0,0 +1,90 @@
+"""Durable per-video progress journal (SQLite) for resumable runs"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    url TEXT PRIMARY KEY,
+    category TEXT,
+    asset_id TEXT,
+    upload_url TEXT,
+    upload_session TEXT,
+    upload_done INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    comments_imported INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL
+);
+"""
+
+
+class RunJournal:
+    """Records which stages each video finished, so an interrupted run can resume.
+
+    Per video: the asset created for it (its signed upload URL and, for
+    resumable uploads, the GCS session URI), whether the upload finished,
+    and whether the video completed. Published comments are tracked by the
+    CommentLedger. Every write commits immediately, so a crash loses at
+    most the request that was in flight.
+    """
+
+    def __init__(self, path: str = "cache/run_journal.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def start_run(self, resume: bool):
+        with self._lock:
+            if resume:
+                row = self._conn.execute("SELECT COUNT(*) AS total, SUM(completed) AS completed FROM videos").fetchone()
+                logger.info(f"📒 Resuming from journal {self.path}: {row['completed'] or 0}/{row['total']} videos already complete")
+            else:
+                self._conn.execute("DELETE FROM videos")
+
+    def get_video(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM videos WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def record_asset(self, url: str, category: str, asset_id: str, upload_url: Optional[str]):
+        self._upsert(url, category=category, asset_id=asset_id, upload_url=upload_url, upload_session=None, upload_done=0, completed=0, error=None)
+
+    def record_upload_session(self, url: str, session_uri: str):
+        self._upsert(url, upload_session=session_uri)
+
+    def mark_upload_done(self, url: str):
+        self._upsert(url, upload_done=1)
+
+    def mark_completed(self, url: str, asset_id: Optional[str], comments_imported: int):
+        self._upsert(url, asset_id=asset_id, completed=1, comments_imported=comments_imported, error=None)
+
+    def mark_failed(self, url: str, error: str):
+        self._upsert(url, error=error)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _upsert(self, url: str, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(fields)
+        placeholders = ', '.join('?' for _ in fields)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in fields)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO videos (url, {columns}) VALUES (?, {placeholders}) "
+                f"ON CONFLICT(url) DO UPDATE SET {updates}",
+                (url, *fields.values())
+            )
@@ -0,0 +1,165 @@
+"""Bounded in-memory pipe for overlapping a video download with its upload"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import requests
+
+from .http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+# Ranged GETs keep each request short; YouTube throttles long single
+# responses (yt-dlp uses the same 10 MiB default for http_chunk_size)
+RANGE_SIZE = 10 * 1024 * 1024
+READ_SIZE = 256 * 1024
+RANGE_RETRIES = 3
+
+_CONTENT_RANGE_TOTAL = re.compile(r'bytes \d+-\d+/(\d+)')
+
+
+class PipeClosed(Exception):
+    pass
+
+
+class BytePipe:
+    """One writer thread, one reader; holds at most ``capacity`` bytes.
+
+    The writer blocks while the pipe is full, the reader while it is empty.
+    ``len()`` is the total size of the stream, which lets ``requests`` send
+    the pipe as a file body with a ``Content-Length``. A writer failure is
+    re-raised on the reader side; a reader that gives up (``abort``) makes
+    the next ``write`` raise ``PipeClosed``.
+    """
+
+    def __init__(self, size: int, capacity: int = 64 * 1024 * 1024):
+        self.size = size
+        self.capacity = max(READ_SIZE, capacity)
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self._chunks: deque = deque()
+        self._buffered = 0
+        self._closed = False
+        self._aborted = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def write(self, data: bytes):
+        with self._cond:
+            while self._buffered >= self.capacity and not self._aborted:
+                self._cond.wait()
+            if self._aborted:
+                raise PipeClosed("reader stopped")
+            self._chunks.append(data)
+            self._buffered += len(data)
+            self.bytes_written += len(data)
+            self._cond.notify_all()
+
+    def close(self, error: Optional[BaseException] = None):
+        with self._cond:
+            if error is None and self.bytes_written != self.size:
+                error = IOError(f"stream ended after {self.bytes_written} of {self.size} bytes")
+            self._error = error
+            self._closed = True
+            self._cond.notify_all()
+
+    def abort(self):
+        with self._cond:
+            self._aborted = True
+            self._chunks.clear()
+            self._buffered = 0
+            self._cond.notify_all()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b''.join(iter(lambda: self.read(READ_SIZE), b''))
+        with self._cond:
+            while not self._chunks and not self._closed:
+                self._cond.wait()
+            if not self._chunks:
+                if self._error is not None:
+                    raise self._error
+                return b''
+
+            wanted = size
+            parts = []
+            while self._chunks and wanted > 0:
+                chunk = self._chunks.popleft()
+                if len(chunk) > wanted:
+                    self._chunks.appendleft(chunk[wanted:])
+                    chunk = chunk[:wanted]
+                parts.append(chunk)
+                wanted -= len(chunk)
+                self._buffered -= len(chunk)
+            self._cond.notify_all()
+
+        data = b''.join(parts)
+        self.bytes_read += len(data)
+        return data
+
+
+def probe_size(url: str, headers: Dict[str, str]) -> int:
+    response = get_session().get(url, headers={**headers, 'Range': 'bytes=0-0'}, timeout=30)
+    match = _CONTENT_RANGE_TOTAL.match(response.headers.get('Content-Range', ''))
+    if response.status_code == 206 and match:
+        return int(match.group(1))
+    raise IOError(f"Could not determine stream size (HTTP {response.status_code})")
+
+
+def download_into(pipe: BytePipe, url: str, headers: Dict[str, str], range_size: int = RANGE_SIZE, throttle: Optional[Callable[[int], None]] = None):
+    """Fetch ``url`` in ranged GETs and write every byte to ``pipe``, then close it.
+
+    ``throttle`` (if given) is called with the size of every block read and
+    may block to hold the transfer under a rate ceiling.
+    """
+    started = time.monotonic()
+    try:
+        offset = 0
+        while offset < pipe.size:
+            end = min(offset + range_size, pipe.size) - 1
+            offset = _fetch_range(pipe, url, headers, offset, end, throttle)
+        pipe.close()
+        elapsed = time.monotonic() - started
+        logger.debug(f"Stream download finished: {pipe.size / (1024*1024):.1f} MB in {elapsed:.1f}s")
+    except PipeClosed:
+        pipe.close(PipeClosed("reader stopped"))
+    except Exception as e:
+        pipe.close(e)
+
+
+def _fetch_range(pipe: BytePipe, url: str, headers: Dict[str, str], offset: int, end: int, throttle: Optional[Callable[[int], None]] = None) -> int:
+    # Returns the new offset; retries resume from the last byte written
+    attempt = 0
+    while True:
+        try:
+            response = get_session().get(url, headers={**headers, 'Range': f'bytes={offset}-{end}'}, stream=True, timeout=60)
+            try:
+                if response.status_code != 206:
+                    raise IOError(f"Range request failed: HTTP {response.status_code}")
+                for block in response.iter_content(READ_SIZE):
+                    if block:
+                        block = block[:end + 1 - offset]
+                        if throttle is not None:
+                            throttle(len(block))
+                        pipe.write(block)
+                        offset += len(block)
+            finally:
+                response.close()
+            if offset > end:
+                return offset
+            raise IOError(f"Range response ended at byte {offset} of {end + 1}")
+        except PipeClosed:
+            raise
+        except (requests.RequestException, IOError) as e:
+            attempt += 1
+            if attempt > RANGE_RETRIES:
+                raise
+            logger.warning(f"⚠️  Stream download interrupted at {offset / (1024*1024):.1f} MB ({e}), retry {attempt}/{RANGE_RETRIES}")
+            time.sleep(attempt)
@@ -0,0 +1,89 @@
+"""Single-pass timestamp detection for comment text"""
+
+import re
+from typing import NamedTuple, Optional, Tuple
+
+# Zero-width so finditer reports a candidate at every start position, the
+# same positions the old per-pattern re.search calls would have tried.
+_CANDIDATE = re.compile(r'(?=(\d{1,2}):(\d{2})(?::(\d{2}))?)')
+_SUFFIX = re.compile(r'\s+(?:is|was|at)', re.IGNORECASE)
+# Removal stays sequential (each pass sees the previous one's output) so the
+# cleaned text is identical to what the original implementation produced.
+_STRIP_PASSES = [
+    re.compile(r'(?:at|@)\s*\d{1,2}:\d{2}(?::\d{2})?', re.IGNORECASE),
+    re.compile(r'\d{1,2}:\d{2}(?::\d{2})?\s+(?:is|was|at)', re.IGNORECASE),
+    re.compile(r'^\d{1,2}:\d{2}(?::\d{2})?\s*'),
+    re.compile(r'\d{1,2}:\d{2}(?::\d{2})?'),
+]
+_SPACES = re.compile(r'\s+')
+
+
+class TimestampMatch(NamedTuple):
+    seconds: int
+    span: Tuple[int, int]
+    text: str
+
+
+def find_timestamp(text: str) -> Optional[TimestampMatch]:
+    """Return the timestamp a comment refers to, its span and the text without timestamps.
+
+    Precedence matches the original pattern list: "at 1:23" / "@1:23"
+    first, then "1:23 is|was|at", then the first bare "1:23" (or "1:02:03").
+    """
+    # Cheap reject for the large majority of comments
+    if not text or ':' not in text:
+        return None
+
+    first = None
+    suffixed = None
+    for match in _CANDIDATE.finditer(text):
+        start = match.start()
+        if first is None:
+            first = match
+        if _has_at_prefix(text, start):
+            return _build(text, match)
+        if suffixed is None:
+            end = _candidate_end(match)
+            if _SUFFIX.match(text, end):
+                suffixed = match
+
+    chosen = suffixed or first
+    return _build(text, chosen) if chosen is not None else None
+
+
+def extract_timestamp(text: str) -> int:
+    match = find_timestamp(text)
+    return match.seconds if match else 0
+
+
+def strip_timestamps(text: str) -> str:
+    cleaned_text = text or ''
+    if ':' in cleaned_text:
+        for pattern in _STRIP_PASSES:
+            cleaned_text = pattern.sub('', cleaned_text)
+    return _SPACES.sub(' ', cleaned_text).strip()
+
+
+def _has_at_prefix(text: str, start: int) -> bool:
+    i = start
+    while i > 0 and text[i - 1].isspace():
+        i -= 1
+    if i > 0 and text[i - 1] == '@':
+        return True
+    return i > 1 and text[i - 2:i].lower() == 'at'
+
+
+def _candidate_end(match) -> int:
+    end = match.start() + len(match.group(1)) + 1 + len(match.group(2))
+    if match.group(3):
+        end += 1 + len(match.group(3))
+    return end
+
+
+def _build(text: str, match) -> TimestampMatch:
+    first, second, third = match.groups()
+    if third:
+        seconds = int(first) * 3600 + int(second) * 60 + int(third)
+    else:
+        seconds = int(first) * 60 + int(second)
+    return TimestampMatch(seconds, (match.start(), _candidate_end(match)), strip_timestamps(text))
@@ -2,6 +2,7 @@
 
 import random
 import string
+import threading
 import uuid
 from typing import Dict
 
@@ -12,6 +13,7 @@ class UserRandomizer:
         self.avatar_map: Dict[str, str] = {}
         self.user_id_map: Dict[str, str] = {}
         self.counter = 1
+        self._lock = threading.RLock()
     
     def get_randomized_name(self, original_name: str) -> str:
         if original_name in self.name_map:
@@ -62,12 +64,15 @@ class UserRandomizer:
     def anonymize_comment(self, comment: Dict) -> Dict:
         original_name = comment.get('user_name', 'Unknown')
         
-        if 'user_name' in comment:
-            comment['user_name'] = self.get_randomized_name(original_name)
-        
-        comment['profile_picture'] = self.get_random_avatar(original_name)
-        
-        comment['created_by_id'] = self.get_user_id(original_name)
+        # Maps are shared between videos processed in parallel, and
+        # get_random_avatar temporarily reseeds the global RNG.
+        with self._lock:
+            if 'user_name' in comment:
+                comment['user_name'] = self.get_randomized_name(original_name)
+            
+            comment['profile_picture'] = self.get_random_avatar(original_name)
+            
+            comment['created_by_id'] = self.get_user_id(original_name)
         
         return comment
     
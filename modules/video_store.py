@@ -0,0 +1,206 @@
+"""Content-addressed store for downloaded videos, with upload tracking and retention"""
+
+import hashlib
+import json
+import logging
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .cache_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+HASH_BLOCK = 1024 * 1024
+
+
+class VideoStore:
+    """Keeps downloaded videos under their sha256, so each is fetched once.
+
+    The manifest maps ``video_id -> digest`` and ``digest -> blob`` (path,
+    size, timestamps, and the asset IDs the blob was uploaded to, per
+    backend). Both are dicts, so lookups never scan the directory. Blobs
+    live at ``<root>/<digest[:2]>/<digest>.<ext>``; two video IDs with the
+    same bytes share one blob.
+
+    Retention: blobs unused for ``max_age_days`` are dropped, then the
+    least recently used ones until the store fits in ``max_bytes`` (0
+    disables either rule). Every job using a video ``pin``s it and
+    ``release``s it when done; a blob with any pin left is never evicted,
+    so one job finishing can't free a blob another is still uploading.
+    """
+
+    def __init__(self, root: str = "cache/videos", max_bytes: int = 0, max_age_days: float = 0):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.root / "manifest.json"
+        self.max_bytes = max(0, max_bytes)
+        self.max_age_days = max(0, max_age_days)
+        self._lock = threading.Lock()
+        self._videos: Dict[str, str] = {}
+        self._blobs: Dict[str, Dict] = {}
+        # video_id -> number of pins held on it
+        self._pinned: Dict[str, int] = {}
+        self._load()
+
+    def lookup(self, video_id: str) -> Optional[Dict]:
+        with self._lock:
+            blob = self._blob_for(video_id)
+            if blob is None:
+                return None
+            blob['last_used'] = time.time()
+            self._save()
+            return dict(blob)
+
+    def pin(self, video_id: str):
+        with self._lock:
+            self._pinned[video_id] = self._pinned.get(video_id, 0) + 1
+
+    def release(self, video_id: str):
+        with self._lock:
+            pins = self._pinned.pop(video_id, 0) - 1
+            if pins > 0:
+                self._pinned[video_id] = pins
+
+    def contains(self, file_path: str) -> bool:
+        try:
+            return Path(file_path).resolve().is_relative_to(self.root.resolve())
+        except OSError:
+            return False
+
+    def add(self, video_id: str, file_path: str) -> Dict:
+        """Move a finished download into the store and return its blob entry."""
+        source = Path(file_path)
+        digest = _sha256(source)
+        size = source.stat().st_size
+        target = self.root / digest[:2] / f"{digest}{source.suffix.lower()}"
+
+        with self._lock:
+            blob = self._blobs.get(digest)
+            if blob and Path(blob['path']).exists():
+                source.unlink()
+                logger.info(f"📦 {video_id} has the same content as a stored video, reusing {blob['path']}")
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(source), str(target))
+                now = time.time()
+                blob = {'digest': digest, 'path': str(target), 'size': size, 'added_at': now, 'last_used': now, 'uploads': {}}
+                self._blobs[digest] = blob
+                logger.info(f"📦 Stored {video_id} as {target} ({size / (1024*1024):.2f} MB)")
+            self._videos[video_id] = digest
+            blob['last_used'] = time.time()
+            self._enforce_retention(keep=digest)
+            self._save()
+            return dict(blob)
+
+    def uploaded_asset(self, video_id: str, backend: str) -> Optional[str]:
+        with self._lock:
+            blob = self._blob_for(video_id)
+            asset_ids = (blob or {}).get('uploads', {}).get(backend) or []
+            return asset_ids[-1] if asset_ids else None
+
+    def record_upload(self, video_id: str, backend: str, asset_id: str):
+        with self._lock:
+            blob = self._blob_for(video_id)
+            if blob is None:
+                return
+            asset_ids = blob['uploads'].setdefault(backend, [])
+            if asset_id not in asset_ids:
+                asset_ids.append(asset_id)
+            self._save()
+
+    def forget_uploads(self, video_id: str, backend: str) -> List[str]:
+        """Drop the assets recorded for ``backend`` so the next upload is a fresh one."""
+        with self._lock:
+            blob = self._blob_for(video_id)
+            if blob is None:
+                return []
+            asset_ids = blob['uploads'].pop(backend, [])
+            if asset_ids:
+                self._save()
+            return asset_ids
+
+    def enforce_retention(self) -> int:
+        with self._lock:
+            removed = self._enforce_retention()
+            self._save()
+            return removed
+
+    def _blob_for(self, video_id: str) -> Optional[Dict]:
+        digest = self._videos.get(video_id)
+        blob = self._blobs.get(digest) if digest else None
+        if blob is None:
+            return None
+        if not Path(blob['path']).exists():
+            logger.warning(f"Stored video for {video_id} is missing ({blob['path']}), forgetting it")
+            self._drop(digest)
+            self._save()
+            return None
+        return blob
+
+    def _enforce_retention(self, keep: Optional[str] = None) -> int:
+        removed = 0
+        pinned = {self._videos[video_id] for video_id in self._pinned if video_id in self._videos}
+        if keep:
+            pinned.add(keep)
+        if self.max_age_days:
+            cutoff = time.time() - self.max_age_days * 86400
+            for digest in [d for d, blob in self._blobs.items() if blob['last_used'] < cutoff and d not in pinned]:
+                removed += self._evict(digest, "unused for too long")
+
+        if self.max_bytes:
+            total = sum(blob['size'] for blob in self._blobs.values())
+            for digest in sorted(self._blobs, key=lambda d: self._blobs[d]['last_used']):
+                if total <= self.max_bytes:
+                    break
+                if digest in pinned:
+                    continue
+                total -= self._blobs[digest]['size']
+                removed += self._evict(digest, "store over size limit")
+        return removed
+
+    def _evict(self, digest: str, reason: str) -> int:
+        blob = self._blobs[digest]
+        try:
+            Path(blob['path']).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Error deleting stored video {blob['path']}: {e}")
+            return 0
+        self._drop(digest)
+        logger.info(f"🗑️  Evicted stored video {blob['path']} ({blob['size'] / (1024*1024):.2f} MB, {reason})")
+        return 1
+
+    def _drop(self, digest: str):
+        self._blobs.pop(digest, None)
+        for video_id in [v for v, d in self._videos.items() if d == digest]:
+            del self._videos[video_id]
+
+    def _load(self):
+        if not self.manifest_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable video store manifest {self.manifest_file}: {e}")
+            return
+        if manifest.get('version') != MANIFEST_VERSION:
+            return
+        self._videos = manifest.get('videos', {})
+        self._blobs = manifest.get('blobs', {})
+
+    def _save(self):
+        atomic_write_json(self.manifest_file, {'version': MANIFEST_VERSION, 'videos': self._videos, 'blobs': self._blobs})
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,242 +1,609 @@
 """YouTube Video Metadata and Comments Extractor"""
 
 import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+import contextlib
+import copy
 import os
 import logging
+import gzip
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 import json
 import re
 
+from .cache_cleanup import invalidate_video_cache
+from .cache_store import iter_jsonl_gz, read_versioned, write_jsonl_gz, write_versioned
+from .comment_mapping import ParallelCommentParser
+from .download_engine import DownloadEngine
+from .format_policy import FALLBACK_FORMAT, FormatPolicy
+from . import metrics
+from .live_chat_parser import iter_live_chat
+from .timestamp_parser import extract_timestamp, find_timestamp, strip_timestamps
+from .video_store import VideoStore
+
 logger = logging.getLogger(__name__)
 
+INFO_CACHE_VERSION = 1
+METADATA_CACHE_VERSION = 1
+COMMENTS_CACHE_VERSION = 1
+# The only raw fields _process_flat_comments reads
+COMMENT_CACHE_FIELDS = ('id', 'parent', 'text', 'author', 'author_thumbnail')
+LIVE_CHAT_CACHE_VERSION = 1
+# Per-message fields that vary; the rest are constants restored on load
+LIVE_CHAT_CACHE_FIELDS = ('comment', 'user_name', 'commented_at', 'yt_id')
+# Marks "timestamp not parsed yet" (None means parsed, no timestamp)
+_UNPARSED = object()
+# Raw comments buffered between the extractor thread and a streaming consumer
+COMMENT_STREAM_BUFFER = 1000
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.mkv', '.flv', '.3gp', '.avi', '.mov', '.m4v'}
+
+
+def _comment_hook_supported() -> bool:
+    # Comment streaming swaps out the private InfoExtractor._get_comments,
+    # which extract_comments calls in the pinned yt-dlp (requirements.txt).
+    # A release that stops calling it gets the unstreamed path instead.
+    code = getattr(getattr(InfoExtractor, 'extract_comments', None), '__code__', None)
+    return code is not None and '_get_comments' in code.co_names
+
+
+COMMENT_HOOK_SUPPORTED = _comment_hook_supported()
+
+
 class YouTubeProcessor:
-    def extract_video_info(self, youtube_url: str) -> Dict:
-        ydl_opts = {
-            "format": "best[ext=mp4]",
+    def __init__(self, cache_dir: str = "cache", info_cache_on_disk: bool = False, info_cache_ttl: int = 3600, metadata_cache_enabled: bool = True, metadata_cache_ttl: int = 7 * 24 * 3600, comment_parser: Optional[ParallelCommentParser] = None, video_store: Optional[VideoStore] = None, download_engine: Optional[DownloadEngine] = None, format_policy: Optional[FormatPolicy] = None):
+        self.cache_dir = Path(cache_dir)
+        self.info_cache_on_disk = info_cache_on_disk
+        self.info_cache_ttl = info_cache_ttl
+        self.metadata_cache_enabled = metadata_cache_enabled
+        self.metadata_cache_ttl = metadata_cache_ttl
+        self.comment_parser = comment_parser
+        self.video_store = video_store
+        self.download_engine = download_engine
+        self.format_policy = format_policy or FormatPolicy()
+        # video_id -> format chosen by the policy (rule, estimated bytes)
+        self._format_choices: Dict[str, Dict] = {}
+        # video_id -> {'info': dict without comments, 'comments': list or None}
+        self._info_cache: Dict[str, Dict] = {}
+        self._info_locks: Dict[str, threading.Lock] = {}
+        # video_id -> number of jobs holding the video (hold_video/release_video)
+        self._holders: Dict[str, int] = {}
+        self._locks_guard = threading.Lock()
+        self.extractions = 0
+    
+    @staticmethod
+    def _video_id(youtube_url: str) -> str:
+        return youtube_url.split('watch?v=')[-1].split('&')[0]
+    
+    def _video_lock(self, video_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._info_locks.setdefault(video_id, threading.Lock())
+    
+    def _comments_cache_file(self, video_id: str) -> Path:
+        return self.cache_dir / f"comments_cache_{video_id}.jsonl.gz"
+    
+    def _legacy_comments_cache_file(self, video_id: str) -> Path:
+        return self.cache_dir / f"comments_cache_{video_id}.json"
+    
+    def _info_cache_file(self, video_id: str) -> Path:
+        return self.cache_dir / f"info_cache_{video_id}.json"
+    
+    def _metadata_cache_file(self, video_id: str) -> Path:
+        return self.cache_dir / f"metadata_cache_{video_id}.json"
+    
+    @staticmethod
+    def _base_ydl_opts() -> Dict:
+        opts = {
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False,
-            'noplaylist': True
+            'noplaylist': True,
         }
+        if os.path.exists('cookies.txt'):
+            opts['cookiefile'] = 'cookies.txt'
+        return opts
+    
+    def _get_info(self, youtube_url: str, need_comments: bool = False) -> Dict:
+        # One extractor run per video serves metadata, formats and subtitles
+        # to every method below; comments take one more run, kept alongside.
+        video_id = self._video_id(youtube_url)
         
-        try:
+        with self._video_lock(video_id):
+            entry = self._info_cache.get(video_id)
+            if entry is None and self.info_cache_on_disk:
+                entry = self._load_info_from_disk(video_id)
+                if entry is not None:
+                    self._info_cache[video_id] = entry
+            
+            if entry is not None and (not need_comments or entry['comments'] is not None):
+                return entry
+            
+            ydl_opts = self._base_ydl_opts()
+            if need_comments:
+                ydl_opts['getcomments'] = True
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(youtube_url, download=False)
-                
-                video_data = {
-                    'title': info.get('title', ''),
-                    'description': info.get('description', ''),
-                    'keywords': info.get('tags', []),
-                }
-                
-                video_data['_raw_ytdlp'] = {
-                    'title': info.get('title', ''),
-                    'description': info.get('description', ''),
-                    'tags': info.get('tags', []),
-                }
-                
-                return video_data
-                
+            self.extractions += 1
+            logger.debug(f"yt-dlp extraction #{self.extractions} for {video_id} (comments={need_comments})")
+            
+            comments = info.pop('comments', None) if need_comments else None
+            entry = {'info': info, 'comments': comments if comments is not None else ([] if need_comments else None)}
+            self._info_cache[video_id] = entry
+            
+            if self.info_cache_on_disk:
+                self._save_info_to_disk(video_id, info)
+            
+            return entry
+    
+    def _load_info_from_disk(self, video_id: str) -> Optional[Dict]:
+        cache_file = self._info_cache_file(video_id)
+        info = read_versioned(cache_file, INFO_CACHE_VERSION, video_id, ttl=self.info_cache_ttl)
+        if info is None:
+            return None
+        logger.info(f"📂 Loading yt-dlp info from cache: {cache_file}")
+        return {'info': info, 'comments': None}
+    
+    def _save_info_to_disk(self, video_id: str, info: Dict):
+        cache_file = self._info_cache_file(video_id)
+        try:
+            write_versioned(cache_file, INFO_CACHE_VERSION, video_id, yt_dlp.YoutubeDL.sanitize_info(info))
+        except Exception as e:
+            logger.warning(f"Failed to write info cache {cache_file}: {e}")
+    
+    def _load_metadata(self, video_id: str) -> Optional[Dict]:
+        cache_file = self._metadata_cache_file(video_id)
+        data = read_versioned(cache_file, METADATA_CACHE_VERSION, video_id, ttl=self.metadata_cache_ttl)
+        if data is not None:
+            logger.info(f"📂 Loading video metadata from cache: {cache_file}")
+        return data
+    
+    def _save_metadata(self, video_id: str, metadata: Dict):
+        cache_file = self._metadata_cache_file(video_id)
+        try:
+            write_versioned(cache_file, METADATA_CACHE_VERSION, video_id, metadata)
+        except Exception as e:
+            logger.warning(f"Failed to write metadata cache {cache_file}: {e}")
+    
+    @staticmethod
+    def _summarize_metadata(info: Dict) -> Dict:
+        formats = []
+        for fmt in info.get('formats') or []:
+            formats.append({
+                'format_id': fmt.get('format_id'),
+                'ext': fmt.get('ext'),
+                'height': fmt.get('height'),
+                'vcodec': fmt.get('vcodec'),
+                'acodec': fmt.get('acodec'),
+                'filesize': fmt.get('filesize') or fmt.get('filesize_approx'),
+                'tbr': fmt.get('tbr'),
+                'protocol': fmt.get('protocol'),
+            })
+        return {
+            'title': info.get('title', ''),
+            'description': info.get('description', ''),
+            'tags': info.get('tags', []),
+            'duration': info.get('duration'),
+            'formats': formats,
+        }
+    
+    def hold_video(self, youtube_url: str):
+        """Keep a video's shared info and stored file until the matching release_video."""
+        video_id = self._video_id(youtube_url)
+        with self._locks_guard:
+            self._holders[video_id] = self._holders.get(video_id, 0) + 1
+        if self.video_store is not None:
+            self.video_store.pin(video_id)
+    
+    def release_video(self, youtube_url: str):
+        # The same URL can be in flight twice (listed under two categories);
+        # the shared info and its lock go only with the last holder
+        video_id = self._video_id(youtube_url)
+        with self._locks_guard:
+            holders = self._holders.pop(video_id, 0) - 1
+            if holders > 0:
+                self._holders[video_id] = holders
+            else:
+                self._info_cache.pop(video_id, None)
+                self._info_locks.pop(video_id, None)
+                self._format_choices.pop(video_id, None)
+        if self.video_store is not None:
+            self.video_store.release(video_id)
+    
+    def invalidate_cache(self, youtube_url: str) -> int:
+        """Forget everything cached for a video so the next run re-extracts it."""
+        video_id = self._video_id(youtube_url)
+        with self._locks_guard:
+            self._info_cache.pop(video_id, None)
+            self._format_choices.pop(video_id, None)
+        deleted = invalidate_video_cache(video_id, str(self.cache_dir))
+        if deleted:
+            logger.info(f"🔄 Dropped {deleted} cached file(s) for {video_id}")
+        return deleted
+    
+    def extract_video_info(self, youtube_url: str) -> Dict:
+        video_id = self._video_id(youtube_url)
+        
+        try:
+            metadata = None
+            if self.metadata_cache_enabled:
+                metadata = self._load_metadata(video_id)
+            
+            if metadata is None:
+                info = self._get_info(youtube_url)['info']
+                metadata = self._summarize_metadata(info)
+                if self.metadata_cache_enabled:
+                    self._save_metadata(video_id, metadata)
+            
+            video_data = {
+                'title': metadata.get('title', ''),
+                'description': metadata.get('description', ''),
+                'keywords': metadata.get('tags', []),
+                'duration': metadata.get('duration'),
+                'formats': metadata.get('formats', []),
+            }
+            
+            video_data['_raw_ytdlp'] = {
+                'title': metadata.get('title', ''),
+                'description': metadata.get('description', ''),
+                'tags': metadata.get('tags', []),
+            }
+            
+            return video_data
+            
         except Exception as e:
             logger.error(f"Error extracting video info: {e}", exc_info=True)
             raise
     
+    def _save_comments_cache(self, video_id: str, comment_entries: Iterable[Dict], stats: Dict, count: Optional[int] = None):
+        cache_file = self._comments_cache_file(video_id)
+        header = {
+            'schema': 'comments',
+            'version': COMMENTS_CACHE_VERSION,
+            'key': video_id,
+            'cached_at': time.time(),
+            'count': len(comment_entries) if count is None else count,
+            'stats': stats,
+        }
+        records = ({field: raw[field] for field in COMMENT_CACHE_FIELDS if raw.get(field) is not None}
+                   for raw in comment_entries)
+        write_jsonl_gz(cache_file, header, records)
+    
+    def _load_comments_cache(self, video_id: str, migrate_only: bool = False) -> Optional[List[Dict]]:
+        cache_file = self._comments_cache_file(video_id)
+        legacy_file = self._legacy_comments_cache_file(video_id)
+        
+        if not cache_file.exists() and legacy_file.exists():
+            logger.info(f"🔄 Migrating comment cache to compact format: {legacy_file}")
+            try:
+                with open(legacy_file, 'r') as f:
+                    legacy = json.load(f)
+                self._save_comments_cache(video_id, legacy.get('comments', []), legacy.get('stats', {}))
+                legacy_file.unlink()
+            except Exception as e:
+                logger.warning(f"Failed to migrate comment cache {legacy_file}: {e}")
+                return None
+        
+        if migrate_only or not cache_file.exists():
+            return None
+        
+        try:
+            records = iter_jsonl_gz(cache_file)
+            header = next(records, {})
+            if header.get('version') != COMMENTS_CACHE_VERSION or header.get('key') != video_id:
+                records.close()
+                return None
+            logger.info(f"📂 Loading raw comments from cache: {cache_file} ({header.get('count', 0)} comments)")
+            return list(records)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable comment cache {cache_file}: {e}")
+            return None
+    
     def extract_comments(self, youtube_url: str) -> tuple[List[Dict], dict]:
-        video_id = youtube_url.split('watch?v=')[-1].split('&')[0]
+        video_id = self._video_id(youtube_url)
         
-        cache_dir = Path("cache")
+        cache_dir = self.cache_dir
         cache_dir.mkdir(exist_ok=True)
-        cache_file = cache_dir / f"comments_cache_{video_id}.json"
         
+        raw_comments_data = self._load_comments_cache(video_id)
+        if raw_comments_data is not None:
+            comments = []
+            stats = {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0, 'with_replies': 0}
+            self._process_flat_comments(raw_comments_data, comments, stats)
+            
+            return comments, stats
+        
+        comments = []
+        
+        try:
+            entry = self._get_info(youtube_url, need_comments=True)
+            comment_entries = entry['comments'] or []
+            
+            stats = {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0, 'with_replies': 0}
+            
+            self._process_flat_comments(comment_entries, comments, stats)
+            
+            cache_file = self._comments_cache_file(video_id)
+            logger.info(f"💾 Saving raw comments to cache: {cache_file}")
+            try:
+                self._save_comments_cache(video_id, comment_entries, stats)
+            except Exception as e:
+                logger.warning(f"Failed to write comment cache {cache_file}: {e}")
+            
+            # The cache file now serves any later reads; free the raw list
+            entry['comments'] = None
+            
+            return comments, {
+                'with_timestamp': stats['with_timestamp'],
+                'without_timestamp': stats['without_timestamp'],
+                'with_replies': stats['with_replies'],
+                'total': stats['total']
+            }
+            
+        except Exception as e:
+            logger.warning(f"Error extracting comments: {e}", exc_info=True)
+            return [], {'with_timestamp': 0, 'without_timestamp': 0, 'with_replies': 0, 'total': 0}
+    
+    def iter_comments(self, youtube_url: str, stats: Dict) -> Iterator[Dict]:
+        # Streaming counterpart of extract_comments: yields mapped comments
+        # one at a time (thread by thread) and fills ``stats`` as it goes.
+        video_id = self._video_id(youtube_url)
+        self.cache_dir.mkdir(exist_ok=True)
+        for key in ('with_timestamp', 'without_timestamp', 'total', 'with_replies'):
+            stats.setdefault(key, 0)
+        
+        self._load_comments_cache(video_id, migrate_only=True)
+        cache_file = self._comments_cache_file(video_id)
         if cache_file.exists():
-            logger.info(f"📂 Loading raw comments from cache: {cache_file}")
-            with open(cache_file, 'r') as f:
-                cached_data = json.load(f)
-                raw_comments_data = cached_data['comments']
+            records = iter_jsonl_gz(cache_file)
+            header = next(records, {})
+            if header.get('version') == COMMENTS_CACHE_VERSION and header.get('key') == video_id:
+                logger.info(f"📂 Streaming raw comments from cache: {cache_file} ({header.get('count', 0)} comments)")
+                yield from self._map_stream(records, stats)
+                return
+            records.close()
+        
+        spool_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.{threading.get_ident()}.spool")
+        complete = False
+        try:
+            with gzip.open(spool_file, 'wt', encoding='utf-8') as spool:
+                for raw_comment in self._map_stream(self._stream_raw_comments(youtube_url), stats, spool):
+                    yield raw_comment
+            complete = True
+        finally:
+            if complete:
+                try:
+                    records = iter_jsonl_gz(spool_file)
+                    self._save_comments_cache(video_id, records, dict(stats), count=stats['total'])
+                    logger.info(f"💾 Saved streamed comments to cache: {cache_file}")
+                except Exception as e:
+                    logger.warning(f"Failed to write comment cache {cache_file}: {e}")
+            if spool_file.exists():
+                spool_file.unlink()
+    
+    def _map_stream(self, raw_comments: Iterable[Dict], stats: Dict, spool=None) -> Iterator[Dict]:
+        last_parent = None
+        for raw_comment in raw_comments:
+            if spool is not None:
+                record = {field: raw_comment[field] for field in COMMENT_CACHE_FIELDS if raw_comment.get(field) is not None}
+                spool.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+            parent_field = raw_comment.get('parent', 'root')
+            if parent_field != 'root' and parent_field != last_parent:
+                stats['with_replies'] += 1
+                last_parent = parent_field
+            yield self._map_comment(raw_comment, stats)
+    
+    def _stream_raw_comments(self, youtube_url: str) -> Iterator[Dict]:
+        # Runs the extractor on a worker thread and hands comments over
+        # through a bounded queue, so at most COMMENT_STREAM_BUFFER raw
+        # comments are in memory and the consumer can start right away.
+        video_id = self._video_id(youtube_url)
+        handoff: queue.Queue = queue.Queue(maxsize=COMMENT_STREAM_BUFFER)
+        cancelled = threading.Event()
+        failure: List[Exception] = []
+        end = object()
+        
+        def put(item) -> bool:
+            while not cancelled.is_set():
+                try:
+                    handoff.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce():
+            streamed = 0
+            try:
+                ydl_opts = self._base_ydl_opts()
+                ydl_opts['getcomments'] = True
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    extractor = ydl.get_info_extractor('Youtube')
+                    get_comments = getattr(extractor, '_get_comments', None) if COMMENT_HOOK_SUPPORTED else None
+                    
+                    if get_comments is not None:
+                        def forward_comments(*args, **kwargs):
+                            # Hand each comment to the consumer instead of
+                            # letting yt-dlp collect them into info['comments']
+                            nonlocal streamed
+                            for comment in get_comments(*args, **kwargs):
+                                if not put(comment):
+                                    return
+                                streamed += 1
+                            return
+                            yield
+                        extractor._get_comments = forward_comments
+                    
+                    info = ydl.extract_info(youtube_url, download=False)
+                self.extractions += 1
+                logger.debug(f"yt-dlp extraction #{self.extractions} for {video_id} (streamed {streamed} comments)")
                 
-                comments = []
-                stats = {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0, 'with_replies': 0}
-                self._process_flat_comments(raw_comments_data, comments, stats)
+                # Extractors without the hook still return the full list
+                leftovers = info.pop('comments', None) or []
+                if not streamed:
+                    for comment in leftovers:
+                        if not put(comment):
+                            break
                 
-                return comments, stats
+                with self._video_lock(video_id):
+                    self._info_cache.setdefault(video_id, {'info': info, 'comments': None})
+            except Exception as e:
+                failure.append(e)
+            finally:
+                put(end)
         
-        ydl_opts = {
-            'getcomments': True,
-            'no_warnings': True,
-            'writecomments': False,
+        worker = threading.Thread(target=produce, name=f"comments-{video_id}", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = handoff.get()
+                if item is end:
+                    break
+                yield item
+            if failure:
+                raise failure[0]
+        finally:
+            cancelled.set()
+            worker.join(timeout=1.0)
+    
+    def _live_chat_cache_file(self, video_id: str) -> Path:
+        return self.cache_dir / f"livechat_cache_{video_id}.jsonl.gz"
+    
+    def _save_live_chat_cache(self, video_id: str, live_chats: Iterable[Dict], stats: Dict, count: Optional[int] = None):
+        header = {
+            'schema': 'live_chat',
+            'version': LIVE_CHAT_CACHE_VERSION,
+            'key': video_id,
+            'cached_at': time.time(),
+            'count': len(live_chats) if count is None else count,
+            'stats': stats,
         }
+        records = ({field: msg.get(field) for field in LIVE_CHAT_CACHE_FIELDS} for msg in live_chats)
+        write_jsonl_gz(self._live_chat_cache_file(video_id), header, records)
+    
+    def _open_live_chat_cache(self, video_id: str) -> Optional[Iterator[Dict]]:
+        cache_file = self._live_chat_cache_file(video_id)
+        legacy_file = self.cache_dir / f"livechat_cache_{video_id}.json"
         
-        comments = []
-        raw_comments_data = []
+        if not cache_file.exists() and legacy_file.exists():
+            logger.info(f"🔄 Migrating live chat cache to compact format: {legacy_file}")
+            try:
+                with open(legacy_file, 'r') as f:
+                    legacy = json.load(f)
+                self._save_live_chat_cache(video_id, legacy.get('live_chats', []), legacy.get('stats', {'total': 0}))
+                legacy_file.unlink()
+            except Exception as e:
+                logger.warning(f"Failed to migrate live chat cache {legacy_file}: {e}")
+                return None
+        
+        if not cache_file.exists():
+            return None
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(youtube_url, download=False)
-                
-                comment_entries = info.get('comments', [])
-                
-                stats = {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0, 'with_replies': 0}
-                
-                self._process_flat_comments(comment_entries, comments, stats)
-                
-                logger.info(f"💾 Saving raw comments to cache: {cache_file}")
-                with open(cache_file, 'w') as f:
-                    json.dump({'comments': comment_entries, 'stats': stats}, f, indent=2)
-                
-                return comments, {
-                    'with_timestamp': stats['with_timestamp'],
-                    'without_timestamp': stats['without_timestamp'],
-                    'with_replies': stats['with_replies'],
-                    'total': stats['total']
-                }
-                
+            records = iter_jsonl_gz(cache_file)
+            header = next(records, {})
         except Exception as e:
-            logger.warning(f"Error extracting comments: {e}", exc_info=True)
-            return [], {'with_timestamp': 0, 'without_timestamp': 0, 'with_replies': 0, 'total': 0}
+            logger.warning(f"Ignoring unreadable live chat cache {cache_file}: {e}")
+            return None
+        if header.get('version') != LIVE_CHAT_CACHE_VERSION or header.get('key') != video_id:
+            records.close()
+            return None
+        logger.info(f"📂 Loading live chat from cache: {cache_file} ({header.get('count', 0)} messages)")
+        return ({**record, 'created_by_id': '', 'profile_picture': '', 'parent_id': None} for record in records)
     
-    def extract_live_chat(self, youtube_url: str) -> tuple[List[Dict], dict]:
-        video_id = youtube_url.split('watch?v=')[-1].split('&')[0]
+    def iter_live_chats(self, youtube_url: str) -> Iterator[Dict]:
+        # Live chat counterpart of iter_comments: yields messages one at a
+        # time from the cache or straight from the replay file, spooling the
+        # cached fields and saving them once the file has been read through.
+        video_id = self._video_id(youtube_url)
+        self.cache_dir.mkdir(exist_ok=True)
         
-        cache_dir = Path("cache")
-        cache_dir.mkdir(exist_ok=True)
-        cache_file = cache_dir / f"livechat_cache_{video_id}.json"
+        cached = self._open_live_chat_cache(video_id)
+        if cached is not None:
+            try:
+                yield from cached
+            except Exception as e:
+                logger.warning(f"Error reading live chat cache for {video_id}: {e}")
+            return
         
-        if cache_file.exists():
-            logger.info(f"📂 Loading live chat from cache: {cache_file}")
-            with open(cache_file, 'r') as f:
-                cached_data = json.load(f)
-                live_chats = cached_data.get('live_chats', [])
-                stats = cached_data.get('stats', {'total': 0})
-                return live_chats, stats
-        
-        ydl_opts = {
+        try:
+            raw_file = self._raw_live_chat_file(video_id)
+            if raw_file.exists():
+                logger.info(f"📂 Reusing downloaded live chat file: {raw_file}")
+            else:
+                raw_file = self._download_live_chat(youtube_url, video_id)
+                if raw_file is None:
+                    return
+        except Exception as e:
+            logger.warning(f"Error extracting live chat: {e}", exc_info=True)
+            return
+        
+        logger.info(f"📂 Parsing live chat file: {raw_file}")
+        cache_file = self._live_chat_cache_file(video_id)
+        spool_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.{threading.get_ident()}.spool")
+        count = 0
+        complete = False
+        try:
+            with gzip.open(spool_file, 'wt', encoding='utf-8') as spool:
+                try:
+                    for message in iter_live_chat(raw_file):
+                        record = {field: message.get(field) for field in LIVE_CHAT_CACHE_FIELDS}
+                        spool.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+                        count += 1
+                        yield message
+                    complete = True
+                except Exception as e:
+                    logger.warning(f"Error extracting live chat: {e}", exc_info=True)
+        finally:
+            if complete and count:
+                logger.info(f"💾 Saving {count} live chat messages to cache: {cache_file}")
+                try:
+                    self._save_live_chat_cache(video_id, iter_jsonl_gz(spool_file), {'total': count}, count=count)
+                except Exception as e:
+                    logger.warning(f"Failed to write live chat cache {cache_file}: {e}")
+            elif complete:
+                logger.info("No live chat messages extracted")
+            if spool_file.exists():
+                spool_file.unlink()
+    
+    def _raw_live_chat_file(self, video_id: str) -> Path:
+        return self.cache_dir / f"{video_id}.live_chat.json"
+    
+    def _download_live_chat(self, youtube_url: str, video_id: str) -> Optional[Path]:
+        # Availability check and download share the one extraction in
+        # _get_info; yt-dlp only fetches the replay itself here.
+        info = self._get_info(youtube_url)['info']
+        
+        subtitles = info.get('subtitles') or {}
+        if not subtitles.get('live_chat'):
+            logger.info("No live chat available for this video")
+            return None
+        
+        ydl_opts_download = {
             'writesubtitles': True,
             'writeautomaticsub': False,
             'subtitleslangs': ['live_chat'],
             'subtitlesformat': 'json',
             'skip_download': True,
+            'outtmpl': str(self.cache_dir / '%(id)s.%(ext)s'),
             'no_warnings': True,
             'quiet': False,
         }
         
-        live_chats = []
-        stats = {'total': 0}
+        if os.path.exists('cookies.txt'):
+            ydl_opts_download['cookiefile'] = 'cookies.txt'
         
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(youtube_url, download=False)
-                
-                subtitles = info.get('subtitles', {})
-                live_chat_subtitle = subtitles.get('live_chat', [])
-                
-                if not live_chat_subtitle:
-                    logger.info("No live chat available for this video")
-                    return [], stats
-                
-                ydl_opts_download = {
-                    'writesubtitles': True,
-                    'writeautomaticsub': False,
-                    'subtitleslangs': ['live_chat'],
-                    'subtitlesformat': 'json',
-                    'skip_download': True,
-                    'outtmpl': str(cache_dir / '%(id)s.%(ext)s'),
-                    'no_warnings': True,
-                    'quiet': False,
-                }
-                
-                if os.path.exists('cookies.txt'):
-                    ydl_opts_download['cookiefile'] = 'cookies.txt'
-                
-                with yt_dlp.YoutubeDL(ydl_opts_download) as ydl_download:
-                    ydl_download.download([youtube_url])
-                
-                live_chat_files = list(cache_dir.glob(f"{video_id}.live_chat.json"))
-                
-                if live_chat_files:
-                    logger.info(f"📂 Parsing live chat file: {live_chat_files[0]}")
-                    live_chats = self._parse_json_live_chat(live_chat_files[0])
-                    stats['total'] = len(live_chats)
-                
-                if live_chats:
-                    logger.info(f"💾 Saving {len(live_chats)} live chat messages to cache: {cache_file}")
-                    with open(cache_file, 'w') as f:
-                        json.dump({'live_chats': live_chats, 'stats': stats}, f, indent=2)
-                else:
-                    logger.info("No live chat messages extracted")
-                
-                return live_chats, stats
-                
-        except Exception as e:
-            logger.warning(f"Error extracting live chat: {e}", exc_info=True)
-            return [], stats
-    
-    def _parse_json_live_chat(self, json_file: Path) -> List[Dict]:
-        live_chats = []
+        with yt_dlp.YoutubeDL(ydl_opts_download) as ydl_download:
+            ydl_download.process_ie_result(copy.deepcopy(info), download=True)
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                if line_num == 1:
-                    continue
-                
-                line = line.strip()
-                if not line:
-                    continue
-                
-                try:
-                    data = json.loads(line)
-                    
-                    replay_chat_item_action = data.get('replayChatItemAction', {})
-                    video_offset_msec_str = replay_chat_item_action.get('videoOffsetTimeMsec', '0')
-                    
-                    try:
-                        video_offset_msec = int(video_offset_msec_str)
-                        timestamp_seconds = video_offset_msec // 1000
-                    except (ValueError, TypeError):
-                        timestamp_seconds = 0
-                    
-                    actions = replay_chat_item_action.get('actions', [])
-                    if not actions:
-                        continue
-                    
-                    add_chat_item_action = actions[0].get('addChatItemAction', {})
-                    item = add_chat_item_action.get('item', {})
-                    
-                    text_message_renderer = item.get('liveChatTextMessageRenderer')
-                    if not text_message_renderer:
-                        continue
-                    
-                    message_runs = text_message_renderer.get('message', {}).get('runs', [])
-                    message_text_parts = []
-                    for run in message_runs:
-                        if 'text' in run:
-                            message_text_parts.append(run['text'])
-                    
-                    message_text = ''.join(message_text_parts).strip()
-                    if not message_text:
-                        continue
-                    
-                    author_name = text_message_renderer.get('authorName', {}).get('simpleText', 'Unknown')
-                    
-                    message_id = text_message_renderer.get('id') or add_chat_item_action.get('clientId', f"livechat_{len(live_chats)}")
-                    
-                    live_chat_msg = {
-                        'comment': message_text,
-                        'user_name': author_name,
-                        'created_by_id': '',
-                        'profile_picture': '',
-                        'commented_at': str(timestamp_seconds),
-                        'yt_id': message_id,
-                        'parent_id': None,
-                    }
-                    live_chats.append(live_chat_msg)
-                    
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Line {line_num}: Error parsing live chat JSON: {e} - Line content: {line[:200]}...")
-                except Exception as e:
-                    logger.warning(f"Line {line_num}: Unexpected error processing live chat JSON: {e} - Line content: {line[:200]}...")
-        
-        return live_chats
+        raw_file = self._raw_live_chat_file(video_id)
+        if not raw_file.exists():
+            logger.info("No live chat messages extracted")
+            return None
+        return raw_file
     
     def _process_flat_comments(self, comment_entries: List[Dict], comments: List[Dict], stats: Dict):
         parent_comments = []
@@ -254,99 +621,50 @@ class YouTubeProcessor:
         
         stats['with_replies'] = len(parents_with_replies)
         
-        for raw_comment in parent_comments:
-            comment_text = raw_comment.get('text', '')
-            commented_at = self._extract_timestamp(comment_text)
-            
-            if commented_at > 0:
-                comment_text = self._remove_timestamp_from_text(comment_text)
-                stats['with_timestamp'] += 1
-            else:
-                stats['without_timestamp'] += 1
-            
-            stats['total'] += 1
-            
-            yt_id = raw_comment.get('id', '')
-            
-            mapped_comment = {
-                'comment': comment_text.strip(),
-                'user_name': raw_comment.get('author', 'Unknown User'),
-                'created_by_id': '',
-                'profile_picture': raw_comment.get('author_thumbnail', ''),
-                'commented_at': str(commented_at),
-                'yt_id': yt_id,
-                'parent_id': None,
-            }
-            
-            comments.append(mapped_comment)
+        ordered = parent_comments + reply_comments
+        if self.comment_parser and self.comment_parser.enabled_for(len(ordered)):
+            parsed = self.comment_parser.parse([raw_comment.get('text', '') for raw_comment in ordered])
+            for raw_comment, parsed_text in zip(ordered, parsed):
+                comments.append(self._map_comment(raw_comment, stats, parsed_text))
+            return
         
-        for raw_comment in reply_comments:
-            comment_text = raw_comment.get('text', '')
-            commented_at = self._extract_timestamp(comment_text)
-            
-            if commented_at > 0:
-                comment_text = self._remove_timestamp_from_text(comment_text)
-                stats['with_timestamp'] += 1
-            else:
-                stats['without_timestamp'] += 1
-            
-            stats['total'] += 1
-            
-            parent_yt_id = raw_comment.get('parent', '')
-            
-            mapped_comment = {
-                'comment': comment_text.strip(),
-                'user_name': raw_comment.get('author', 'Unknown User'),
-                'created_by_id': '',
-                'profile_picture': raw_comment.get('author_thumbnail', ''),
-                'commented_at': str(commented_at),
-                'yt_id': raw_comment.get('id', ''),
-                'parent_id': parent_yt_id,
-            }
-            
-            comments.append(mapped_comment)
-    
+        for raw_comment in ordered:
+            comments.append(self._map_comment(raw_comment, stats))
     
-    @staticmethod
-    def _extract_timestamp(text: str) -> int:
+    def _map_comment(self, raw_comment: Dict, stats: Dict, parsed: Optional[tuple] = _UNPARSED) -> Dict:
+        comment_text = raw_comment.get('text', '')
+        if parsed is _UNPARSED:
+            match = find_timestamp(comment_text)
+            parsed = (match.seconds, match.text) if match else None
+        commented_at = parsed[0] if parsed else 0
         
-        patterns = [
-            r'(?:at|@)\s*(\d{1,2}):(\d{2})(?::(\d{2}))?',
-            r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s+(?:is|was|at)',
-            r'^(\d{1,2}):(\d{2})(?::(\d{2}))?$',
-            r'(\d{1,2}):(\d{2})(?::(\d{2}))?',
-        ]
+        if commented_at > 0:
+            comment_text = parsed[1]
+            stats['with_timestamp'] += 1
+        else:
+            stats['without_timestamp'] += 1
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                groups = match.groups()
-                if len(groups) == 3 and groups[2]:
-                    hours, minutes, seconds = map(int, groups)
-                    return hours * 3600 + minutes * 60 + seconds
-                elif len(groups) >= 2:
-                    minutes, seconds = map(int, groups[:2])
-                    return minutes * 60 + seconds
+        stats['total'] += 1
         
-        return 0
+        parent_field = raw_comment.get('parent', 'root')
+        
+        return {
+            'comment': comment_text.strip(),
+            'user_name': raw_comment.get('author', 'Unknown User'),
+            'created_by_id': '',
+            'profile_picture': raw_comment.get('author_thumbnail', ''),
+            'commented_at': str(commented_at),
+            'yt_id': raw_comment.get('id', ''),
+            'parent_id': None if parent_field == 'root' else parent_field,
+        }
+    
+    @staticmethod
+    def _extract_timestamp(text: str) -> int:
+        return extract_timestamp(text)
     
     @staticmethod
     def _remove_timestamp_from_text(text: str) -> str:
-        
-        patterns = [
-            r'(?:at|@)\s*\d{1,2}:\d{2}(?::\d{2})?',
-            r'\d{1,2}:\d{2}(?::\d{2})?\s+(?:is|was|at)',
-            r'^\d{1,2}:\d{2}(?::\d{2})?\s*',
-            r'\d{1,2}:\d{2}(?::\d{2})?',
-        ]
-        
-        cleaned_text = text
-        for pattern in patterns:
-            cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
-        
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-        
-        return cleaned_text
+        return strip_timestamps(text)
     
     @staticmethod
     def _parse_timestamp_value(timestamp_value) -> int:
@@ -368,30 +686,110 @@ class YouTubeProcessor:
                 pass
         return 0
     
-    def download_video(self, youtube_url: str, output_dir: str = "cache") -> str:
-        cache_dir = Path(output_dir)
-        cache_dir.mkdir(exist_ok=True)
-        
-        video_id = youtube_url.split('watch?v=')[-1].split('&')[0]
+    def _cached_video(self, cache_dir: Path, video_id: str) -> Optional[Path]:
+        if self.video_store is not None:
+            stored = self.video_store.lookup(video_id)
+            if stored:
+                return Path(stored['path'])
+        for cached_file in cache_dir.glob(f"{video_id}.*"):
+            if cached_file.suffix.lower() in VIDEO_EXTENSIONS and cached_file.exists():
+                return cached_file
+        return None
+    
+    def plan_stream(self, youtube_url: str, output_dir: str = "cache") -> Optional[Dict]:
+        # Picks the same format download_video would and returns what's needed
+        # to fetch it as one byte stream, or None when it has to be staged
+        # on disk (already cached, separate streams to merge, fragmented
+        # protocols, post-processing).
+        video_id = self._video_id(youtube_url)
+        if self._cached_video(Path(output_dir), video_id):
+            return None
         
-        cached_files = list(cache_dir.glob(f"{video_id}.*"))
-        video_extensions = {'.mp4', '.webm', '.mkv', '.flv', '.3gp', '.avi', '.mov', '.m4v'}
-        cached_video = None
-        for cached_file in cached_files:
-            if cached_file.suffix.lower() in video_extensions:
-                cached_video = cached_file
-                break
+        info = self._get_info(youtube_url)['info']
+        ydl_opts = self._download_opts(Path(output_dir) / f"{video_id}.%(ext)s", self._choose_format(video_id, info)['format'])
+        ydl_opts['quiet'] = True
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
         
-        if cached_video and cached_video.exists():
-            file_size = os.path.getsize(cached_video)
-            logger.info(f"📂 Using cached video: {cached_video} ({file_size / (1024*1024):.2f} MB)")
-            return str(cached_video)
+        reason = None
+        if selected.get('requested_formats'):
+            reason = "separate video and audio streams need merging"
+        elif selected.get('protocol') not in ('http', 'https'):
+            reason = f"protocol '{selected.get('protocol')}' is fragmented"
+        elif not selected.get('url'):
+            reason = "no direct URL"
+        elif ydl_opts.get('postprocessors'):
+            reason = "post-processing needs the complete file"
+        if reason:
+            logger.info(f"📥 Format {selected.get('format_id')} can't be streamed ({reason}), downloading to disk first")
+            return None
         
-        output_path = cache_dir / f"{video_id}.%(ext)s"
+        return {
+            'video_id': video_id,
+            'format_id': selected.get('format_id'),
+            'ext': selected.get('ext') or 'mp4',
+            'url': selected['url'],
+            'http_headers': selected.get('http_headers') or {},
+            'filesize': selected.get('filesize'),
+        }
+    
+    def stored_asset(self, youtube_url: str, backend: str) -> Optional[str]:
+        # Asset already holding this video's exact bytes on ``backend``
+        if self.video_store is None:
+            return None
+        return self.video_store.uploaded_asset(self._video_id(youtube_url), backend)
+    
+    def record_stored_upload(self, youtube_url: str, backend: str, asset_id: str):
+        if self.video_store is not None:
+            self.video_store.record_upload(self._video_id(youtube_url), backend, asset_id)
+    
+    def forget_stored_uploads(self, youtube_url: str, backend: str) -> List[str]:
+        if self.video_store is None:
+            return []
+        return self.video_store.forget_uploads(self._video_id(youtube_url), backend)
+    
+    def is_stored(self, file_path: str) -> bool:
+        return self.video_store is not None and self.video_store.contains(file_path)
+    
+    def _choose_format(self, video_id: str, info: Dict) -> Dict:
+        choice = self._format_choices.get(video_id)
+        if choice is not None:
+            return choice
+        choice = self.format_policy.select(info)
+        self._format_choices[video_id] = choice
         
-        ydl_opts = {
+        estimated, baseline = choice['estimated_bytes'], choice['baseline_bytes']
+        summary = f"🎞️  Format {choice['format_id'] or choice['format']} chosen by rule '{choice['rule']}'"
+        if estimated:
+            summary += f", ~{estimated / (1024*1024):.1f} MB"
+        if estimated and baseline:
+            summary += f" (fixed selector: ~{baseline / (1024*1024):.1f} MB)"
+            metrics.inc_counter('format_estimated_bytes_saved', baseline - estimated)
+        logger.info(summary)
+        metrics.inc_counter(f"format_rule_{choice['rule']}")
+        return choice
+    
+    def estimate_download(self, youtube_url: str, output_dir: str = "cache") -> Optional[int]:
+        # Disk space download_video will need: 0 if the video is already on
+        # disk, None if the chosen format has no size information
+        video_id = self._video_id(youtube_url)
+        if self._cached_video(Path(output_dir), video_id):
+            return 0
+        choice = self._choose_format(video_id, self._get_info(youtube_url)['info'])
+        estimated = choice['estimated_bytes']
+        if estimated and '+' in (choice['format_id'] or ''):
+            # Both streams stay on disk until ffmpeg has written the merged file
+            estimated *= 2
+        return estimated
+    
+    def format_choice(self, youtube_url: str) -> Optional[Dict]:
+        return self._format_choices.get(self._video_id(youtube_url))
+    
+    @staticmethod
+    def _download_opts(output_path: Path, format_spec: str = FALLBACK_FORMAT) -> Dict:
+        opts = {
             'outtmpl': str(output_path),
-            'format':"22/18/bestvideo+bestaudio/best",
+            'format': format_spec,
             'quiet': False,
             'noplaylist': True,
             'http_headers': {
@@ -403,25 +801,61 @@ class YouTubeProcessor:
                 "Referer": "https://www.youtube.com/"
             }
         }
-        
         if os.path.exists('cookies.txt'):
-            ydl_opts['cookiefile'] = 'cookies.txt'
-            logger.info("Using cookies.txt for download authentication")
+            opts['cookiefile'] = 'cookies.txt'
+        return opts
+    
+    def _track_download(self, video_id: str, ydl):
+        if self.download_engine is None:
+            return contextlib.nullcontext({})
+        return self.download_engine.track(video_id, ydl)
+    
+    def download_video(self, youtube_url: str, output_dir: str = "cache") -> str:
+        cache_dir = Path(output_dir)
+        cache_dir.mkdir(exist_ok=True)
+        
+        video_id = self._video_id(youtube_url)
+        
+        cached_video = self._cached_video(cache_dir, video_id)
+        if cached_video:
+            file_size = os.path.getsize(cached_video)
+            logger.info(f"📂 Using cached video: {cached_video} ({file_size / (1024*1024):.2f} MB)")
+            return str(cached_video)
+        
+        output_path = cache_dir / f"{video_id}.%(ext)s"
         
         try:
+            info = self._get_info(youtube_url)['info']
+            
+            ydl_opts = self._download_opts(output_path, self._choose_format(video_id, info)['format'])
+            if self.download_engine is not None:
+                self.download_engine.apply(ydl_opts)
+            if 'cookiefile' in ydl_opts:
+                logger.info("Using cookies.txt for download authentication")
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 logger.info(f"Downloading video from: {youtube_url}")
-                ydl.download([youtube_url])
-                
-                info = ydl.extract_info(youtube_url, download=False)
-                downloaded_file = ydl.prepare_filename(info)
-                
-                if not os.path.exists(downloaded_file):
-                    raise RuntimeError(f"Downloaded file not found at: {downloaded_file}")
-                
-                file_size = os.path.getsize(downloaded_file)
+                with self._track_download(video_id, ydl) as transfer:
+                    # Re-run format selection and download from the already
+                    # extracted info instead of scraping the watch page again
+                    result = ydl.process_ie_result(copy.deepcopy(info), download=True)
+                    
+                    requested = (result or {}).get('requested_downloads') or []
+                    downloaded_file = requested[0].get('filepath') if requested else None
+                    if not downloaded_file:
+                        downloaded_file = ydl.prepare_filename(result)
+                    
+                    if not os.path.exists(downloaded_file):
+                        raise RuntimeError(f"Downloaded file not found at: {downloaded_file}")
+                    
+                    file_size = os.path.getsize(downloaded_file)
+                    if not transfer.get('bytes'):
+                        # External downloaders don't always report sizes
+                        transfer['bytes'] = file_size
                 logger.info(f"✅ Video downloaded: {downloaded_file} ({file_size / (1024*1024):.2f} MB)")
                 
+                if self.video_store is not None:
+                    return self.video_store.add(video_id, downloaded_file)['path']
                 return downloaded_file
                 
         except Exception as e:
@@ -0,0 +1,23 @@
+import threading
+
+import pytest
+
+from tools import publish_stub_server
+
+
+@pytest.fixture
+def publish_stub():
+    """Start tools/publish_stub_server.py on a free port; yields a factory taking its options."""
+    servers = []
+
+    def start(**options):
+        server = publish_stub_server.make_server(port=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}/publish-comment"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,123 @@
+import json
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from modules import comment_importer, metrics
+from modules.adaptive_concurrency import AdaptiveConcurrencyController, parse_retry_after
+from modules.comment_importer import CommentImporter
+
+
+def _release(controller, status_code, latency=0.01, retry_after=None):
+    controller.acquire()
+    controller.release(status_code, latency, retry_after)
+
+
+def test_healthy_responses_grow_the_window():
+    controller = AdaptiveConcurrencyController(initial=2, max_limit=8)
+    for _ in range(20):
+        _release(controller, 200)
+    assert controller.limit > 2
+
+
+def test_throttling_halves_the_window_once_per_cooldown():
+    controller = AdaptiveConcurrencyController(initial=8, cooldown=60)
+    _release(controller, 429)
+    _release(controller, 503)
+    _release(controller, None)
+    assert controller.limit == 4
+
+
+@pytest.mark.parametrize('status_code', [401, 403])
+def test_auth_failures_are_not_latency_samples(status_code):
+    name = f"auth{status_code}"
+    controller = AdaptiveConcurrencyController(initial=4, p95_latency_limit=1.0, cooldown=0, name=name)
+    for _ in range(20):
+        _release(controller, status_code, latency=30.0)
+    assert controller.limit == 4
+    snapshot = metrics.snapshot()
+    assert snapshot['counters'][f"{name}_auth_failures"] == 20
+    assert f"{name}_latency_p95_seconds" not in snapshot['gauges']
+
+
+def test_p95_above_the_limit_shrinks_the_window():
+    controller = AdaptiveConcurrencyController(initial=8, p95_latency_limit=0.5, cooldown=0)
+    for _ in range(10):
+        _release(controller, 200, latency=1.0)
+    assert controller.limit < 8
+
+
+def test_retry_after_pauses_new_requests():
+    controller = AdaptiveConcurrencyController(initial=4)
+    _release(controller, 429, retry_after='0.2')
+    started = time.monotonic()
+    controller.acquire()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) == 0.0
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('soon') == 0.0
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+def _response(status_code, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body or {}).encode()
+    response.headers.update(headers or {})
+    response.url = 'http://publish.test/publish-comment'
+    return response
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posts = 0
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        return self.responses.pop(0)
+
+
+class _Limiter:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self, tokens=1.0):
+        self.tokens += 1
+        return 0.0
+
+
+@pytest.mark.parametrize('with_controller', [False, True])
+def test_429_is_retried_through_the_limiter(monkeypatch, with_controller):
+    session = _Session([
+        _response(429, headers={'Retry-After': '0'}),
+        _response(200, {'comment': {'id': 'INC-1'}}),
+    ])
+    monkeypatch.setattr(comment_importer, 'get_session', lambda: session)
+    monkeypatch.setattr(CommentImporter, 'THROTTLE_RETRY_DELAY', 0.0)
+    controller = AdaptiveConcurrencyController(initial=4) if with_controller else None
+    importer = CommentImporter('http://publish.test/publish-comment', 'jwt', concurrency=controller)
+    limiter = _Limiter()
+
+    assert importer._send_comment({'comment': 'hi'}, 1, 1, limiter) == 'INC-1'
+    assert session.posts == 2
+    assert limiter.tokens == 1
+
+
+def test_401_response_is_left_out_of_the_controller(monkeypatch):
+    session = _Session([_response(401)])
+    monkeypatch.setattr(comment_importer, 'get_session', lambda: session)
+    controller = AdaptiveConcurrencyController(initial=4, name='publish401')
+    importer = CommentImporter('http://publish.test/publish-comment', 'jwt', concurrency=controller)
+
+    with pytest.raises(requests.HTTPError):
+        importer._post_comment({}, 'jwt')
+    snapshot = metrics.snapshot()
+    assert snapshot['counters']['publish401_auth_failures'] == 1
+    assert 'publish401_latency_p95_seconds' not in snapshot['gauges']
+    assert controller.in_flight == 0
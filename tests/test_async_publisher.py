@@ -0,0 +1,99 @@
+import threading
+import time
+
+from modules.async_publisher import AsyncCommentPublisher
+
+
+class _Importer:
+    dry_run = False
+    TOKEN_CHECK_INTERVAL = 1000
+
+    def __init__(self, fail=(), delay=0.01, batch_supported=False):
+        self.fail = set(fail)
+        self.delay = delay
+        self._batch_supported = batch_supported
+        self.sent = []
+        self.batches = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _build_payload(self, comment, asset_id, incast_parent_id):
+        return {'yt_id': comment['yt_id'], 'asset_id': asset_id, 'parent': incast_parent_id}
+
+    def _check_token_periodically(self, idx, total):
+        pass
+
+    def _send_comment(self, payload, idx, total, limiter=None):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+            self.sent.append(payload)
+        if payload['yt_id'] in self.fail:
+            return None
+        return f"INC-{payload['yt_id']}"
+
+    def _send_batch(self, items, total, limiter=None):
+        self.batches.append([yt_id for _, yt_id, _ in items])
+        return [self._send_comment(payload, idx, total) for idx, _, payload in items]
+
+
+def _comments():
+    return [
+        {'yt_id': 'a'},
+        {'yt_id': 'b'},
+        {'yt_id': 'a1', 'parent_id': 'a'},
+        {'yt_id': 'b1', 'parent_id': 'b'},
+        {'yt_id': 'a1x', 'parent_id': 'a1'},
+    ] + [{'yt_id': f"t{i}"} for i in range(10)]
+
+
+def test_replies_attach_to_their_published_parent():
+    importer = _Importer()
+    stats = AsyncCommentPublisher(importer, max_in_flight=4).publish(_comments(), 'asset')
+
+    assert stats['imported'] == 15
+    parents = {payload['yt_id']: payload['parent'] for payload in importer.sent}
+    assert parents['a1'] == 'INC-a'
+    assert parents['b1'] == 'INC-b'
+    assert parents['a1x'] == 'INC-a1'
+    assert parents['t3'] is None
+
+
+def test_in_flight_requests_are_bounded():
+    importer = _Importer(delay=0.02)
+    AsyncCommentPublisher(importer, max_in_flight=3).publish(_comments(), 'asset')
+    assert 1 < importer.peak <= 3
+
+
+def test_failed_parent_orphans_its_replies():
+    importer = _Importer(fail={'a'})
+    stats = AsyncCommentPublisher(importer, max_in_flight=4).publish(_comments(), 'asset')
+
+    assert stats['orphaned'] == 2
+    assert {payload['yt_id'] for payload in importer.sent}.isdisjoint({'a1', 'a1x'})
+
+
+def test_known_parents_resolve_replies_from_earlier_chunks():
+    importer = _Importer()
+    published = {}
+    AsyncCommentPublisher(importer).publish(
+        [{'yt_id': 'r', 'parent_id': 'old'}], 'asset',
+        known_parents={'old': 'INC-old'},
+        on_published=published.__setitem__,
+    )
+    assert importer.sent[0]['parent'] == 'INC-old'
+    assert published == {'r': 'INC-r'}
+
+
+
+def test_ready_comments_are_grouped_into_batches():
+    importer = _Importer(delay=0, batch_supported=True)
+    stats = AsyncCommentPublisher(importer, max_in_flight=2, batch_size=5, batch_linger=0.01).publish(_comments(), 'asset')
+
+    assert stats['imported'] == 15
+    assert max(len(batch) for batch in importer.batches) <= 5
+    assert stats['batches'] == len(importer.batches) < 15
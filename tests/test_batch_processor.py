@@ -0,0 +1,138 @@
+import threading
+import time
+
+from modules import batch_processor, metrics
+from modules.batch_processor import BatchProcessor
+from modules.disk_quota import DiskQuota
+
+
+class _Processor(BatchProcessor):
+    def __init__(self, delays, **kwargs):
+        super().__init__(None, None, None, None, **kwargs)
+        self.delays = delays
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def process_video(self, video_url, category, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delays[video_url])
+            if video_url == 'boom':
+                raise RuntimeError("extractor crashed")
+            return {'url': video_url, 'category': category, 'success': True, 'asset_id': f"asset-{video_url}", 'comments_imported': 0}
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _list_file(tmp_path, *urls):
+    path = tmp_path / 'videos.txt'
+    path.write_text(''.join(f"{url},cat\n" for url in urls))
+    return str(path)
+
+
+def test_parallel_results_keep_list_order(tmp_path):
+    processor = _Processor({'a': 0.15, 'b': 0.05, 'c': 0.0}, max_parallel_videos=3)
+    results = processor.process_list(_list_file(tmp_path, 'a', 'b', 'c'))
+    assert [r['url'] for r in results] == ['a', 'b', 'c']
+    assert processor.peak > 1
+
+
+def test_parallel_respects_worker_bound(tmp_path):
+    processor = _Processor({url: 0.05 for url in 'abcdef'}, max_parallel_videos=2)
+    processor.process_list(_list_file(tmp_path, *'abcdef'))
+    assert processor.peak == 2
+
+
+def test_parallel_failure_becomes_failed_result(tmp_path):
+    processor = _Processor({'a': 0.0, 'boom': 0.0}, max_parallel_videos=2)
+    results = processor.process_list(_list_file(tmp_path, 'a', 'boom'))
+    assert results[0]['success'] is True
+    assert results[1]['success'] is False
+    assert results[1]['error'] == "extractor crashed"
+    assert results[1]['comments_imported'] == 0
+
+
+class _StreamingVideos:
+    # 'stream' plans a streamed transfer; 'disk' downloads to disk first
+    download_engine = None
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.disk_downloaded = threading.Event()
+
+    def extract_video_info(self, url):
+        return {'title': url, 'description': '', 'keywords': []}
+
+    def plan_stream(self, url, output_dir):
+        if url != 'stream':
+            return None
+        return {'video_id': url, 'ext': 'mp4', 'format_id': '18', 'filesize': 80, 'url': 'http://127.0.0.1:9/video', 'http_headers': {}}
+
+    def estimate_download(self, url, output_dir):
+        return 80
+
+    def download_video(self, url, output_dir):
+        path = self.tmp_path / f"{url}.mp4"
+        path.write_bytes(b'v' * 80)
+        if url == 'disk':
+            self.disk_downloaded.set()
+        return str(path)
+
+    def format_choice(self, url):
+        return None
+
+    def is_stored(self, path):
+        return False
+
+    def record_stored_upload(self, url, backend, asset_id):
+        pass
+
+    def hold_video(self, url):
+        pass
+
+    def release_video(self, url):
+        pass
+
+
+class _FailingStreamBackend:
+    backend_url = 'http://backend'
+
+    def __init__(self, videos):
+        self.videos = videos
+
+    def get_signed_url(self, file_name, asset_name, asset_description, metadata=None):
+        return {'upload_url': f"http://storage/{file_name}", 'asset_id': f"asset-{asset_name}"}
+
+    def upload_stream_to_signed_url(self, pipe, size, upload_url, content_type, session_uri=None, on_session=None):
+        # Fail only once the disk video holds its reservation and waits for this upload worker
+        self.videos.disk_downloaded.wait(5)
+        return {'success': False, 'error': 'connection reset'}
+
+    def upload_file_to_signed_url(self, file_path, upload_url, session_uri=None, on_session=None):
+        return {'success': True}
+
+
+def test_stream_fallback_does_not_wait_for_disk_space_on_the_upload_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_processor, 'download_into', lambda pipe, url, headers, throttle=None: pipe.close(IOError("unused")))
+    videos = _StreamingVideos(tmp_path)
+    processor = BatchProcessor(
+        videos, _FailingStreamBackend(videos), None, None,
+        pipeline_workers={'extract': 1, 'download': 1, 'upload': 1, 'publish': 1},
+        pipeline_report_interval=0, stream_upload=True, disk_quota=DiskQuota(max_bytes=100)
+    )
+    outcome = {}
+    runner = threading.Thread(
+        target=lambda: outcome.setdefault('results', processor.process_list(_list_file(tmp_path, 'stream', 'disk'), video_only=True)),
+        daemon=True
+    )
+
+    runner.start()
+    runner.join(10)
+
+    assert not runner.is_alive(), "upload worker deadlocked on the disk quota"
+    assert [(r['url'], r['success']) for r in outcome['results']] == [('stream', True), ('disk', True)]
+    assert metrics.snapshot()['gauges']['disk_quota_reserved_bytes'] == 0
@@ -0,0 +1,42 @@
+import gzip
+
+from modules.cache_store import iter_jsonl_gz, read_versioned, write_jsonl_gz, write_versioned
+
+
+def test_versioned_round_trip(tmp_path):
+    path = tmp_path / 'entry.json'
+    write_versioned(path, 2, 'vid', {'title': 'x'})
+
+    assert read_versioned(path, 2, 'vid') == {'title': 'x'}
+    assert read_versioned(path, 3, 'vid') is None
+    assert read_versioned(path, 2, 'other') is None
+
+
+def test_unreadable_versioned_file_is_ignored(tmp_path):
+    path = tmp_path / 'entry.json'
+    path.write_text('{not json')
+    assert read_versioned(path, 1, 'vid') is None
+
+
+def test_jsonl_gz_round_trip(tmp_path):
+    path = tmp_path / 'records.jsonl.gz'
+    records = ({'id': i, 'text': f"é {i}"} for i in range(3))
+
+    assert write_jsonl_gz(path, {'version': 1}, records) == 3
+    assert list(iter_jsonl_gz(path)) == [{'version': 1}] + [{'id': i, 'text': f"é {i}"} for i in range(3)]
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert f.readline() == '{"version":1}\n'
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path):
+    path = tmp_path / 'records.jsonl.gz'
+
+    def records():
+        yield {'id': 1}
+        raise RuntimeError("source failed")
+
+    try:
+        write_jsonl_gz(path, {'version': 1}, records())
+    except RuntimeError:
+        pass
+    assert list(tmp_path.iterdir()) == []
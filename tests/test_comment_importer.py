@@ -0,0 +1,76 @@
+import threading
+
+from modules.comment_importer import CommentImporter
+from modules.rate_limiter import TokenBucket
+from tools import publish_stub_server
+
+
+def _thread(count):
+    comments = [{'yt_id': 'root', 'comment': 'root', 'commented_at': '5'}]
+    comments += [{'yt_id': f"r{i}", 'parent_id': 'root', 'comment': f"reply {i}", 'commented_at': '6'} for i in range(count)]
+    return comments
+
+
+class _CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(0)
+        self.taken = 0
+        self._count_lock = threading.Lock()
+
+    def reserve(self, tokens=1.0):
+        with self._count_lock:
+            self.taken += tokens
+        return super().reserve(tokens)
+
+
+def _importer(url, **options):
+    return CommentImporter(url, 'jwt', rate_limiter=TokenBucket(0), **options)
+
+
+def test_batches_replies_after_their_parent(publish_stub):
+    url = publish_stub()
+    before = dict(publish_stub_server.stats)
+
+    stats = _importer(url, batch_size=10, batch_linger=0.01).import_comments(_thread(25), 'asset-1')
+
+    assert stats['imported'] == 26
+    assert stats['orphaned'] == 0
+    assert 0 < stats['batches'] < 26
+    assert publish_stub_server.stats['batch_items'] - before['batch_items'] == 25
+
+
+def test_falls_back_to_single_posts_when_batches_are_rejected(publish_stub):
+    url = publish_stub(no_batch=True)
+    importer = _importer(url, batch_size=10, batch_linger=0.01)
+    before = dict(publish_stub_server.stats)
+
+    first = importer.import_comments(_thread(5), 'asset-1')
+    second = importer.import_comments(_thread(5), 'asset-2')
+
+    assert (first['imported'], second['imported']) == (6, 6)
+    # Only the first reply batch is tried; after the 404 everything is posted singly
+    assert publish_stub_server.stats['batch_requests'] - before['batch_requests'] == 1
+    assert publish_stub_server.stats['single'] - before['single'] == 12
+
+
+def test_fallback_takes_a_token_per_request(publish_stub):
+    url = publish_stub(no_batch=True)
+    limiter = _CountingBucket()
+    importer = CommentImporter(url, 'jwt', rate_limiter=limiter, batch_size=10, batch_linger=0.01)
+    before = dict(publish_stub_server.stats)
+
+    importer.import_comments(_thread(5), 'asset-1')
+    importer.import_comments(_thread(5), 'asset-2')
+
+    sent = sum(publish_stub_server.stats[key] - before[key] for key in ('single', 'batch_requests'))
+    assert limiter.taken == sent == 13
+
+
+def test_sync_engine_publishes_one_by_one(publish_stub):
+    url = publish_stub()
+    before = publish_stub_server.stats['single']
+
+    stats = _importer(url).import_comments(_thread(3), 'asset-1')
+
+    assert stats['imported'] == 4
+    assert publish_stub_server.stats['single'] - before == 4
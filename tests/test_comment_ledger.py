@@ -0,0 +1,66 @@
+from modules import comment_ledger
+from modules.comment_importer import CommentImporter
+from modules.comment_ledger import CommentLedger
+from modules.rate_limiter import TokenBucket
+from tools import publish_stub_server
+
+COMMENTS = [
+    {'yt_id': 'c1', 'comment': 'first at 0:05', 'commented_at': '5'},
+    {'yt_id': 'c1.r1', 'parent_id': 'c1', 'comment': 'reply', 'commented_at': '6'},
+    {'yt_id': 'c2', 'comment': 'second at 0:10', 'commented_at': '10'},
+]
+
+
+def test_records_survive_reopening_and_are_scoped_per_asset(tmp_path):
+    path = str(tmp_path / 'ledger.db')
+    ledger = CommentLedger(path)
+    ledger.record('asset-1', 'c1', 'incast-1')
+    ledger.close()
+
+    ledger = CommentLedger(path)
+    assert ledger.lookup('asset-1', ['c1', 'c2', None]) == {'c1': 'incast-1'}
+    assert ledger.lookup('asset-2', ['c1']) == {}
+
+
+def test_lookup_splits_large_id_lists(tmp_path, monkeypatch):
+    monkeypatch.setattr(comment_ledger, 'LOOKUP_BATCH', 3)
+    ledger = CommentLedger(str(tmp_path / 'ledger.db'))
+    for i in range(10):
+        ledger.record('asset-1', f"c{i}", f"incast-{i}")
+
+    found = ledger.lookup('asset-1', [f"c{i}" for i in range(12)])
+
+    assert found == {f"c{i}": f"incast-{i}" for i in range(10)}
+
+
+def test_repeated_import_publishes_nothing_twice(publish_stub, tmp_path):
+    url = publish_stub()
+    path = str(tmp_path / 'ledger.db')
+
+    first = CommentImporter(url, 'jwt', rate_limiter=TokenBucket(0), ledger=CommentLedger(path)).import_comments(COMMENTS, 'asset-1')
+    before = publish_stub_server.stats['single']
+    second = CommentImporter(url, 'jwt', rate_limiter=TokenBucket(0), ledger=CommentLedger(path)).import_comments(COMMENTS, 'asset-1')
+
+    assert (first['imported'], first['skipped']) == (3, 0)
+    assert (second['imported'], second['skipped']) == (0, 3)
+    assert publish_stub_server.stats['single'] == before
+
+
+def test_reply_resolves_a_parent_published_in_an_earlier_run(publish_stub, tmp_path):
+    url = publish_stub()
+    path = str(tmp_path / 'ledger.db')
+    CommentImporter(url, 'jwt', rate_limiter=TokenBucket(0), ledger=CommentLedger(path)).import_comments(COMMENTS[:1], 'asset-1')
+
+    ledger = CommentLedger(path)
+    stats = CommentImporter(url, 'jwt', rate_limiter=TokenBucket(0), ledger=ledger).import_comments(COMMENTS, 'asset-1')
+
+    assert (stats['imported'], stats['orphaned'], stats['skipped']) == (2, 0, 1)
+    assert set(ledger.lookup('asset-1', ['c1.r1', 'c2'])) == {'c1.r1', 'c2'}
+
+
+def test_dry_run_records_nothing(publish_stub, tmp_path):
+    ledger = CommentLedger(str(tmp_path / 'ledger.db'))
+
+    CommentImporter(publish_stub(), 'jwt', dry_run=True, rate_limiter=TokenBucket(0), ledger=ledger).import_comments(COMMENTS, 'asset-1')
+
+    assert ledger.lookup('asset-1', ['c1', 'c1.r1', 'c2']) == {}
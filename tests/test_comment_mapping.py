@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from modules import comment_mapping
+from modules.comment_mapping import ParallelCommentParser, parse_texts
+from modules.youtube_processor import YouTubeProcessor
+from tools.bench_timestamps import synthetic_corpus
+
+
+def test_process_pool_matches_in_process_parsing():
+    texts = synthetic_corpus(3000, random.Random(3)) + ['', None, 'no colon']
+    parser = ParallelCommentParser(workers=2, chunk_size=500, min_comments=100)
+    try:
+        assert parser.enabled_for(len(texts))
+        assert parser.parse(texts) == parse_texts([text or '' for text in texts])
+    finally:
+        parser.close()
+
+
+def test_small_lists_stay_in_process(monkeypatch):
+    monkeypatch.setattr(comment_mapping, 'ProcessPoolExecutor', lambda *args, **kwargs: pytest.fail("pool started"))
+    parser = ParallelCommentParser(workers=4, min_comments=1000)
+    assert not parser.enabled_for(999)
+    assert parser.parse(['at 0:05 hi', 'plain']) == [(5, 'hi'), None]
+
+
+def test_single_cpu_never_uses_a_pool():
+    assert not ParallelCommentParser(workers=1, min_comments=0).enabled_for(10 ** 6)
+
+
+def test_mapped_comments_are_identical_with_and_without_the_pool(tmp_path):
+    rng = random.Random(11)
+    raw = []
+    for i, text in enumerate(synthetic_corpus(2000, rng)):
+        parent = 'root' if i % 5 else f"c{i - 1}"
+        raw.append({'id': f"c{i}", 'parent': parent, 'text': text, 'author': 'someone'})
+
+    parser = ParallelCommentParser(workers=2, min_comments=100)
+    try:
+        pooled, pooled_stats = [], {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0}
+        YouTubeProcessor(cache_dir=str(tmp_path), comment_parser=parser)._process_flat_comments(raw, pooled, pooled_stats)
+    finally:
+        parser.close()
+    plain, plain_stats = [], {'with_timestamp': 0, 'without_timestamp': 0, 'total': 0}
+    YouTubeProcessor(cache_dir=str(tmp_path))._process_flat_comments(raw, plain, plain_stats)
+
+    assert pooled == plain
+    assert pooled_stats == plain_stats
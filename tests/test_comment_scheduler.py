@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from modules.comment_scheduler import CommentScheduler
+
+
+def _comments():
+    return [
+        {'yt_id': 'b1', 'parent_id': 'b'},
+        {'yt_id': 'a'},
+        {'yt_id': 'b'},
+        {'yt_id': 'a1', 'parent_id': 'a'},
+        {'yt_id': 'a1x', 'parent_id': 'a1'},
+        {'yt_id': 'c', 'parent_id': 'gone'},
+        {'yt_id': 'c1', 'parent_id': 'c'},
+        {'yt_id': 'e', 'parent_id': 'old'},
+    ]
+
+
+def _run(scheduler, mode, fail=()):
+    calls = []
+
+    def publish(idx, comment, incast_parent_id):
+        calls.append((comment['yt_id'], incast_parent_id))
+        return None if comment['yt_id'] in fail else f"INC-{comment['yt_id']}"
+
+    async def publish_async(idx, comment, incast_parent_id):
+        return publish(idx, comment, incast_parent_id)
+
+    if mode == 'sequential':
+        stats = scheduler.run_sequential(publish)
+    else:
+        stats = asyncio.run(scheduler.run_async(publish_async))
+    return stats, calls
+
+
+def test_order_puts_parents_before_replies():
+    scheduler = CommentScheduler(_comments())
+    order = [scheduler.yt_ids[idx] for idx in scheduler.order()]
+
+    assert order.index('b') < order.index('b1')
+    assert order.index('a') < order.index('a1') < order.index('a1x')
+    assert scheduler.depth[scheduler.yt_ids.index('a1x')] == 2
+
+
+@pytest.mark.parametrize('mode', ['sequential', 'async'])
+def test_publishes_replies_under_their_parents(mode):
+    stats, calls = _run(CommentScheduler(_comments(), known_parents={'old': 'INC-old'}), mode)
+    parents = dict(calls)
+
+    assert parents['b1'] == 'INC-b'
+    assert parents['a1x'] == 'INC-a1'
+    assert parents['e'] == 'INC-old'
+    assert stats['parent_map']['a'] == 'INC-a'
+
+
+@pytest.mark.parametrize('mode', ['sequential', 'async'])
+def test_reply_to_unknown_parent_is_skipped_not_published_top_level(mode):
+    stats, calls = _run(CommentScheduler(_comments()), mode)
+    published = {yt_id for yt_id, _ in calls}
+
+    assert published.isdisjoint({'c', 'c1', 'e'})
+    assert stats['orphaned'] == 3
+    assert stats['imported'] == 5
+    assert stats['failed'] == 3
+
+
+@pytest.mark.parametrize('mode', ['sequential', 'async'])
+def test_failed_parent_orphans_the_subtree(mode):
+    stats, calls = _run(CommentScheduler(_comments(), known_parents={'old': 'INC-old'}), mode, fail={'a'})
+    published = {yt_id for yt_id, _ in calls}
+
+    assert published.isdisjoint({'a1', 'a1x'})
+    assert stats['orphaned'] == 4
+
+
+def test_on_published_sees_every_landed_comment():
+    landed = {}
+    scheduler = CommentScheduler([{'yt_id': 'a'}, {'yt_id': 'a1', 'parent_id': 'a'}], on_published=landed.__setitem__)
+    _run(scheduler, 'sequential')
+    assert landed == {'a': 'INC-a', 'a1': 'INC-a1'}
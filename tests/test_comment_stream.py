@@ -0,0 +1,40 @@
+from modules.comment_stream import chunked, filter_timestamped, group_threads, limit_items
+
+
+def _comment(yt_id, at=0, parent=None):
+    return {'yt_id': yt_id, 'commented_at': str(at), 'parent_id': parent}
+
+
+def test_group_threads_splits_on_each_top_level_comment():
+    comments = [_comment('a'), _comment('a1', parent='a'), _comment('b'), _comment('c'), _comment('c1', parent='c')]
+    threads = [[c['yt_id'] for c in thread] for thread in group_threads(comments)]
+    assert threads == [['a', 'a1'], ['b'], ['c', 'c1']]
+
+
+def test_filter_keeps_timestamped_comments_and_needed_parents():
+    threads = [
+        [_comment('a', 30)],
+        [_comment('b'), _comment('b1', 50, 'b'), _comment('b2', 40, 'b'), _comment('b3', 0, 'b')],
+        [_comment('c')],
+    ]
+    kept = list(filter_timestamped(threads))
+
+    assert [c['yt_id'] for c in kept] == ['a', 'b', 'b1', 'b2']
+    assert kept[1]['commented_at'] == '40'
+
+
+def test_limit_items_reads_the_source_to_the_end():
+    consumed = []
+
+    def source():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    assert list(limit_items(source(), 3)) == [0, 1, 2]
+    assert len(consumed) == 10
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 3)) == []
@@ -0,0 +1,92 @@
+import threading
+from collections import namedtuple
+
+from modules import disk_quota, metrics
+from modules.disk_quota import DiskQuota
+
+Usage = namedtuple('Usage', 'total used free')
+
+
+def _reserve_in_thread(quota, label, size):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('id', quota.reserve(label, size)), daemon=True)
+    thread.start()
+    thread.join(0.1)
+    return thread, result
+
+
+def _reserved():
+    return metrics.snapshot()['gauges']['disk_quota_reserved_bytes']
+
+
+def test_waits_until_a_reservation_is_released():
+    quota = DiskQuota(max_bytes=100)
+    first = quota.reserve('vid1', 60)
+    thread, result = _reserve_in_thread(quota, 'vid2', 60)
+    assert thread.is_alive()
+
+    quota.release(first)
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert _reserved() == 60
+    quota.release(result['id'])
+    assert _reserved() == 0
+
+
+def test_oversized_video_runs_alone():
+    quota = DiskQuota(max_bytes=100)
+
+    thread, result = _reserve_in_thread(quota, 'huge', 500)
+    assert not thread.is_alive()
+    assert _reserved() == 500
+
+    blocked, _ = _reserve_in_thread(quota, 'small', 1)
+    assert blocked.is_alive()
+    quota.release(result['id'])
+    blocked.join(1)
+    assert not blocked.is_alive()
+
+
+def test_resize_admits_waiters_when_the_estimate_was_high():
+    quota = DiskQuota(max_bytes=100)
+    first = quota.reserve('vid1', 90)
+    thread, _ = _reserve_in_thread(quota, 'vid2', 50)
+    assert thread.is_alive()
+
+    quota.resize(first, 40)
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert _reserved() == 90
+
+
+def test_missing_estimate_reserves_the_default():
+    DiskQuota(default_bytes=123).reserve('unknown', None)
+
+    assert _reserved() == 123
+
+
+def test_keeps_min_free_bytes_on_disk(monkeypatch):
+    monkeypatch.setattr(disk_quota.shutil, 'disk_usage', lambda path: Usage(1000, 700, 300))
+    quota = DiskQuota(min_free_bytes=100)
+    first = quota.reserve('vid1', 150)
+
+    admitted, _ = _reserve_in_thread(quota, 'vid2', 50)
+    blocked, _ = _reserve_in_thread(quota, 'vid3', 1)
+
+    assert not admitted.is_alive()
+    assert blocked.is_alive()
+    quota.release(first)
+    blocked.join(1)
+    assert not blocked.is_alive()
+
+
+def test_release_of_unknown_reservation_is_ignored():
+    quota = DiskQuota(max_bytes=100)
+    quota.reserve('vid1', 10)
+
+    quota.release(None)
+    quota.release(42)
+
+    assert _reserved() == 10
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from modules import download_engine, metrics
+from modules.download_engine import DownloadEngine
+
+
+class _FakeYdl:
+    def __init__(self):
+        self.params = {}
+        self.hooks = []
+
+    def add_progress_hook(self, hook):
+        self.hooks.append(hook)
+
+    def report(self, **progress):
+        for hook in self.hooks:
+            hook(progress)
+
+
+def test_apply_sets_native_downloader_options():
+    opts = DownloadEngine(concurrent_fragments=8, http_chunk_size=1024, buffer_size=512, max_rate=1000).apply({})
+
+    assert opts == {'concurrent_fragment_downloads': 8, 'http_chunk_size': 1024, 'buffersize': 512, 'noresizebuffer': True}
+
+
+def test_missing_or_unknown_external_downloader_falls_back_to_native(monkeypatch):
+    monkeypatch.setattr(download_engine.shutil, 'which', lambda name: None)
+
+    assert DownloadEngine(external_downloader='aria2c').name == 'native'
+    assert DownloadEngine(external_downloader='rsync').name == 'native'
+
+
+def test_progress_hook_charges_each_new_byte_once(monkeypatch):
+    engine = DownloadEngine(max_rate=1000)
+    charged = []
+    monkeypatch.setattr(engine, 'throttle', charged.append)
+    ydl = _FakeYdl()
+
+    with engine.track('vid123', ydl) as transfer:
+        ydl.report(status='downloading', filename='video.f137', downloaded_bytes=100)
+        ydl.report(status='downloading', filename='video.f140', downloaded_bytes=40)
+        ydl.report(status='downloading', filename='video.f137', downloaded_bytes=250)
+        ydl.report(status='finished', filename='video.f137', total_bytes=250)
+
+    assert charged == [100, 40, 150]
+    assert transfer['bytes'] == 250
+    assert 'ratelimit' not in ydl.params
+
+
+def test_no_rate_ceiling_charges_nothing(monkeypatch):
+    engine = DownloadEngine()
+    monkeypatch.setattr(engine, 'throttle', lambda size: pytest.fail("charged without a ceiling"))
+    ydl = _FakeYdl()
+
+    with engine.track('vid123', ydl):
+        ydl.report(status='downloading', filename='video.mp4', downloaded_bytes=100)
+
+
+def test_throttle_holds_transfers_to_the_ceiling():
+    engine = DownloadEngine(max_rate=1000)
+    started = time.monotonic()
+
+    # One second of burst, then 500 bytes at 1000 bytes/s
+    engine.throttle(1000)
+    engine.throttle(500)
+
+    assert time.monotonic() - started >= 0.45
+
+
+def test_external_downloaders_share_the_rate_ceiling(monkeypatch):
+    monkeypatch.setattr(download_engine.shutil, 'which', lambda name: f"/usr/bin/{name}")
+    engine = DownloadEngine(external_downloader='aria2c', external_downloader_args=['-x4'], max_rate=1000)
+    first, second = _FakeYdl(), _FakeYdl()
+
+    assert engine.apply({})['external_downloader'] == {'default': 'aria2c'}
+    with engine.track('vid1', first):
+        with engine.track('vid2', second):
+            assert metrics.snapshot()['gauges']['download_active'] == 2
+
+    assert (first.params['ratelimit'], second.params['ratelimit']) == (1000, 500)
+    assert metrics.snapshot()['gauges']['download_active'] == 0
@@ -0,0 +1,77 @@
+from modules.format_policy import FALLBACK_FORMAT, FormatPolicy, estimate_bytes
+
+MB = 1024 * 1024
+
+
+def _progressive(format_id, height, size, ext='mp4', protocol='https'):
+    return {'format_id': format_id, 'vcodec': 'avc1.4d401e', 'acodec': 'mp4a.40.2', 'ext': ext, 'height': height, 'protocol': protocol, 'filesize': size}
+
+
+def _video(format_id, height, size, vcodec, ext='mp4', tbr=1000):
+    return {'format_id': format_id, 'vcodec': vcodec, 'acodec': 'none', 'ext': ext, 'height': height, 'protocol': 'https', 'filesize': size, 'tbr': tbr}
+
+
+def _audio(format_id, size, ext='m4a', tbr=128):
+    return {'format_id': format_id, 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'ext': ext, 'protocol': 'https', 'filesize': size, 'tbr': tbr}
+
+
+INFO = {
+    'duration': 600,
+    'formats': [
+        _progressive('18', 360, 10 * MB),
+        _progressive('22', 720, 30 * MB),
+        _progressive('hls-720', 720, 20 * MB, protocol='m3u8_native'),
+        _video('137', 1080, 80 * MB, 'avc1.640028', tbr=4000),
+        _video('399', 1080, 50 * MB, 'av01.0.08M.08', tbr=2500),
+        _video('248', 1080, 60 * MB, 'vp9', ext='webm'),
+        _audio('140', 5 * MB),
+        _audio('251', 4 * MB, ext='webm'),
+    ],
+}
+
+
+def test_direct_progressive_mp4_beats_hls():
+    choice = FormatPolicy().select(INFO)
+
+    assert (choice['format_id'], choice['rule'], choice['height']) == ('22', 'progressive_mp4', 720)
+    assert choice['format'] == f"22/{FALLBACK_FORMAT}"
+    assert choice['baseline_bytes'] == 30 * MB
+
+
+def test_limits_skip_taller_and_larger_candidates():
+    assert FormatPolicy(max_height=480).select(INFO)['format_id'] == '18'
+    assert FormatPolicy(max_filesize=15 * MB).select(INFO)['format_id'] == '18'
+
+
+def test_merged_prefers_h264_in_mp4():
+    choice = FormatPolicy(prefer_progressive=False).select(INFO)
+
+    assert (choice['format_id'], choice['rule']) == ('137+140', 'merged')
+    assert choice['estimated_bytes'] == 85 * MB
+
+
+def test_smallest_candidate_when_nothing_fits():
+    choice = FormatPolicy(max_filesize=MB).select(INFO)
+
+    assert (choice['format_id'], choice['rule']) == ('18', 'smallest')
+
+
+def test_no_formats_falls_back_to_the_fixed_selector():
+    choice = FormatPolicy().select({'formats': [{'url': 'https://example.com/no-id'}]})
+
+    assert choice == {'format': FALLBACK_FORMAT, 'rule': 'fallback', 'format_id': None, 'height': None, 'estimated_bytes': None, 'baseline_bytes': None}
+
+
+def test_baseline_without_22_or_18_is_the_best_merged_pair():
+    info = {'duration': 600, 'formats': [f for f in INFO['formats'] if f['format_id'] not in ('18', '22')]}
+
+    choice = FormatPolicy(max_height=720).select(info)
+
+    assert choice['format_id'] == 'hls-720'
+    assert choice['baseline_bytes'] == 85 * MB
+
+
+def test_estimate_from_bitrate_and_duration():
+    assert estimate_bytes({'tbr': 1000}, 8) == 1_000_000
+    assert estimate_bytes({'filesize_approx': 123}, None) == 123
+    assert estimate_bytes({'tbr': 1000}, None) is None
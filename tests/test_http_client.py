@@ -0,0 +1,59 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from modules import http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    http_client.configure_http()
+    yield
+    http_client.configure_http()
+
+
+def test_session_is_shared_until_closed():
+    session = http_client.get_session()
+    assert http_client.get_session() is session
+
+    http_client.close_session()
+    assert http_client.get_session() is not session
+
+
+def test_close_session_without_session_is_a_no_op():
+    http_client.close_session()
+    http_client.close_session()
+
+
+def test_host_limits_mount_a_blocking_pool():
+    http_client.configure_http(pool_maxsize=20, host_limits={'storage.googleapis.com': 4})
+    session = http_client.get_session()
+
+    adapter = session.get_adapter('https://storage.googleapis.com/bucket/object')
+    assert adapter._pool_maxsize == 4
+    assert adapter._pool_block is True
+    assert session.get_adapter('https://example.com/')._pool_maxsize == 20
+
+
+def test_shared_session_keeps_no_cookies():
+    class SetCookie(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Set-Cookie', 'JWT=leaked; Path=/')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), SetCookie)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        session = http_client.get_session()
+        session.get(f"http://127.0.0.1:{server.server_port}/", timeout=5)
+        assert len(session.cookies) == 0
+    finally:
+        server.shutdown()
+        server.server_close()
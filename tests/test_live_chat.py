@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from modules import youtube_processor
+from modules.live_chat_parser import iter_live_chat
+from modules.live_chat_reducer import LiveChatReducer
+from modules.youtube_processor import YouTubeProcessor
+
+URL = 'https://www.youtube.com/watch?v=live42'
+
+
+def _text_line(offset_s, text, message_id, author='viewer'):
+    return json.dumps({'replayChatItemAction': {
+        'videoOffsetTimeMsec': str(offset_s * 1000),
+        'actions': [{'addChatItemAction': {'item': {'liveChatTextMessageRenderer': {
+            'id': message_id,
+            'message': {'runs': [{'text': text}]},
+            'authorName': {'simpleText': author},
+        }}}}],
+    }})
+
+
+def _ticker_line():
+    return json.dumps({'replayChatItemAction': {'actions': [{'addLiveChatTickerItemAction': {}}]}})
+
+
+def _write_replay(path, lines):
+    # The first line of a replay file is never a chat message
+    path.write_text('\n'.join([_ticker_line()] + lines) + '\n')
+    return path
+
+
+def test_parser_yields_text_messages_only(tmp_path):
+    replay = _write_replay(tmp_path / 'chat.json', [
+        _text_line(3, 'hello', 'm1'),
+        _ticker_line(),
+        '{"replayChatItemAction": liveChatTextMessageRenderer broken',
+        _text_line(7, '  ', 'm2'),
+        _text_line(9, 'bye', 'm3', author='host'),
+    ])
+    stats = {}
+    messages = list(iter_live_chat(replay, stats))
+
+    assert [(m['yt_id'], m['commented_at'], m['comment'], m['user_name']) for m in messages] == [
+        ('m1', '3', 'hello', 'viewer'),
+        ('m3', '9', 'bye', 'host'),
+    ]
+    assert messages[0]['parent_id'] is None
+    assert stats['messages'] == 2
+    assert stats['lines'] == 6
+
+
+def test_parser_is_lazy(tmp_path):
+    replay = _write_replay(tmp_path / 'chat.json', [_text_line(i, f"msg {i}", f"m{i}") for i in range(100)])
+    stats = {}
+    stream = iter_live_chat(replay, stats)
+    next(stream)
+    assert stats['messages'] == 1
+    stream.close()
+
+
+@pytest.fixture
+def processor(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    _write_replay(cache_dir / 'live42.live_chat.json', [_text_line(i, f"msg {i}", f"m{i}") for i in range(5)])
+    return YouTubeProcessor(cache_dir=str(cache_dir))
+
+
+def test_iter_live_chats_caches_the_replay(processor, tmp_path):
+    streamed = list(processor.iter_live_chats(URL))
+    (tmp_path / 'cache' / 'live42.live_chat.json').unlink()
+
+    cached = list(YouTubeProcessor(cache_dir=str(tmp_path / 'cache')).iter_live_chats(URL))
+
+    assert cached == streamed
+    assert len(cached) == 5
+    header = next(youtube_processor.iter_jsonl_gz(tmp_path / 'cache' / 'livechat_cache_live42.jsonl.gz'))
+    assert header['count'] == 5
+
+
+def test_abandoned_live_chat_stream_is_not_cached(processor, tmp_path):
+    stream = processor.iter_live_chats(URL)
+    next(stream)
+    stream.close()
+
+    assert not list((tmp_path / 'cache').glob('livechat_cache_*'))
+    assert not list((tmp_path / 'cache').glob('.*.spool'))
+
+
+def test_legacy_live_chat_cache_is_migrated(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    legacy = cache_dir / 'livechat_cache_live42.json'
+    legacy.write_text(json.dumps({'live_chats': [{'comment': 'hi', 'user_name': 'u', 'commented_at': '4', 'yt_id': 'm1'}], 'stats': {'total': 1}}))
+
+    messages = list(YouTubeProcessor(cache_dir=str(cache_dir)).iter_live_chats(URL))
+
+    assert messages == [{'comment': 'hi', 'user_name': 'u', 'commented_at': '4', 'yt_id': 'm1', 'created_by_id': '', 'profile_picture': '', 'parent_id': None}]
+    assert not legacy.exists()
+
+
+def test_reducer_consumes_the_stream_directly(processor):
+    messages, stats = LiveChatReducer(dedup='none').reduce(processor.iter_live_chats(URL), limit=2)
+    assert stats['before'] == 5
+    assert len(messages) == 2
+
+
+class _ReplayYoutubeDL:
+    calls = []
+
+    def __init__(self, opts=None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        _ReplayYoutubeDL.calls.append('extract_info')
+        return {'id': 'live42', 'title': 'stream', 'subtitles': {'live_chat': [{'ext': 'json'}]}}
+
+    def process_ie_result(self, info, download=True):
+        _ReplayYoutubeDL.calls.append('process_ie_result')
+        target = self.opts['outtmpl'].replace('%(id)s', info['id']).replace('%(ext)s', 'live_chat.json')
+        _write_replay(youtube_processor.Path(target), [_text_line(1, 'first', 'm1'), _text_line(2, 'second', 'm2')])
+        return info
+
+
+def test_replay_download_reuses_the_shared_extraction(tmp_path, monkeypatch):
+    _ReplayYoutubeDL.calls = []
+    monkeypatch.setattr(youtube_processor.yt_dlp, 'YoutubeDL', _ReplayYoutubeDL)
+    processor = YouTubeProcessor(cache_dir=str(tmp_path / 'cache'))
+
+    processor.extract_video_info(URL)
+    messages = list(processor.iter_live_chats(URL))
+
+    assert [m['comment'] for m in messages] == ['first', 'second']
+    assert _ReplayYoutubeDL.calls == ['extract_info', 'process_ie_result']
+
+
+def test_downloaded_replay_is_reused_when_the_parsed_cache_is_missing(processor, monkeypatch):
+    monkeypatch.setattr(processor, '_download_live_chat', lambda *args: pytest.fail("replay downloaded again"))
+    assert len(list(processor.iter_live_chats(URL))) == 5
+
+
+def test_cleanup_removes_replays_once_parsed(processor, tmp_path, monkeypatch):
+    from modules.cache_cleanup import cleanup_cache_files
+
+    unparsed = tmp_path / 'cache' / 'other.live_chat.json'
+    unparsed.write_text('{}')
+    list(processor.iter_live_chats(URL))
+    monkeypatch.chdir(tmp_path)
+
+    assert cleanup_cache_files(days_old=30) == 1
+    assert not (tmp_path / 'cache' / 'live42.live_chat.json').exists()
+    assert unparsed.exists()
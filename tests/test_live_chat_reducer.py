@@ -0,0 +1,57 @@
+import pytest
+
+from modules.live_chat_reducer import LiveChatReducer
+
+
+def _chat(offset, text):
+    return {'commented_at': str(offset), 'comment': text}
+
+
+def test_exact_dedup_only_within_the_window():
+    chats = [_chat(0, 'gg'), _chat(5, 'gg'), _chat(20, 'gg'), _chat(21, 'GG')]
+
+    kept, stats = LiveChatReducer(dedup='exact', dedup_window=10).reduce(chats)
+
+    assert [(c['commented_at'], c['comment']) for c in kept] == [('0', 'gg'), ('20', 'gg'), ('21', 'GG')]
+    assert stats['after_dedup'] == 3
+
+
+def test_near_dedup_ignores_case_punctuation_and_stretched_letters():
+    chats = [_chat(0, 'LOL'), _chat(1, 'lol!!'), _chat(2, 'loooool'), _chat(3, 'nice')]
+
+    kept, _ = LiveChatReducer(dedup='near', dedup_window=10).reduce(chats)
+
+    assert [c['comment'] for c in kept] == ['LOL', 'loooool', 'nice']
+
+
+def test_per_second_cap():
+    chats = [_chat(1, f"m{i}") for i in range(5)] + [_chat(2, 'late')]
+
+    kept, stats = LiveChatReducer(dedup='none', per_second_cap=2).reduce(chats)
+
+    assert [c['comment'] for c in kept] == ['m0', 'm1', 'late']
+    assert stats['after_cap'] == 3
+
+
+def test_uniform_sample_spreads_over_the_timeline():
+    burst = [_chat(0, f"burst{i}") for i in range(50)]
+    quiet = [_chat(offset, f"quiet{offset}") for offset in (100, 200, 300)]
+
+    kept, stats = LiveChatReducer(dedup='none').reduce(burst + quiet, limit=4)
+
+    assert [c['comment'] for c in kept] == ['burst0', 'quiet100', 'quiet200', 'quiet300']
+    assert stats == {'before': 53, 'after_dedup': 53, 'after_cap': 53, 'after': 4}
+
+
+def test_head_sample_keeps_the_first_messages():
+    chats = [_chat(offset, f"m{offset}") for offset in (30, 10, 20)]
+
+    kept, _ = LiveChatReducer(dedup='none', sample='head').reduce(iter(chats), limit=2)
+
+    assert [c['comment'] for c in kept] == ['m10', 'm20']
+
+
+@pytest.mark.parametrize('kwargs', [{'dedup': 'fuzzy'}, {'sample': 'random'}])
+def test_invalid_modes_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        LiveChatReducer(**kwargs)
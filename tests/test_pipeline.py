@@ -0,0 +1,99 @@
+import threading
+import time
+
+from modules.batch_processor import BatchProcessor
+from modules.pipeline import StagedPipeline
+
+
+def _run(stages, jobs, queue_size=2):
+    completed, errors = [], []
+    lock = threading.Lock()
+
+    def on_complete(job):
+        with lock:
+            completed.append(job)
+
+    def on_error(job, error):
+        with lock:
+            errors.append((job['id'], str(error)))
+
+    pipeline = StagedPipeline(stages, on_complete, on_error, queue_size=queue_size, report_interval=0)
+    stats = pipeline.run(jobs)
+    return completed, errors, stats
+
+
+def test_stages_run_in_order_for_every_job():
+    def stage(name):
+        def handler(job):
+            job['trace'].append(name)
+        return handler
+
+    jobs = [{'id': i, 'trace': []} for i in range(5)]
+    completed, errors, stats = _run([(name, stage(name), 2) for name in ('extract', 'download', 'upload')], jobs)
+
+    assert errors == []
+    assert sorted(job['id'] for job in completed) == list(range(5))
+    assert all(job['trace'] == ['extract', 'download', 'upload'] for job in completed)
+    assert [s['processed'] for s in stats] == [5, 5, 5]
+
+
+def test_done_job_skips_remaining_stages():
+    def extract(job):
+        job['done'] = job['id'] == 1
+
+    def upload(job):
+        job['uploaded'] = True
+
+    completed, _, stats = _run([('extract', extract, 1), ('upload', upload, 1)], [{'id': 0}, {'id': 1}])
+
+    by_id = {job['id']: job for job in completed}
+    assert by_id[0].get('uploaded') is True
+    assert 'uploaded' not in by_id[1]
+    assert stats[1]['processed'] == 1
+
+
+def test_failure_reports_once_and_finishes_job():
+    def extract(job):
+        if job['id'] == 2:
+            raise ValueError("bad url")
+
+    completed, errors, stats = _run([('extract', extract, 1), ('upload', lambda job: None, 1)], [{'id': i} for i in range(3)])
+
+    assert errors == [(2, "bad url")]
+    assert sorted(job['id'] for job in completed) == [0, 1, 2]
+    assert stats[0]['failed'] == 1
+    assert stats[1]['processed'] == 2
+
+
+def test_queues_stay_bounded():
+    completed, _, stats = _run(
+        [('fast', lambda job: None, 1), ('slow', lambda job: time.sleep(0.01), 1)],
+        [{'id': i} for i in range(20)],
+        queue_size=2,
+    )
+    assert len(completed) == 20
+    assert all(s['max_queue_depth'] <= 2 for s in stats)
+
+
+class _MetadataOnly:
+    def __init__(self):
+        self.calls = []
+
+    def extract_video_info(self, url):
+        self.calls.append(('extract_video_info', url))
+        return {'title': 'Title', 'description': '', 'keywords': []}
+
+    def __getattr__(self, name):
+        raise AssertionError(f"extract stage called {name}")
+
+
+def test_extract_stage_fetches_metadata_only():
+    processor = _MetadataOnly()
+    batch = BatchProcessor(processor, None, None, None)
+    job = batch._new_job('https://www.youtube.com/watch?v=abc', 'cat')
+
+    batch._stage_extract(job)
+
+    assert processor.calls == [('extract_video_info', 'https://www.youtube.com/watch?v=abc')]
+    assert job['video_info']['title'] == 'Title'
+    assert job['done'] is False
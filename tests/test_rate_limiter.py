@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+from modules.rate_limiter import TokenBucket
+
+
+def test_zero_rate_never_waits():
+    bucket = TokenBucket(0)
+    assert all(bucket.acquire() == 0 for _ in range(100))
+
+
+def test_burst_then_steady_rate():
+    bucket = TokenBucket(rate=100, capacity=3)
+    waits = [bucket.reserve() for _ in range(5)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert 0.005 < waits[3] <= 0.011
+    assert 0.015 < waits[4] <= 0.021
+
+
+def test_from_interval():
+    assert TokenBucket.from_interval(0.5).rate == 2.0
+    assert TokenBucket.from_interval(0).rate == 0.0
+
+
+def test_shared_across_threads():
+    bucket = TokenBucket(rate=200, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(10)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 40 tokens, one free, the rest at 200/s
+    assert time.monotonic() - started >= 39 / 200 * 0.9
+
+
+def test_acquire_async_waits_without_blocking_the_loop():
+    bucket = TokenBucket(rate=50, capacity=1)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        tick = asyncio.create_task(ticker())
+        waited = [await bucket.acquire_async() for _ in range(3)]
+        await tick
+        return waited
+
+    waited = asyncio.run(main())
+    assert waited[0] == 0 and waited[1] > 0
+    assert len(ticks) == 5
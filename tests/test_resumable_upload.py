@@ -0,0 +1,135 @@
+import hashlib
+import io
+import threading
+
+import pytest
+
+from modules import resumable_upload
+from modules.http_client import get_session
+from modules.resumable_upload import CHUNK_GRANULARITY, ResumableUploader
+from tools import gcs_resumable_stub
+
+DATA = bytes(range(256)) * (CHUNK_GRANULARITY * 3 // 256) + b'tail'
+
+
+@pytest.fixture
+def gcs_stub(tmp_path):
+    """Start tools/gcs_resumable_stub.py on a free port; yields a factory taking its options."""
+    servers = []
+
+    def start(**options):
+        server = gcs_resumable_stub.make_server(port=0, store_dir=str(tmp_path / f"store{len(servers)}"), **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return server, f"http://{host}:{port}/bucket/video.mp4"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(DATA)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resumable_upload.time, 'sleep', lambda seconds: None)
+
+
+def _stored(server):
+    assert len(server.completed) == 1
+    return server.completed[0]['sha256']
+
+
+def test_uploads_in_chunks(gcs_stub, video_file):
+    server, url = gcs_stub()
+    sessions = []
+
+    result = ResumableUploader(chunk_size=CHUNK_GRANULARITY).upload(video_file, url, 'video/mp4', on_session=sessions.append)
+
+    assert result['success'] and result['resumed_from'] == 0
+    assert sessions == [result['session_uri']]
+    assert _stored(server) == hashlib.sha256(DATA).hexdigest()
+
+
+def test_partial_commits_are_resent(gcs_stub, video_file):
+    server, url = gcs_stub(partial=True)
+
+    ResumableUploader(chunk_size=2 * CHUNK_GRANULARITY).upload(video_file, url, 'video/mp4')
+
+    assert _stored(server) == hashlib.sha256(DATA).hexdigest()
+
+
+def test_resumes_a_stored_session(gcs_stub, video_file):
+    server, url = gcs_stub()
+    uploader = ResumableUploader(chunk_size=CHUNK_GRANULARITY)
+    session_uri = uploader.initiate(url, 'video/mp4')
+    get_session().put(session_uri, data=DATA[:CHUNK_GRANULARITY], headers={'Content-Range': f"bytes 0-{CHUNK_GRANULARITY - 1}/{len(DATA)}"})
+
+    result = uploader.upload(video_file, url, 'video/mp4', session_uri=session_uri)
+
+    assert result['session_uri'] == session_uri
+    assert result['resumed_from'] == CHUNK_GRANULARITY
+    assert result['bytes_sent'] == len(DATA) - CHUNK_GRANULARITY
+    assert _stored(server) == hashlib.sha256(DATA).hexdigest()
+
+
+def test_expired_stored_session_starts_over(gcs_stub, video_file):
+    server, url = gcs_stub()
+    sessions = []
+
+    result = ResumableUploader(chunk_size=CHUNK_GRANULARITY).upload(
+        video_file, url, 'video/mp4', session_uri=url.rsplit('/', 2)[0] + '/upload/gone', on_session=sessions.append
+    )
+
+    assert result['resumed_from'] == 0
+    assert sessions == [result['session_uri']]
+    assert _stored(server) == hashlib.sha256(DATA).hexdigest()
+
+
+def test_retries_chunks_answered_with_503(gcs_stub, video_file, monkeypatch):
+    server, url = gcs_stub(fail_rate=0.5)
+    # Fail every other chunk PUT
+    draws = iter([0.0, 1.0] * 10)
+    monkeypatch.setattr(gcs_resumable_stub.random, 'random', lambda: next(draws))
+
+    ResumableUploader(chunk_size=CHUNK_GRANULARITY, max_retries=1).upload(video_file, url, 'video/mp4')
+
+    assert _stored(server) == hashlib.sha256(DATA).hexdigest()
+
+
+def test_gives_up_after_max_retries(gcs_stub, video_file):
+    _, url = gcs_stub(fail_rate=1.0)
+
+    with pytest.raises(resumable_upload._RetryableStatus):
+        ResumableUploader(chunk_size=CHUNK_GRANULARITY, max_retries=2).upload(video_file, url, 'video/mp4')
+
+
+class _ReadTracker(io.BytesIO):
+    largest = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest = max(self.largest, len(data))
+        return data
+
+
+def test_resumed_stream_skips_committed_bytes_in_bounded_reads(gcs_stub):
+    server, url = gcs_stub()
+    uploader = ResumableUploader(chunk_size=CHUNK_GRANULARITY)
+    session_uri = uploader.initiate(url, 'video/mp4')
+    committed = 2 * CHUNK_GRANULARITY
+    get_session().put(session_uri, data=DATA[:committed], headers={'Content-Range': f"bytes 0-{committed - 1}/{len(DATA)}"})
+    stream = _ReadTracker(DATA)
+
+    result = uploader.upload_stream(stream, len(DATA), url, 'video/mp4', session_uri=session_uri)
+
+    assert result['resumed_from'] == committed
+    assert stream.largest <= CHUNK_GRANULARITY
+    assert _stored(server) == hashlib.sha256(DATA).hexdigest()
@@ -0,0 +1,53 @@
+from modules.run_journal import RunJournal
+
+URL = 'https://www.youtube.com/watch?v=vid123'
+
+
+def test_progress_survives_reopening_and_resume(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = RunJournal(path)
+    journal.start_run(resume=False)
+    journal.record_asset(URL, 'music', 'asset-1', 'https://storage.example/upload')
+    journal.record_upload_session(URL, 'https://storage.example/session')
+    journal.mark_upload_done(URL)
+    journal.close()
+
+    journal = RunJournal(path)
+    journal.start_run(resume=True)
+    video = journal.get_video(URL)
+
+    assert video['asset_id'] == 'asset-1'
+    assert video['upload_session'] == 'https://storage.example/session'
+    assert video['upload_done'] == 1
+    assert video['completed'] == 0
+
+
+def test_completion_clears_the_error(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.db'))
+    journal.record_asset(URL, 'music', 'asset-1', None)
+    journal.mark_failed(URL, 'upload timed out')
+    journal.mark_completed(URL, 'asset-1', comments_imported=12)
+
+    video = journal.get_video(URL)
+    assert (video['completed'], video['comments_imported'], video['error']) == (1, 12, None)
+
+
+def test_recording_a_new_asset_resets_upload_progress(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.db'))
+    journal.record_asset(URL, 'music', 'asset-1', 'https://storage.example/old')
+    journal.record_upload_session(URL, 'https://storage.example/session')
+    journal.mark_upload_done(URL)
+
+    journal.record_asset(URL, 'music', 'asset-2', 'https://storage.example/new')
+
+    video = journal.get_video(URL)
+    assert (video['asset_id'], video['upload_session'], video['upload_done']) == ('asset-2', None, 0)
+
+
+def test_fresh_run_clears_the_journal(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.db'))
+    journal.mark_completed(URL, 'asset-1', comments_imported=3)
+
+    journal.start_run(resume=False)
+
+    assert journal.get_video(URL) is None
@@ -0,0 +1,121 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules import stream_transfer
+from modules.stream_transfer import READ_SIZE, BytePipe, PipeClosed, download_into, probe_size
+
+DATA = bytes(range(256)) * 4000
+
+
+class _RangedFile(BaseHTTPRequestHandler):
+    # Serves DATA honouring "Range: bytes=a-b"; drops the first ranged
+    # response halfway through when the server's drop_once is set
+    def do_GET(self):
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if not match or self.server.ignore_range:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(DATA)))
+            self.end_headers()
+            self.wfile.write(DATA)
+            return
+        first, last = int(match.group(1)), min(int(match.group(2)), len(DATA) - 1)
+        body = DATA[first:last + 1]
+        self.send_response(206)
+        self.send_header('Content-Range', f"bytes {first}-{last}/{len(DATA)}")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.server.drop_once and len(body) > 1:
+            self.server.drop_once = False
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ranged_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _RangedFile)
+    server.drop_once = False
+    server.ignore_range = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(stream_transfer.time, 'sleep', lambda seconds: None)
+
+
+def test_writer_blocks_while_the_pipe_is_full():
+    pipe = BytePipe(2 * READ_SIZE, capacity=READ_SIZE)
+    pipe.write(b'a' * READ_SIZE)
+    writer = threading.Thread(target=pipe.write, args=(b'b' * READ_SIZE,))
+    writer.start()
+    writer.join(0.1)
+    assert writer.is_alive()
+
+    assert pipe.read(READ_SIZE) == b'a' * READ_SIZE
+    writer.join(1)
+    assert not writer.is_alive()
+    pipe.close()
+    assert pipe.read() == b'b' * READ_SIZE
+    assert len(pipe) == 2 * READ_SIZE
+
+
+def test_abort_stops_the_writer():
+    pipe = BytePipe(10)
+    pipe.abort()
+
+    with pytest.raises(PipeClosed):
+        pipe.write(b'data')
+
+
+def test_short_stream_fails_on_the_reader_side():
+    pipe = BytePipe(10)
+    pipe.write(b'12345')
+    pipe.close()
+
+    assert pipe.read(5) == b'12345'
+    with pytest.raises(IOError):
+        pipe.read(5)
+
+
+def test_downloads_in_ranges_and_charges_every_byte(ranged_server):
+    _, url = ranged_server
+    charged = []
+    pipe = BytePipe(probe_size(url, {}))
+
+    download_into(pipe, url, {}, range_size=100_000, throttle=charged.append)
+
+    assert pipe.read() == DATA
+    assert sum(charged) == len(DATA)
+
+
+def test_interrupted_range_resumes_where_it_stopped(ranged_server):
+    server, url = ranged_server
+    server.drop_once = True
+    pipe = BytePipe(len(DATA))
+
+    download_into(pipe, url, {}, range_size=300_000)
+
+    assert pipe.read() == DATA
+    assert pipe.bytes_written == len(DATA)
+
+
+def test_server_without_range_support_fails_the_reader(ranged_server):
+    server, url = ranged_server
+    server.ignore_range = True
+    pipe = BytePipe(len(DATA))
+
+    download_into(pipe, url, {})
+
+    with pytest.raises(IOError):
+        pipe.read()
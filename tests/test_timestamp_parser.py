@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from modules.timestamp_parser import extract_timestamp, find_timestamp, strip_timestamps
+from tools.bench_timestamps import (
+    REGRESSION_CASES,
+    legacy_extract_timestamp,
+    legacy_remove_timestamp,
+    random_text,
+    synthetic_corpus,
+)
+
+
+@pytest.mark.parametrize('text,expected', REGRESSION_CASES)
+def test_regression_cases(text, expected):
+    assert extract_timestamp(text) == expected
+    assert legacy_extract_timestamp(text) == expected
+
+
+def test_matches_the_four_regex_implementation_on_random_text():
+    rng = random.Random(1234)
+    for _ in range(20000):
+        text = random_text(rng)
+        match = find_timestamp(text)
+        assert (match.seconds if match else 0) == legacy_extract_timestamp(text), text
+        if match:
+            assert match.text == legacy_remove_timestamp(text), text
+
+
+def test_matches_on_realistic_comments():
+    for text in synthetic_corpus(5000, random.Random(7)):
+        assert extract_timestamp(text) == legacy_extract_timestamp(text), text
+        assert strip_timestamps(text) == legacy_remove_timestamp(text), text
+
+
+def test_match_reports_span_and_cleaned_text():
+    match = find_timestamp("the drop at 1:02:03 is great")
+    assert match.seconds == 3723
+    assert match.span == (12, 19)
+    assert match.text == "the drop is great"
+
+
+def test_text_without_a_colon_is_rejected_early():
+    assert find_timestamp("no timestamps here") is None
+    assert find_timestamp("") is None
@@ -0,0 +1,78 @@
+import time
+from pathlib import Path
+
+from modules import video_store
+from modules.video_store import VideoStore
+
+
+def _download(tmp_path, name, data):
+    path = tmp_path / 'downloads' / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_identical_downloads_share_one_blob(tmp_path):
+    store = VideoStore(str(tmp_path / 'videos'))
+
+    first = store.add('vid1', _download(tmp_path, 'vid1.MP4', b'same bytes'))
+    second = store.add('vid2', _download(tmp_path, 'vid2.mp4', b'same bytes'))
+
+    assert first['path'] == second['path']
+    assert first['path'].endswith('.mp4')
+    assert store.contains(first['path'])
+    assert not (tmp_path / 'downloads' / 'vid2.mp4').exists()
+    assert store.lookup('vid2')['digest'] == first['digest']
+
+
+def test_uploads_are_tracked_per_backend_across_reopening(tmp_path):
+    store = VideoStore(str(tmp_path / 'videos'))
+    store.add('vid1', _download(tmp_path, 'vid1.mp4', b'video'))
+    store.record_upload('vid1', 'incast', 'asset-1')
+    store.record_upload('vid1', 'incast', 'asset-2')
+
+    store = VideoStore(str(tmp_path / 'videos'))
+
+    assert store.uploaded_asset('vid1', 'incast') == 'asset-2'
+    assert store.uploaded_asset('vid1', 'other') is None
+    assert store.forget_uploads('vid1', 'incast') == ['asset-1', 'asset-2']
+    assert store.uploaded_asset('vid1', 'incast') is None
+
+
+def test_missing_blob_is_forgotten(tmp_path):
+    store = VideoStore(str(tmp_path / 'videos'))
+    blob = store.add('vid1', _download(tmp_path, 'vid1.mp4', b'video'))
+    Path(blob['path']).unlink()
+
+    assert store.lookup('vid1') is None
+    assert store.uploaded_asset('vid1', 'incast') is None
+
+
+def test_size_limit_evicts_least_recently_used_unpinned_blobs(tmp_path):
+    store = VideoStore(str(tmp_path / 'videos'), max_bytes=25)
+    old = store.add('old', _download(tmp_path, 'old.mp4', b'o' * 10))
+    kept = store.add('kept', _download(tmp_path, 'kept.mp4', b'k' * 10))
+    store.lookup('old')
+
+    store.add('new', _download(tmp_path, 'new.mp4', b'n' * 10))
+
+    assert Path(old['path']).exists()
+    assert not Path(kept['path']).exists()
+    assert store.lookup('kept') is None
+
+
+def test_blob_stays_pinned_until_every_holder_releases(tmp_path, monkeypatch):
+    store = VideoStore(str(tmp_path / 'videos'), max_age_days=1)
+    store.pin('vid1')
+    store.pin('vid1')
+    blob = store.add('vid1', _download(tmp_path, 'vid1.mp4', b'video'))
+    later = time.time() + 2 * 86400
+    monkeypatch.setattr(video_store.time, 'time', lambda: later)
+
+    assert store.enforce_retention() == 0
+    store.release('vid1')
+    assert store.enforce_retention() == 0
+
+    store.release('vid1')
+    assert store.enforce_retention() == 1
+    assert not Path(blob['path']).exists()
@@ -0,0 +1,305 @@
+import copy
+
+import pytest
+
+from modules import youtube_processor
+from modules.comment_stream import limit_items
+from modules.youtube_processor import YouTubeProcessor
+
+URL = 'https://www.youtube.com/watch?v=vid123'
+
+INFO = {
+    'id': 'vid123',
+    'title': 'A video',
+    'description': 'About things',
+    'tags': ['one', 'two'],
+    'duration': 100,
+    'formats': [
+        {'format_id': '18', 'ext': 'mp4', 'height': 360, 'vcodec': 'avc1', 'acodec': 'mp4a', 'protocol': 'https', 'filesize': 5_000_000},
+    ],
+}
+
+RAW_COMMENTS = [
+    {'id': 'c1', 'parent': 'root', 'text': 'at 1:30 wow', 'author': 'ann'},
+    {'id': 'c1.r1', 'parent': 'c1', 'text': 'yes 1:31', 'author': 'bob'},
+    {'id': 'c2', 'parent': 'root', 'text': 'no timestamp', 'author': 'cy'},
+]
+
+
+class FakeYoutubeDL:
+    extractions = []
+
+    def __init__(self, opts=None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        FakeYoutubeDL.extractions.append(dict(self.opts))
+        info = copy.deepcopy(INFO)
+        if self.opts.get('getcomments'):
+            info['comments'] = copy.deepcopy(RAW_COMMENTS)
+        return info
+
+    @staticmethod
+    def sanitize_info(info):
+        return info
+
+
+@pytest.fixture
+def fake_ytdlp(monkeypatch):
+    FakeYoutubeDL.extractions = []
+    monkeypatch.setattr(youtube_processor.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    return FakeYoutubeDL
+
+
+@pytest.fixture
+def processor(tmp_path, fake_ytdlp):
+    return YouTubeProcessor(cache_dir=str(tmp_path / 'cache'), metadata_cache_enabled=False)
+
+
+def test_one_extraction_serves_metadata_and_format_choice(processor, fake_ytdlp, tmp_path):
+    info = processor.extract_video_info(URL)
+    estimated = processor.estimate_download(URL, output_dir=str(tmp_path / 'cache'))
+
+    assert info['title'] == 'A video'
+    assert estimated == 5_000_000
+    assert processor.format_choice(URL)['format_id'] == '18'
+    assert len(fake_ytdlp.extractions) == 1
+
+
+def test_comments_need_their_own_extraction_once(processor, fake_ytdlp):
+    processor.extract_video_info(URL)
+    comments, stats = processor.extract_comments(URL)
+    processor.extract_comments(URL)
+
+    assert sorted(c['yt_id'] for c in comments) == ['c1', 'c1.r1', 'c2']
+    assert stats['total'] == 3
+    assert [bool(opts.get('getcomments')) for opts in fake_ytdlp.extractions] == [False, True]
+
+
+def test_release_video_drops_the_shared_info(processor, fake_ytdlp):
+    processor.extract_video_info(URL)
+    processor.release_video(URL)
+    processor.extract_video_info(URL)
+    assert len(fake_ytdlp.extractions) == 2
+
+
+def test_shared_info_stays_until_the_last_holder_releases(processor, fake_ytdlp):
+    processor.hold_video(URL)
+    processor.hold_video(URL)
+    processor.extract_video_info(URL)
+
+    processor.release_video(URL)
+    processor.estimate_download(URL)
+    assert len(fake_ytdlp.extractions) == 1
+
+    processor.release_video(URL)
+    processor.estimate_download(URL)
+    assert len(fake_ytdlp.extractions) == 2
+
+
+@pytest.fixture
+def cached_processor(tmp_path, fake_ytdlp):
+    return YouTubeProcessor(cache_dir=str(tmp_path / 'cache'), metadata_cache_enabled=True)
+
+
+def test_metadata_is_served_from_disk_cache(cached_processor, fake_ytdlp, tmp_path):
+    first = cached_processor.extract_video_info(URL)
+
+    fresh = YouTubeProcessor(cache_dir=str(tmp_path / 'cache'), metadata_cache_enabled=True)
+    second = fresh.extract_video_info(URL)
+
+    assert second == first
+    assert second['formats'][0]['format_id'] == '18'
+    assert len(fake_ytdlp.extractions) == 1
+
+
+def test_metadata_cache_does_not_depend_on_comment_cache(cached_processor, fake_ytdlp, tmp_path):
+    cached_processor.extract_video_info(URL)
+    assert not list((tmp_path / 'cache').glob('comments_cache_*'))
+
+    YouTubeProcessor(cache_dir=str(tmp_path / 'cache')).extract_video_info(URL)
+    assert len(fake_ytdlp.extractions) == 1
+
+
+def test_invalidate_cache_forces_a_new_extraction(cached_processor, fake_ytdlp, tmp_path):
+    cached_processor.extract_video_info(URL)
+    cached_processor.extract_comments(URL)
+    other = tmp_path / 'cache' / 'metadata_cache_other.json'
+    other.write_text('{}')
+
+    assert cached_processor.invalidate_cache(URL) == 2
+    assert other.exists()
+
+    cached_processor.extract_video_info(URL)
+    assert len(fake_ytdlp.extractions) == 3
+
+
+def test_expired_metadata_is_extracted_again(tmp_path, fake_ytdlp, monkeypatch):
+    YouTubeProcessor(cache_dir=str(tmp_path / 'cache'), metadata_cache_ttl=60).extract_video_info(URL)
+    later = youtube_processor.time.time() + 120
+    monkeypatch.setattr('modules.cache_store.time.time', lambda: later)
+
+    YouTubeProcessor(cache_dir=str(tmp_path / 'cache'), metadata_cache_ttl=60).extract_video_info(URL)
+    assert len(fake_ytdlp.extractions) == 2
+
+
+def test_comment_cache_is_compact_gzip_jsonl(processor, tmp_path):
+    processor.extract_comments(URL)
+    cache_file = tmp_path / 'cache' / 'comments_cache_vid123.jsonl.gz'
+
+    records = list(youtube_processor.iter_jsonl_gz(cache_file))
+    assert records[0]['version'] == youtube_processor.COMMENTS_CACHE_VERSION
+    assert records[0]['count'] == 3
+    assert all(set(record) <= set(youtube_processor.COMMENT_CACHE_FIELDS) for record in records[1:])
+
+
+def test_comments_load_from_cache_without_extraction(processor, fake_ytdlp, tmp_path):
+    first, _ = processor.extract_comments(URL)
+    again, stats = YouTubeProcessor(cache_dir=str(tmp_path / 'cache')).extract_comments(URL)
+
+    assert again == first
+    assert stats['with_timestamp'] == 2
+    assert len(fake_ytdlp.extractions) == 1
+
+
+def test_legacy_json_comment_cache_is_migrated(tmp_path, fake_ytdlp):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    legacy = cache_dir / 'comments_cache_vid123.json'
+    legacy.write_text(youtube_processor.json.dumps({'comments': RAW_COMMENTS, 'stats': {}}))
+
+    comments, _ = YouTubeProcessor(cache_dir=str(cache_dir)).extract_comments(URL)
+
+    assert len(comments) == 3
+    assert not legacy.exists()
+    assert (cache_dir / 'comments_cache_vid123.jsonl.gz').exists()
+    assert fake_ytdlp.extractions == []
+
+
+@pytest.fixture
+def streaming_processor(processor, monkeypatch):
+    monkeypatch.setattr(processor, '_stream_raw_comments', lambda url: iter(copy.deepcopy(RAW_COMMENTS)))
+    return processor
+
+
+def test_iter_comments_caches_a_fully_read_stream(streaming_processor, tmp_path):
+    stats = {}
+    streamed = list(streaming_processor.iter_comments(URL, stats))
+
+    assert [c['yt_id'] for c in streamed] == ['c1', 'c1.r1', 'c2']
+    assert stats['total'] == 3 and stats['with_replies'] == 1
+    cached, _ = YouTubeProcessor(cache_dir=str(tmp_path / 'cache')).extract_comments(URL)
+    assert sorted(c['yt_id'] for c in cached) == ['c1', 'c1.r1', 'c2']
+    assert not list((tmp_path / 'cache').glob('.*.spool'))
+
+
+def test_iter_comments_discards_an_abandoned_stream(streaming_processor, tmp_path):
+    stream = streaming_processor.iter_comments(URL, {})
+    next(stream)
+    stream.close()
+
+    assert not list((tmp_path / 'cache').glob('comments_cache_*'))
+    assert not list((tmp_path / 'cache').glob('.*.spool'))
+
+
+def test_limited_stream_still_caches_every_comment(streaming_processor, tmp_path):
+    assert len(list(limit_items(streaming_processor.iter_comments(URL, {}), 1))) == 1
+
+    records = list(youtube_processor.iter_jsonl_gz(tmp_path / 'cache' / 'comments_cache_vid123.jsonl.gz'))
+    assert records[0]['count'] == 3
+
+
+class _CommentExtractor:
+    def __init__(self, count, fail_after=None):
+        self.count = count
+        self.fail_after = fail_after
+        self.produced = 0
+
+    def _get_comments(self, *args, **kwargs):
+        for i in range(self.count):
+            if i == self.fail_after:
+                raise RuntimeError("comment page failed")
+            self.produced += 1
+            yield {'id': f"c{i}", 'parent': 'root', 'text': f"at 0:{i % 60:02d}", 'author': 'ann'}
+
+
+class _StreamingYoutubeDL(FakeYoutubeDL):
+    # Collects comments through extractor._get_comments like yt-dlp's
+    # InfoExtractor.extract_comments, so a swapped-in hook sees every call
+    extractor = None
+
+    def get_info_extractor(self, name):
+        return _StreamingYoutubeDL.extractor
+
+    def extract_info(self, url, download=False):
+        info = copy.deepcopy(INFO)
+        info['comments'] = list(self.extractor._get_comments())
+        return info
+
+
+@pytest.fixture
+def comment_source(monkeypatch):
+    def install(extractor):
+        _StreamingYoutubeDL.extractor = extractor
+        return extractor
+
+    monkeypatch.setattr(youtube_processor.yt_dlp, 'YoutubeDL', _StreamingYoutubeDL)
+    return install
+
+
+def test_pinned_yt_dlp_still_calls_the_comment_hook():
+    assert youtube_processor.COMMENT_HOOK_SUPPORTED
+
+
+def test_comments_are_handed_over_while_extraction_runs(processor, comment_source, monkeypatch):
+    monkeypatch.setattr(youtube_processor, 'COMMENT_STREAM_BUFFER', 5)
+    extractor = comment_source(_CommentExtractor(50))
+
+    stream = processor.iter_comments(URL, {})
+    first = next(stream)
+
+    assert first['yt_id'] == 'c0'
+    # The extractor is held back by the bounded queue instead of running ahead
+    assert extractor.produced < 50
+    assert len(list(stream)) == 49
+
+
+def test_abandoned_stream_stops_the_extractor(processor, comment_source, monkeypatch):
+    monkeypatch.setattr(youtube_processor, 'COMMENT_STREAM_BUFFER', 5)
+    extractor = comment_source(_CommentExtractor(10_000))
+
+    stream = processor.iter_comments(URL, {})
+    next(stream)
+    stream.close()
+
+    assert extractor.produced < 100
+    assert not [t for t in youtube_processor.threading.enumerate() if t.name == 'comments-vid123']
+
+
+def test_extractor_failure_reaches_the_consumer(processor, comment_source, tmp_path):
+    comment_source(_CommentExtractor(10, fail_after=3))
+    received = []
+
+    with pytest.raises(RuntimeError, match="comment page failed"):
+        for comment in processor.iter_comments(URL, {}):
+            received.append(comment['yt_id'])
+
+    assert received == ['c0', 'c1', 'c2']
+    assert not list((tmp_path / 'cache').glob('comments_cache_*'))
+
+
+def test_comments_arrive_after_extraction_without_the_hook(processor, comment_source, monkeypatch):
+    monkeypatch.setattr(youtube_processor, 'COMMENT_HOOK_SUPPORTED', False)
+    extractor = comment_source(_CommentExtractor(4))
+    hook = extractor._get_comments
+
+    comments = [c['yt_id'] for c in processor.iter_comments(URL, {})]
+
+    assert comments == ['c0', 'c1', 'c2', 'c3']
+    assert extractor._get_comments == hook
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Find the comment count where the process-pool parser beats the single-process path
+
+Usage:
+    python3 tools/bench_comment_mapping.py
+    python3 tools/bench_comment_mapping.py --workers 4 --sizes 10000,50000,200000
+
+Times ParallelCommentParser.parse against the in-process path on synthetic
+comment texts (~15% with timestamps). The pool is started once and reused,
+as it is during a run; its one-off start-up cost is reported separately.
+Use the first size marked "parallel" as processing.comment_parallel_min.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_timestamps import synthetic_corpus  # noqa: E402
+from modules.comment_mapping import ParallelCommentParser, parse_texts  # noqa: E402
+
+
+def best_of(runs, fn):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=0, help='0 = auto')
+    parser.add_argument('--sizes', default='5000,10000,25000,50000,100000,250000,500000')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    corpus = synthetic_corpus(max(sizes), random.Random(args.seed))
+    pool_parser = ParallelCommentParser(workers=args.workers, chunk_size=args.chunk_size, min_comments=0)
+
+    print(f"CPUs: {os.cpu_count()}, workers: {pool_parser.workers}")
+    if pool_parser.workers < 2:
+        print("Only one worker: the pool path is disabled automatically, nothing to compare.")
+        print("Pass --workers N to measure pool overhead anyway.")
+        return
+
+    try:
+        start = time.perf_counter()
+        pool_parser.parse(corpus[:1000])
+        print(f"Pool start-up (once per run): {time.perf_counter() - start:.3f}s\n")
+
+        crossover = None
+        print(f"{'comments':>10} {'single':>10} {'pool':>10}  winner")
+        for size in sizes:
+            texts = corpus[:size]
+            single = best_of(args.runs, lambda: parse_texts([t for t in texts if ':' in t]))
+            pooled = best_of(args.runs, lambda: pool_parser.parse(texts))
+            winner = 'parallel' if pooled < single else 'single'
+            if winner == 'parallel' and crossover is None:
+                crossover = size
+            print(f"{size:>10} {single:>9.3f}s {pooled:>9.3f}s  {winner}")
+
+        print()
+        if crossover:
+            print(f"Crossover: parallel wins from about {crossover} comments")
+        else:
+            print("No crossover in the measured range: keep processing.comment_workers at 0")
+    finally:
+        pool_parser.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Regression check and micro-benchmark for modules/timestamp_parser.py
+
+Usage:
+    python3 tools/bench_timestamps.py                  # regression + fuzz + benchmark
+    python3 tools/bench_timestamps.py --comments 500000 --fuzz 200000
+
+The legacy implementation below is the original four-pattern
+YouTubeProcessor._extract_timestamp / _remove_timestamp_from_text, kept
+verbatim as the reference. Exits non-zero if the new parser disagrees.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.timestamp_parser import extract_timestamp, find_timestamp  # noqa: E402
+
+
+def legacy_extract_timestamp(text):
+    patterns = [
+        r'(?:at|@)\s*(\d{1,2}):(\d{2})(?::(\d{2}))?',
+        r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s+(?:is|was|at)',
+        r'^(\d{1,2}):(\d{2})(?::(\d{2}))?$',
+        r'(\d{1,2}):(\d{2})(?::(\d{2}))?',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            groups = match.groups()
+            if len(groups) == 3 and groups[2]:
+                hours, minutes, seconds = map(int, groups)
+                return hours * 3600 + minutes * 60 + seconds
+            elif len(groups) >= 2:
+                minutes, seconds = map(int, groups[:2])
+                return minutes * 60 + seconds
+    return 0
+
+
+def legacy_remove_timestamp(text):
+    patterns = [
+        r'(?:at|@)\s*\d{1,2}:\d{2}(?::\d{2})?',
+        r'\d{1,2}:\d{2}(?::\d{2})?\s+(?:is|was|at)',
+        r'^\d{1,2}:\d{2}(?::\d{2})?\s*',
+        r'\d{1,2}:\d{2}(?::\d{2})?',
+    ]
+    cleaned_text = text
+    for pattern in patterns:
+        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+    return re.sub(r'\s+', ' ', cleaned_text).strip()
+
+
+# (text, expected seconds) -- pins down the pattern precedence
+REGRESSION_CASES = [
+    ("", 0),
+    ("great video", 0),
+    ("ratio 3:20 is fine", 200),
+    ("1:30", 90),
+    ("  1:30  ", 90),
+    ("at 2:15 he falls", 135),
+    ("@2:15 lol", 135),
+    ("AT 2:15 lol", 135),
+    ("1:00:05 is the best part", 3605),
+    ("0:10 and then at 4:20", 260),
+    ("0:10 and then 4:20 was wild", 260),
+    ("4:20 was wild and at 0:10", 10),
+    ("first 0:10 then 0:20", 10),
+    ("1:234:56 is odd", 2096),
+    ("123:45", 1425),
+    ("at 123:45", 1425),
+    ("12:345", 754),
+    ("1:2:34", 154),
+    ("that 1:23 moment", 83),
+    ("10:00:00", 36000),
+    ("at\n5:05", 305),
+    ("5:05\twas", 305),
+    ("timestamp 99:99", 6039),
+    ("no colon 1 23", 0),
+    ("colon but no digits: yes", 0),
+]
+
+ALPHABET = ['0', '1', '2', '3', '5', '9', ':', ':', ' ', ' ', '\t', '\n', 'a', 't', 'A', 'T',
+            '@', 'i', 's', 'w', 'x', '.', 'é', ' ', ' ', '١']
+WORDS = ['at', 'AT', '@', 'is', 'was', 'the', 'lol', '1:23', '12:34', '1:02:03', '0:5', ':', '99:99:99']
+
+
+def random_text(rng):
+    if rng.random() < 0.5:
+        return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 24)))
+    return rng.choice(['', ' ', '\n']).join(rng.choice(WORDS) + rng.choice(['', ' ', '  ', '\t']) for _ in range(rng.randint(0, 8)))
+
+
+def synthetic_corpus(count, rng, timestamp_share=0.15):
+    plain = ["This is the best song ever", "who's here in 2024?", "lol", "the drummer is insane",
+             "I've watched this 100 times", "Nobody: ... Me: replaying this", "❤️❤️❤️"]
+    stamped = ["at {t} the bass drops", "{t} is where it gets good", "{t}", "@{t} 😂",
+               "the part at {t} gives me chills", "{t} was unexpected"]
+    corpus = []
+    for _ in range(count):
+        if rng.random() < timestamp_share:
+            t = f"{rng.randint(0, 59)}:{rng.randint(0, 59):02d}"
+            if rng.random() < 0.1:
+                t = f"{rng.randint(1, 3)}:{t if len(t) == 5 else '0' + t}"
+            corpus.append(rng.choice(stamped).format(t=t))
+        else:
+            corpus.append(rng.choice(plain))
+    return corpus
+
+
+def check_regression():
+    failures = 0
+    for text, expected in REGRESSION_CASES:
+        legacy = legacy_extract_timestamp(text)
+        new = extract_timestamp(text)
+        if legacy != expected or new != expected:
+            failures += 1
+            print(f"REGRESSION {text!r}: expected {expected}, legacy {legacy}, new {new}")
+    print(f"Regression: {len(REGRESSION_CASES) - failures}/{len(REGRESSION_CASES)} cases match")
+    return failures
+
+
+def check_fuzz(count, seed):
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(count):
+        text = random_text(rng)
+        legacy_seconds = legacy_extract_timestamp(text)
+        match = find_timestamp(text)
+        new_seconds = match.seconds if match else 0
+        if legacy_seconds != new_seconds:
+            failures += 1
+            if failures <= 10:
+                print(f"FUZZ seconds {text!r}: legacy {legacy_seconds}, new {new_seconds}")
+            continue
+        if legacy_seconds > 0 and legacy_remove_timestamp(text) != match.text:
+            failures += 1
+            if failures <= 10:
+                print(f"FUZZ cleaned {text!r}: legacy {legacy_remove_timestamp(text)!r}, new {match.text!r}")
+    print(f"Fuzz: {count - failures}/{count} random strings match (seed {seed})")
+    return failures
+
+
+def benchmark(count, seed):
+    corpus = synthetic_corpus(count, random.Random(seed))
+
+    start = time.perf_counter()
+    for text in corpus:
+        seconds = legacy_extract_timestamp(text)
+        if seconds > 0:
+            legacy_remove_timestamp(text)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in corpus:
+        find_timestamp(text)
+    new_elapsed = time.perf_counter() - start
+
+    print(f"Benchmark over {count} synthetic comments (~15% with timestamps):")
+    print(f"   legacy: {legacy_elapsed:.3f}s ({count / legacy_elapsed:,.0f} comments/s)")
+    print(f"   single-pass: {new_elapsed:.3f}s ({count / new_elapsed:,.0f} comments/s)")
+    print(f"   speedup: {legacy_elapsed / new_elapsed:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=200000, help='synthetic comments to benchmark')
+    parser.add_argument('--fuzz', type=int, default=50000, help='random strings to compare against the legacy parser')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    failures = check_regression() + check_fuzz(args.fuzz, args.seed)
+    benchmark(args.comments, args.seed)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a GCS signed URL that speaks the resumable upload protocol
+
+Usage:
+    python3 tools/gcs_resumable_stub.py --port 8086 --fail-rate 0.2 --partial
+    # then upload with upload.mode: "resumable" to http://127.0.0.1:8086/<any path>
+
+Protocol (as implemented by GCS):
+    POST <signed url>, "x-goog-resumable: start"  -> 201, Location: <session uri>
+    PUT <session uri>, "Content-Range: bytes a-b/size" + body
+                                                   -> 308 + "Range: bytes=0-<last>" while incomplete
+                                                   -> 200 once all <size> bytes are committed
+    PUT <session uri>, "Content-Range: bytes */size" (no body)
+                                                   -> the same answers, without storing anything
+
+Plain PUTs to any other path store the body in one go (single-request mode).
+--fail-rate answers a share of chunk PUTs with 503 without committing,
+--partial commits only half of each chunk (GCS may do this too), and
+--expire-after N forgets a session after N chunks (404, forcing a new session).
+Completed uploads are written to --store-dir and listed with their sha256.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GRANULARITY = 256 * 1024
+
+_CONTENT_RANGE = re.compile(r'bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)')
+
+stats = {'sessions': 0, 'chunks': 0, 'queries': 0, 'injected_failures': 0, 'completed': 0, 'single_puts': 0}
+stats_lock = threading.Lock()
+
+
+class ResumableStubHandler(BaseHTTPRequestHandler):
+    server_version = "GCSResumableStub/1.0"
+
+    def do_POST(self):
+        self._drain()
+        if self.headers.get('x-goog-resumable', '').lower() != 'start':
+            return self._reply(400, 'missing x-goog-resumable: start')
+
+        session_id = uuid.uuid4().hex
+        with stats_lock:
+            stats['sessions'] += 1
+            self.server.sessions[session_id] = {'committed': 0, 'chunks': 0, 'path': os.path.join(self.server.store_dir, session_id)}
+        open(self.server.sessions[session_id]['path'], 'wb').close()
+
+        host, port = self.server.server_address[:2]
+        self._reply(201, headers={'Location': f'http://{host}:{port}/upload/{session_id}'})
+
+    def do_PUT(self):
+        if not self.path.startswith('/upload/'):
+            return self._single_put()
+
+        session = self.server.sessions.get(self.path[len('/upload/'):])
+        body = self._drain()
+        if session is None:
+            return self._reply(404, 'no such upload session')
+
+        match = _CONTENT_RANGE.fullmatch(self.headers.get('Content-Range', ''))
+        if not match:
+            return self._reply(400, 'bad Content-Range')
+        first, last, total = match.groups()
+        total = int(total) if total != '*' else None
+
+        if first is None:
+            with stats_lock:
+                stats['queries'] += 1
+            return self._status(session, total)
+
+        session['chunks'] += 1
+        with stats_lock:
+            stats['chunks'] += 1
+        if self.server.expire_after and session['chunks'] > self.server.expire_after:
+            self.server.sessions.pop(self.path[len('/upload/'):], None)
+            return self._reply(404, 'upload session expired (stub)')
+        if random.random() < self.server.fail_rate:
+            with stats_lock:
+                stats['injected_failures'] += 1
+            return self._reply(503, 'backend error (stub)')
+
+        first, last = int(first), int(last)
+        if last - first + 1 != len(body):
+            return self._reply(400, 'Content-Range does not match body length')
+        if first > session['committed']:
+            # A gap: the client has to resend from the committed offset
+            return self._status(session, total)
+
+        data = body[session['committed'] - first:]
+        final = total is not None and first + len(body) == total
+        if not final:
+            keep = max(GRANULARITY, len(data) // 2) if self.server.partial else len(data)
+            data = data[:(session['committed'] + keep) // GRANULARITY * GRANULARITY - session['committed']]
+        if data:
+            with open(session['path'], 'ab') as f:
+                f.write(data)
+            session['committed'] += len(data)
+        return self._status(session, total)
+
+    def _status(self, session, total):
+        if total is not None and session['committed'] == total:
+            if not session.get('done'):
+                session['done'] = True
+                with stats_lock:
+                    stats['completed'] += 1
+                self.server.completed.append(_describe(session['path']))
+            return self._reply(200, 'upload complete')
+        headers = {'Range': f"bytes=0-{session['committed'] - 1}"} if session['committed'] else {}
+        return self._reply(308, headers=headers)
+
+    def _single_put(self):
+        body = self._drain()
+        path = os.path.join(self.server.store_dir, uuid.uuid4().hex)
+        with open(path, 'wb') as f:
+            f.write(body)
+        with stats_lock:
+            stats['single_puts'] += 1
+        self.server.completed.append(_describe(path))
+        self._reply(200, 'stored')
+
+    def _drain(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _reply(self, status, message='', headers=None):
+        payload = message.encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+
+def _describe(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return {'path': path, 'size': os.path.getsize(path), 'sha256': digest.hexdigest()}
+
+
+def make_server(host='127.0.0.1', port=8086, store_dir=None, fail_rate=0.0, partial=False, expire_after=0, verbose=False):
+    server = ThreadingHTTPServer((host, port), ResumableStubHandler)
+    server.store_dir = store_dir or tempfile.mkdtemp(prefix='gcs-stub-')
+    os.makedirs(server.store_dir, exist_ok=True)
+    server.sessions = {}
+    server.completed = []
+    server.fail_rate = fail_rate
+    server.partial = partial
+    server.expire_after = expire_after
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8086)
+    parser.add_argument('--store-dir', default=None, help='where completed uploads are written (default: a temp dir)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='share of chunk PUTs answered with 503 (0..1)')
+    parser.add_argument('--partial', action='store_true', help='commit only half of each non-final chunk')
+    parser.add_argument('--expire-after', type=int, default=0, help='forget a session after N chunks (0 = never)')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.store_dir, args.fail_rate, args.partial, args.expire_after, args.verbose)
+    print(f"GCS resumable stub listening on http://{args.host}:{args.port}/ (uploads stored in {server.store_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nStats: {json.dumps(stats)}")
+        for upload in server.completed:
+            print(f"  {upload['size']:>12} bytes  sha256 {upload['sha256']}  {upload['path']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the publish-comment Cloud Function (single + batch)
+
+Usage:
+    python3 tools/publish_stub_server.py --port 8085
+    # config.yaml:
+    #   api:
+    #     publish_url: "http://127.0.0.1:8085/publish-comment"
+    #     publish_batch_url: "http://127.0.0.1:8085/publish-comment/batch"
+
+Batch contract (POST {publish_batch_url}):
+    request:  {"asset_id", "pubnub_channel", "skip_banter", "skip_pubnub",
+               "comments": [{...single payload fields..., "client_ref": "<yt_id>"}]}
+    response: {"results": [{"client_ref": "<yt_id>", "comment": {"id": "<uuid>"}}
+                           | {"client_ref": "<yt_id>", "error": "<message>"}]}
+
+Use --no-batch to answer batches with 404 (exercises the single-post fallback)
+and --fail-rate to reject a share of comments with HTTP 500 / per-item errors.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+stats = {'single': 0, 'batch_requests': 0, 'batch_items': 0, 'rejected': 0}
+stats_lock = threading.Lock()
+known_ids = set()
+
+
+class PublishStubHandler(BaseHTTPRequestHandler):
+    server_version = "PublishStub/1.0"
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._reply(400, {'error': 'invalid JSON'})
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.path.rstrip('/').endswith('/batch'):
+            return self._handle_batch(body)
+        return self._handle_single(body)
+
+    def _handle_single(self, body):
+        with stats_lock:
+            stats['single'] += 1
+        error = self._validate(body)
+        if error:
+            return self._reply(400, {'error': error})
+        if random.random() < self.server.fail_rate:
+            with stats_lock:
+                stats['rejected'] += 1
+            return self._reply(500, {'error': 'NLP processing failed (stub)'})
+        return self._reply(200, {'comment': {'id': self._new_id()}})
+
+    def _handle_batch(self, body):
+        with stats_lock:
+            stats['batch_requests'] += 1
+        if self.server.no_batch:
+            return self._reply(404, {'error': 'batch endpoint not available'})
+
+        comments = body.get('comments')
+        if not isinstance(comments, list):
+            return self._reply(400, {'error': "'comments' must be a list"})
+
+        with stats_lock:
+            stats['batch_items'] += len(comments)
+
+        results = []
+        for item in comments:
+            payload = dict(item)
+            for field in ('asset_id', 'pubnub_channel', 'skip_banter', 'skip_pubnub'):
+                payload.setdefault(field, body.get(field))
+            error = self._validate(payload)
+            if not error and random.random() < self.server.fail_rate:
+                error = 'NLP processing failed (stub)'
+            if error:
+                with stats_lock:
+                    stats['rejected'] += 1
+                results.append({'client_ref': item.get('client_ref'), 'error': error})
+            else:
+                results.append({'client_ref': item.get('client_ref'), 'comment': {'id': self._new_id()}})
+        return self._reply(200, {'results': results})
+
+    @staticmethod
+    def _validate(payload):
+        for field in ('comment', 'asset_id', 'commented_at'):
+            if field not in payload:
+                return f"missing '{field}'"
+        parent_id = payload.get('parent_id')
+        if parent_id:
+            with stats_lock:
+                if parent_id not in known_ids:
+                    return f"unknown parent_id '{parent_id}'"
+        return None
+
+    @staticmethod
+    def _new_id():
+        new_id = str(uuid.uuid4())
+        with stats_lock:
+            known_ids.add(new_id)
+        return new_id
+
+    def _reply(self, status, data):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+
+def make_server(host='127.0.0.1', port=8085, no_batch=False, fail_rate=0.0, latency=0.0, verbose=False):
+    server = ThreadingHTTPServer((host, port), PublishStubHandler)
+    server.no_batch = no_batch
+    server.fail_rate = fail_rate
+    server.latency = latency
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8085)
+    parser.add_argument('--no-batch', action='store_true', help='answer batch requests with HTTP 404')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='share of comments rejected (0..1)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of simulated processing per request')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.no_batch, args.fail_rate, args.latency, args.verbose)
+    print(f"Publish stub listening on http://{args.host}:{args.port}/publish-comment (batch: /publish-comment/batch)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nStats: {json.dumps(stats)}")
+
+
+if __name__ == '__main__':
+    main()